@@ -0,0 +1,101 @@
+"""
+Benchmark: automatic officer assignment
+
+For growing numbers of officers and pending cases it measures
+  - decisions: AssignmentEngine.choose() alone (in memory, no database)
+  - backlog:   assign_pending_backlog() end to end (stream + batched UPDATEs)
+and prints assignments per second for each.
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.bench_assignment
+> python -m benchmarks.bench_assignment --reset-database
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from database.connection import init_pool, test_connection, close_all_connections
+from operations.citizen_ops import add_citizen
+from operations.case_ops import add_cases_bulk
+from operations.import_ops import bulk_import
+from operations.assignment_ops import AssignmentEngine, assign_pending_backlog
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database, recreate_schema
+
+# (officers, pending cases) per run
+SIZES = [(50, 10_000), (500, 50_000), (2_000, 200_000)]
+
+# Words used to build station names and case locations
+PLACES = ["Nairobi", "Kisumu", "Mombasa", "Nakuru", "Eldoret", "Thika", "Malindi", "Kitale",
+          "Garissa", "Kakamega", "Nyeri", "Machakos", "Meru", "Kericho", "Naivasha", "Embu"]
+AREAS = ["Central", "North", "South", "East", "West", "CBD", "Market", "Station", "Estate"]
+RANKS = ["Constable", "Corporal", "Sergeant", "Inspector", "Chief Inspector", "Superintendent"]
+
+
+def random_place(rng):
+    return f"{rng.choice(PLACES)} {rng.choice(AREAS)}"
+
+
+def setup(officer_count, case_count, rng):
+    """Fresh schema with officers at random stations and unassigned pending cases"""
+    recreate_schema()
+    with contextlib.redirect_stdout(io.StringIO()):
+        citizen_id = add_citizen("Bench Citizen", "0700000000")
+        officers = [
+            (n, {'full_name': f"Officer {n}", 'badge_number': f"BENCH-{n}", 'rank': rng.choice(RANKS),
+                 'phone_number': "0711000000", 'station': f"{random_place(rng)} Police Station"})
+            for n in range(officer_count)
+        ]
+        bulk_import('officers', officers, show_progress=False)
+
+        locations = [random_place(rng) for _ in range(case_count)]
+        for start in range(0, case_count, 10_000):
+            add_cases_bulk([(citizen_id, "Theft", "Benchmark case", location)
+                            for location in locations[start:start + 10_000]])
+    return locations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Automatic officer assignment throughput")
+    add_database_arguments(parser)
+    if not use_scratch_database(parser.parse_args()):
+        return
+
+    init_pool()
+    if not test_connection():
+        return
+
+    rng = random.Random(42)
+
+    print(f"\n{'Officers':>9} {'Cases':>9} {'Decisions/s':>14} {'Backlog/s':>12} {'Busiest':>8} {'Quietest':>9}")
+    print("=" * 67)
+
+    for officer_count, case_count in SIZES:
+        locations = setup(officer_count, case_count, rng)
+
+        # Decisions only: a fresh engine choosing an officer for every case
+        engine = AssignmentEngine.load()
+        start = time.perf_counter()
+        for location in locations:
+            engine.choose(location)
+        decision_seconds = time.perf_counter() - start
+
+        # End to end: read the backlog, decide, write the assignments
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            assigned = assign_pending_backlog()
+            backlog_seconds = time.perf_counter() - start
+
+        # How evenly the work was spread
+        workloads = AssignmentEngine.load().workload.values()
+        print(f"{officer_count:>9,} {assigned:>9,} {case_count / decision_seconds:>14,.0f} "
+              f"{assigned / backlog_seconds:>12,.0f} {max(workloads):>8} {min(workloads):>9}")
+
+    print("=" * 67)
+    close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
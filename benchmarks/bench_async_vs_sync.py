@@ -0,0 +1,120 @@
+"""
+Benchmark: sync operations on threads vs async operations on one event loop
+
+Simulates many clients at once, each doing one "report and check" request:
+  - report a case (add_case)
+  - read it back with its updates
+      sync:  get_case_by_id() + get_updates_by_case() (two round trips)
+      async: get_case_details() (both queries pipelined, one round trip)
+
+The sync layer runs the requests on a thread pool, the async layer runs them
+as asyncio tasks. Both pools get the same maximum number of connections, and
+requests per second plus the average latency are printed for each.
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.bench_async_vs_sync
+> python -m benchmarks.bench_async_vs_sync --reset-database
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from database.connection import init_pool, test_connection, close_all_connections
+from database.async_connection import init_async_pool, close_async_pool
+from operations.citizen_ops import add_citizen
+from operations.case_ops import add_case, get_case_by_id
+from operations.case_update_ops import get_updates_by_case
+import operations.async_ops as async_ops
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database, recreate_schema
+
+# Number of clients sending requests at the same time
+CONCURRENCY_LEVELS = [1, 10, 50, 200]
+
+# Requests sent per concurrency level
+REQUESTS = 1_000
+
+
+def sync_request(citizen_id):
+    """One client request using the sync (psycopg2) operations"""
+    case_id = add_case(citizen_id, "Theft", "Benchmark case", "Nairobi CBD")
+    get_case_by_id(case_id)
+    get_updates_by_case(case_id)
+
+
+async def async_request(citizen_id):
+    """The same request using the async (psycopg 3) operations"""
+    case_id = await async_ops.add_case(citizen_id, "Theft", "Benchmark case", "Nairobi CBD")
+    await async_ops.get_case_details(case_id)
+
+
+def run_sync(citizen_id, concurrency):
+    """Run REQUESTS sync requests on `concurrency` threads, return (seconds, latencies)"""
+    latencies = []
+
+    def timed_request(_):
+        start = time.perf_counter()
+        sync_request(citizen_id)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed_request, range(REQUESTS)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(citizen_id, concurrency):
+    """Run REQUESTS async requests, `concurrency` at a time, return (seconds, latencies)"""
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def timed_request():
+        async with limit:
+            start = time.perf_counter()
+            await async_request(citizen_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_request() for _ in range(REQUESTS)))
+    return time.perf_counter() - start, latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sync operations on threads vs async operations")
+    add_database_arguments(parser)
+    if not use_scratch_database(parser.parse_args()):
+        return
+
+    init_pool()
+    if not test_connection():
+        return
+
+    recreate_schema()
+    citizen_id = add_citizen("Bench Citizen", "0700000000")
+    await init_async_pool()
+
+    print(f"\n{REQUESTS:,} requests per run (add_case + read case and its updates)")
+    print(f"\n{'Clients':>8} {'Layer':<7} {'Requests/s':>12} {'Avg latency (ms)':>18}")
+    print("=" * 50)
+
+    for concurrency in CONCURRENCY_LEVELS:
+        # Hide the ✓ messages printed by every add_case
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync_seconds, sync_latencies = await asyncio.to_thread(run_sync, citizen_id, concurrency)
+            async_seconds, async_latencies = await run_async(citizen_id, concurrency)
+
+        for layer, seconds, latencies in (("sync", sync_seconds, sync_latencies),
+                                          ("async", async_seconds, async_latencies)):
+            average_ms = sum(latencies) / len(latencies) * 1000
+            print(f"{concurrency:>8} {layer:<7} {REQUESTS / seconds:>12,.0f} {average_ms:>18.2f}")
+
+    print("=" * 50)
+    await close_async_pool()
+    close_all_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark: row-at-a-time writes vs the batched bulk writes
+
+Inserts the same number of cases and case updates with
+  - add_case() / add_case_update() called once per row (one commit each)
+  - add_cases_bulk() / add_case_updates_bulk() (one statement, one commit)
+and prints rows per second for each.
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.bench_bulk_writes
+> python -m benchmarks.bench_bulk_writes --reset-database
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from database.connection import init_pool, test_connection, close_all_connections
+from operations.citizen_ops import add_citizen
+from operations.officer_ops import add_officer
+from operations.case_ops import add_case, add_cases_bulk
+from operations.case_update_ops import add_case_update, add_case_updates_bulk
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database, recreate_schema
+
+# Batch sizes to test (rows written per run)
+BATCH_SIZES = [10, 100, 1_000]
+
+
+def timed(run):
+    """Run a function with its ✓ messages hidden, return (result, seconds)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-at-a-time writes vs bulk writes")
+    add_database_arguments(parser)
+    if not use_scratch_database(parser.parse_args()):
+        return
+
+    init_pool()
+    if not test_connection():
+        return
+
+    recreate_schema()
+    citizen_id = add_citizen("Bench Citizen", "0700000000")
+    officer_id = add_officer("Bench Officer", "BENCH-1", "Sergeant", "0711000000", "Central")
+
+    print(f"\n{'Rows':>6} {'Table':<14} {'One by one (rows/s)':>20} {'Bulk (rows/s)':>15} {'Speed-up':>9}")
+    print("=" * 70)
+
+    for size in BATCH_SIZES:
+        cases = [(citizen_id, "Theft", f"Benchmark case {n}", "Nairobi CBD") for n in range(size)]
+
+        single_ids, single_seconds = timed(lambda: [add_case(*case) for case in cases])
+        bulk_ids, bulk_seconds = timed(lambda: add_cases_bulk(cases))
+        print(f"{size:>6} {'cases':<14} {size / single_seconds:>20,.0f} {size / bulk_seconds:>15,.0f} "
+              f"{single_seconds / bulk_seconds:>8.1f}x")
+
+        updates = [(case_id, officer_id, "Benchmark note") for case_id in bulk_ids]
+
+        _, single_seconds = timed(lambda: [add_case_update(*update) for update in updates])
+        _, bulk_seconds = timed(lambda: add_case_updates_bulk(updates))
+        print(f"{size:>6} {'case_updates':<14} {size / single_seconds:>20,.0f} {size / bulk_seconds:>15,.0f} "
+              f"{single_seconds / bulk_seconds:>8.1f}x")
+
+    print("=" * 70)
+    close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
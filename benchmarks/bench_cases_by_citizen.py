@@ -0,0 +1,160 @@
+"""
+Benchmark: "View My Cases" before and after get_cases_by_citizen
+
+Grows the cases table step by step and measures, for one citizen:
+  - old path: get_all_cases() + get_case_by_id() for every case (N+1)
+  - new path: get_cases_by_citizen() (one query per page)
+
+For each path it prints how many queries (pool checkouts) were made and
+how long the page took. The new path should stay flat as the table grows.
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.bench_cases_by_citizen
+> python -m benchmarks.bench_cases_by_citizen --reset-database
+"""
+import argparse
+import time
+
+from database.connection import (
+    init_pool, test_connection, close_all_connections,
+    get_connection, release_connection, get_pool_stats
+)
+import operations.case_ops as case_ops
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database, recreate_schema
+
+# Table sizes to test (total number of cases)
+TABLE_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# The old N+1 path is far too slow on big tables, so stop running it here
+OLD_PATH_MAX_CASES = 10_000
+
+# Every citizen reports the same number of cases, whatever the table size
+CASES_PER_CITIZEN = 10
+
+# How many times each path is run (the best time is reported)
+REPEATS = 5
+
+
+class QueryCounter:
+    """Counts pool checkouts made inside the block (one checkout = one query here)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        self._start = get_pool_stats()['checkouts']
+        return self
+
+    def __exit__(self, *exc):
+        self.count = get_pool_stats()['checkouts'] - self._start
+
+
+def grow_cases_table(total_cases):
+    """Insert citizens and cases with plain SQL until the table has total_cases rows"""
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute("SELECT COUNT(*) FROM cases;")
+    existing = cur.fetchone()[0]
+    missing = total_cases - existing
+
+    if missing > 0:
+        cur.execute("SELECT COALESCE(MAX(citizen_id), 0) FROM citizens;")
+        last_citizen_id = cur.fetchone()[0]
+
+        # One new citizen for every CASES_PER_CITIZEN new cases
+        cur.execute("""
+            INSERT INTO citizens (full_name, phone_number)
+            SELECT 'Bench Citizen ' || n, '0700' || n
+            FROM generate_series(1, %s) AS n;
+        """, (missing // CASES_PER_CITIZEN,))
+
+        # Give each new citizen exactly CASES_PER_CITIZEN cases
+        cur.execute("""
+            INSERT INTO cases (citizen_id, crime_type, description, location)
+            SELECT
+                %s + 1 + (n - 1) / %s,
+                'Theft', 'Benchmark case ' || n, 'Nairobi CBD'
+            FROM generate_series(1, %s) AS n;
+        """, (last_citizen_id, CASES_PER_CITIZEN, missing))
+
+        cur.execute("ANALYZE cases;")
+
+    conn.commit()
+    cur.close()
+    release_connection(conn)
+
+
+def time_path(run):
+    """Run one path REPEATS times, return (queries per run, best seconds)"""
+    best = None
+    queries = 0
+    for _ in range(REPEATS):
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        queries = counter.count
+        best = elapsed if best is None else min(best, elapsed)
+    return queries, best
+
+
+def old_path(citizen_id):
+    """The original view_citizen_cases logic"""
+    found = []
+    for case in case_ops.get_all_cases():
+        case_detail = case_ops.get_case_by_id(case.case_id)
+        if case_detail and str(case_detail.citizen_id) == str(citizen_id):
+            found.append(case)
+    return found
+
+
+def new_path(citizen_id):
+    """The new single-query page"""
+    return case_ops.get_cases_by_citizen(citizen_id, 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="View My Cases before and after get_cases_by_citizen")
+    add_database_arguments(parser)
+    if not use_scratch_database(parser.parse_args()):
+        return
+
+    init_pool()
+    if not test_connection():
+        return
+
+    recreate_schema()
+
+    print(f"\n{'Cases':>10} {'Old queries':>12} {'Old ms':>10} {'New queries':>12} {'New ms':>10}")
+    print("=" * 60)
+
+    for total_cases in TABLE_SIZES:
+        grow_cases_table(total_cases)
+
+        # Any citizen will do, they all have the same number of cases
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT MIN(citizen_id) FROM citizens;")
+        citizen_id = cur.fetchone()[0]
+        cur.close()
+        release_connection(conn)
+
+        if total_cases <= OLD_PATH_MAX_CASES:
+            old_queries, old_seconds = time_path(lambda: old_path(citizen_id))
+            old_queries = str(old_queries)
+            old_ms = f"{old_seconds * 1000:.1f}"
+        else:
+            old_queries, old_ms = "skipped", "skipped"
+
+        new_queries, new_seconds = time_path(lambda: new_path(citizen_id))
+
+        print(f"{total_cases:>10} {old_queries:>12} {old_ms:>10} {new_queries:>12} {new_seconds * 1000:>10.1f}")
+
+    print("=" * 60)
+    close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
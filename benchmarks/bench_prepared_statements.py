@@ -0,0 +1,169 @@
+"""
+Benchmark: plain SQL vs server-side prepared statements for the hot queries
+
+Calls get_case_by_id(), get_citizen_by_id(), get_officer_by_id(), add_case()
+and add_case_update() many times in a row, once sending the plain SQL (parsed
+and planned by PostgreSQL on every call) and once using the statements
+prepared on each connection (see prepare_statement in database/connection.py),
+and prints calls per second for each.
+
+It also asks PostgreSQL how long it spends planning each query (EXPLAIN's
+Planning Time): the plain SQL is planned on every call, the prepared
+statement reuses its plan.
+
+The cases table has a partition for each of the last PARTITION_MONTHS months,
+as a database in use would; looking a case up by case_id has to plan for all
+of them.
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.bench_prepared_statements
+> python -m benchmarks.bench_prepared_statements --calls 20000 --reset-database
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import re
+import time
+
+from database.connection import (
+    init_pool, test_connection, close_all_connections, read, PREPARE_CONFIG, _prepared_statements
+)
+from database.cache import citizen_cache, officer_cache
+from operations.partition_ops import create_partitions
+from operations.citizen_ops import add_citizen, get_citizen_by_id
+from operations.officer_ops import add_officer, get_officer_by_id
+from operations.case_ops import add_case, add_cases_bulk, get_case_by_id
+from operations.case_update_ops import add_case_update
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database, recreate_schema
+
+# Months of partitions created before the run
+PARTITION_MONTHS = 24
+
+# Cases in the table while the lookups run
+CASES = 5_000
+
+# Calls per operation and mode (plain / prepared)
+DEFAULT_CALLS = 5_000
+
+_PLANNING_TIME = re.compile(r'Planning Time: ([\d.]+) ms')
+
+
+def timed(run):
+    """Run a function with its ✓ messages hidden, return seconds taken"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+
+
+def setup():
+    """Fresh schema with PARTITION_MONTHS month partitions, one citizen, one officer and CASES cases"""
+    recreate_schema()
+    with contextlib.redirect_stdout(io.StringIO()):
+        today = datetime.date.today()
+        create_partitions(today - datetime.timedelta(days=31 * PARTITION_MONTHS), today)
+        citizen_id = add_citizen("Bench Citizen", "0700000000")
+        officer_id = add_officer("Bench Officer", "BENCH-1", "Sergeant", "0711000000", "Central")
+        case_ids = add_cases_bulk([(citizen_id, "Theft", f"Benchmark case {n}", "Nairobi CBD", officer_id)
+                                   for n in range(CASES)])
+    return citizen_id, officer_id, case_ids
+
+
+def operations(citizen_id, officer_id, case_ids):
+    """(statement name, values, one call) for every benchmarked operation"""
+    case_id = case_ids[len(case_ids) // 2]
+
+    def lookup_citizen():
+        # Every call goes to the database, not to the lookup cache
+        citizen_cache.clear()
+        get_citizen_by_id(citizen_id)
+
+    def lookup_officer():
+        officer_cache.clear()
+        get_officer_by_id(officer_id)
+
+    return [
+        ("get_case_by_id", (case_id,), lambda: get_case_by_id(case_id)),
+        ("get_citizen_by_id", (citizen_id,), lookup_citizen),
+        ("get_officer_by_id", (officer_id,), lookup_officer),
+        ("add_case", (citizen_id, officer_id, "Theft", "Benchmark case", "Nairobi CBD"),
+         lambda: add_case(citizen_id, "Theft", "Benchmark case", "Nairobi CBD", officer_id)),
+        ("add_case_update", (case_id, officer_id, "Benchmark note"),
+         lambda: add_case_update(case_id, officer_id, "Benchmark note")),
+    ]
+
+
+def planning_ms(name, values, prepared):
+    """
+    Planning time PostgreSQL reports for one call of a statement (EXPLAIN
+    without ANALYZE, so nothing is written)
+
+    Returns:
+        Milliseconds, None if EXPLAIN did not report it
+    """
+    statement = _prepared_statements[name]
+    with read() as cur:
+        # The same statement execute_prepared() sends in this mode
+        query = statement.execute_sql if prepared else statement.sql
+        cur.execute("EXPLAIN (SUMMARY) " + query, values)
+        plan = "\n".join(row[0] for row in cur.fetchall())
+    match = _PLANNING_TIME.search(plan)
+    return float(match.group(1)) if match else None
+
+
+def run_mode(prepared, ops, calls):
+    """Time every operation with prepared statements on or off, return {name: (seconds, planning ms)}"""
+    PREPARE_CONFIG['enabled'] = prepared
+    results = {}
+    for name, values, call in ops:
+        # A few calls first: a prepared statement switches to its reusable
+        # (generic) plan after five executions
+        timed(lambda: [call() for _ in range(10)])
+        seconds = timed(lambda: [call() for _ in range(calls)])
+        results[name] = (seconds, planning_ms(name, values, prepared))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plain SQL vs prepared statements for the hot queries")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS,
+                        help=f"Calls per operation and mode (default: {DEFAULT_CALLS})")
+    add_database_arguments(parser)
+    args = parser.parse_args()
+    if not use_scratch_database(args):
+        return
+
+    init_pool()
+    if not test_connection():
+        return
+
+    ops = operations(*setup())
+    missing = [name for name, _, _ in ops if name not in _prepared_statements]
+    if missing:
+        raise RuntimeError(f"not registered as prepared statements: {missing}")
+
+    plain = run_mode(False, ops, args.calls)
+    prepared = run_mode(True, ops, args.calls)
+    PREPARE_CONFIG['enabled'] = True
+
+    print(f"\n{args.calls:,} calls each, {PARTITION_MONTHS} monthly partitions")
+    print(f"\n{'Operation':<20} {'Plain (calls/s)':>16} {'Prepared (calls/s)':>19} {'Speed-up':>9} "
+          f"{'Plan ms (plain)':>16} {'Plan ms (prep.)':>16}")
+    print("=" * 101)
+
+    for name, _, _ in ops:
+        plain_seconds, plain_plan = plain[name]
+        prepared_seconds, prepared_plan = prepared[name]
+        plain_text = f"{plain_plan:.3f}" if plain_plan is not None else "-"
+        prepared_text = f"{prepared_plan:.3f}" if prepared_plan is not None else "-"
+        print(f"{name:<20} {args.calls / plain_seconds:>16,.0f} {args.calls / prepared_seconds:>19,.0f} "
+              f"{plain_seconds / prepared_seconds:>8.2f}x {plain_text:>16} {prepared_text:>16}")
+
+    print("=" * 101)
+    close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
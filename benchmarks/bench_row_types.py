@@ -0,0 +1,128 @@
+"""
+Benchmark: memory and fetch time of the row types vs plain tuples and dict rows
+
+Fetches the same case listing (the columns of get_all_cases, every case) as:
+  tuple             - psycopg2's default cursor
+  CaseSummary       - the row type the operations return (database/rows.py)
+  NamedTupleCursor  - psycopg2.extras.NamedTupleCursor (a class made per query)
+  RealDictCursor    - psycopg2.extras.RealDictCursor (one dict per row)
+and prints, scaled to 1 million rows:
+  - the memory the fetched list takes (rows and their values, tracemalloc)
+  - the size of one row object alone (the values are the same for every kind)
+  - the time taken to fetch
+
+The cases come from benchmarks.data_generator.
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.bench_row_types
+> python -m benchmarks.bench_row_types --cases 100000 --reset-database
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from psycopg2 import extensions, extras
+
+from database.connection import (
+    init_pool, test_connection, close_all_connections, get_connection, release_connection, PROFILE_CONFIG
+)
+from database.rows import RowCursor, CaseSummary
+from operations.case_ops import _find_cases_query
+from benchmarks.data_generator import generate
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database
+
+# Cases generated (and fetched) by default
+DEFAULT_CASES = 20_000
+
+# Fetches timed per kind of row (the best one counts)
+REPEATS = 3
+
+# (name, cursor class, row type given to execute)
+ROW_KINDS = [
+    ("tuple", extensions.cursor, None),
+    ("CaseSummary", RowCursor, CaseSummary),
+    ("NamedTupleCursor", extras.NamedTupleCursor, None),
+    ("RealDictCursor", extras.RealDictCursor, None),
+]
+
+
+def fetch(cursor_class, row_type):
+    """Every case of the listing, with one kind of cursor"""
+    query, values = _find_cases_query()
+    conn = get_connection()
+    try:
+        cur = conn.cursor(cursor_factory=cursor_class)
+        if row_type is None:
+            cur.execute(query, values)
+        else:
+            cur.execute(query, values, row_type=row_type)
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+    finally:
+        conn.rollback()
+        release_connection(conn)
+
+
+def measure(cursor_class, row_type):
+    """
+    Memory and time of one kind of row
+
+    Returns:
+        (rows fetched, bytes the fetched list holds, average row object bytes, best fetch seconds)
+    """
+    # Memory: everything allocated by the fetch that is still alive afterwards
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rows = fetch(cursor_class, row_type)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    count = len(rows)
+    row_bytes = sum(sys.getsizeof(row) for row in rows) / count if count else 0
+    del rows
+
+    # Time: without tracemalloc, which slows every allocation down
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        rows = fetch(cursor_class, row_type)
+        seconds = time.perf_counter() - start
+        del rows
+        best = seconds if best is None else min(best, seconds)
+    return count, held, row_bytes, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per row of tuples, row types and dict rows")
+    parser.add_argument("--cases", type=int, default=DEFAULT_CASES,
+                        help=f"Cases generated and fetched (default: {DEFAULT_CASES})")
+    add_database_arguments(parser)
+    args = parser.parse_args()
+    if not use_scratch_database(args):
+        return
+
+    # Fetching every case is "slow"; do not log (and EXPLAIN) each fetch
+    PROFILE_CONFIG['slow_query_ms'] = float('inf')
+    init_pool()
+    if not test_connection():
+        return
+    generate(args.cases)
+
+    print(f"\nEvery case of the listing ({args.cases:,} rows), scaled to 1M rows")
+    print(f"\n{'Rows':<18} {'MB per 1M rows':>15} {'Row object (bytes)':>19} {'Fetch s per 1M rows':>20}")
+    print("=" * 75)
+
+    for name, cursor_class, row_type in ROW_KINDS:
+        count, held, row_bytes, seconds = measure(cursor_class, row_type)
+        scale = 1_000_000 / count
+        print(f"{name:<18} {held * scale / 1024 ** 2:>15,.1f} {row_bytes:>19,.0f} {seconds * scale:>20,.2f}")
+
+    print("=" * 75)
+    close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
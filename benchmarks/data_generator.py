@@ -0,0 +1,321 @@
+"""
+Synthetic data for benchmarks: citizens, officers, cases and case updates
+
+Everything is generated inside PostgreSQL (INSERT ... SELECT over
+generate_series), `CHUNK_SIZE` rows per statement and commit, so even
+10 million cases load without building rows in Python. The same seed
+always gives the same data.
+
+The data is shaped like the real thing:
+  - a few citizens report many cases, most report one or two
+  - busy locations and common crime types get most of the cases
+  - recent cases are more common than old ones, and old ones are more
+    likely to be resolved
+  - about half of the pending cases have no officer yet
+  - every case that left Pending has the matching status history
+  - every case has 0 to 4 updates, written by its officer (and the
+    last-update summary on cases matches them)
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.data_generator --cases 100000
+> python -m benchmarks.data_generator --cases 10000000 --seed 7 --reset-database
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import random
+import time
+
+from database.connection import (
+    init_pool, test_connection, close_all_connections, transaction, PROFILE_CONFIG
+)
+from operations.partition_ops import create_partitions
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database, recreate_schema
+
+# Rows inserted per statement (and per commit)
+CHUNK_SIZE = 500_000
+
+# Size of the other tables, relative to the number of cases
+CITIZENS_PER_CASE = 0.2
+CASES_PER_OFFICER = 500
+MIN_OFFICERS = 20
+MAX_OFFICERS = 20_000
+
+# Cases are reported over this many days up to today
+DAYS_OF_HISTORY = 730
+
+FIRST_NAMES = ["Amina", "Brian", "Cynthia", "David", "Esther", "Felix", "Grace", "Hassan", "Irene",
+               "James", "Kevin", "Lucy", "Mercy", "Njeri", "Otieno", "Peter", "Rose", "Samuel",
+               "Faith", "Wanjiku", "Omondi", "Achieng", "Mwangi", "Kiprop", "Chebet", "Mutua"]
+LAST_NAMES = ["Kamau", "Otieno", "Wanjiru", "Mwangi", "Odhiambo", "Kariuki", "Njoroge", "Cheruiyot",
+              "Mutiso", "Wafula", "Achieng", "Kiplagat", "Nyambura", "Onyango", "Barasa", "Maina"]
+PLACES = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika", "Malindi", "Kitale",
+          "Garissa", "Kakamega", "Nyeri", "Machakos", "Meru", "Kericho", "Naivasha", "Embu"]
+AREAS = ["CBD", "Central", "Market", "Estate", "North", "South", "East", "West", "Industrial Area",
+         "Bus Station", "Stage", "Highway"]
+RANKS = ["Constable", "Constable", "Constable", "Corporal", "Corporal", "Sergeant", "Inspector",
+         "Chief Inspector", "Superintendent"]
+# Listed once per share of cases (theft is the most common, and so on)
+CRIME_TYPES = ["Theft"] * 6 + ["Burglary"] * 3 + ["Assault"] * 3 + ["Robbery"] * 2 + \
+              ["Fraud"] * 2 + ["Vandalism", "Cybercrime", "Domestic Violence", "Carjacking", "Drug Possession"]
+DESCRIPTION_PARTS = ["Phone stolen", "Wallet taken", "Shop broken into", "Car window smashed",
+                     "Attacked by two men", "Money sent to a fake agent", "House burgled at night",
+                     "Motorbike stolen", "Threatened with a knife", "Laptop taken from office",
+                     "Livestock stolen", "Fake goods sold", "Card cloned at ATM", "Gate damaged"]
+DESCRIPTION_DETAILS = ["near the market", "outside the bank", "at the bus stage", "while asleep",
+                       "in broad daylight", "late at night", "by a known suspect", "on the way home",
+                       "during a power cut", "witnesses present", "captured on CCTV", "no witnesses"]
+UPDATE_NOTES = ["Statement recorded from the complainant", "Scene visited and photographed",
+                "Witness interviewed", "CCTV footage requested", "Suspect identified",
+                "Suspect arrested and in custody", "Stolen items recovered", "File forwarded to the ODPP",
+                "Awaiting forensic report", "Complainant informed of progress", "Case taken to court",
+                "No new leads this week"]
+
+
+def pick(name):
+    """SQL that picks a random element of the text array parameter `name`"""
+    return f"(%({name})s::text[])[1 + floor(random() * cardinality(%({name})s::text[]))::int]"
+
+
+def set_seed(cur, rng):
+    """Make random() on this connection repeat the same numbers for this chunk"""
+    cur.execute("SELECT setseed(%s);", (rng.uniform(-1, 1),))
+
+
+def insert_in_chunks(label, total, query, params, rng):
+    """
+    Run an INSERT ... SELECT over generate_series(%(first)s, %(last)s) one chunk at a time
+
+    Returns:
+        Number of rows inserted
+    """
+    inserted = 0
+    start = time.perf_counter()
+    for first in range(1, total + 1, CHUNK_SIZE):
+        last = min(first + CHUNK_SIZE - 1, total)
+        with transaction() as cur:
+            # Nothing is lost on a crash that a rerun would not recreate anyway
+            cur.execute("SET LOCAL synchronous_commit = off;")
+            set_seed(cur, rng)
+            cur.execute(query, dict(params, first=first, last=last))
+            inserted += cur.rowcount
+        print(f"  {label}: {last:,} / {total:,} ({inserted:,} rows, "
+              f"{inserted / (time.perf_counter() - start):,.0f} rows/s)")
+    return inserted
+
+
+def generate_citizens(count, rng):
+    query = f"""
+        INSERT INTO citizens (full_name, phone_number, email, address)
+        SELECT
+            first_name || ' ' || last_name,
+            '07' || lpad(floor(random() * 100000000)::int::text, 8, '0'),
+            CASE WHEN random() < 0.6 THEN lower(first_name || '.' || last_name || n || '@example.com') END,
+            CASE WHEN random() < 0.7 THEN {pick('places')} || ' ' || {pick('areas')} END
+        FROM (
+            SELECT n, {pick('first_names')} AS first_name, {pick('last_names')} AS last_name
+            FROM generate_series(%(first)s, %(last)s) AS n
+            OFFSET 0
+        ) AS people;
+    """
+    params = {'first_names': FIRST_NAMES, 'last_names': LAST_NAMES, 'places': PLACES, 'areas': AREAS}
+    return insert_in_chunks("citizens", count, query, params, rng)
+
+
+def generate_officers(count, rng):
+    query = f"""
+        INSERT INTO officers (full_name, badge_number, rank, phone_number, station)
+        SELECT
+            {pick('first_names')} || ' ' || {pick('last_names')},
+            'BN-' || lpad(n::text, 6, '0'),
+            {pick('ranks')},
+            '07' || lpad(floor(random() * 100000000)::int::text, 8, '0'),
+            {pick('places')} || ' ' || {pick('areas')} || ' Police Station'
+        FROM generate_series(%(first)s, %(last)s) AS n;
+    """
+    params = {'first_names': FIRST_NAMES, 'last_names': LAST_NAMES, 'ranks': RANKS,
+              'places': PLACES, 'areas': AREAS}
+    return insert_in_chunks("officers", count, query, params, rng)
+
+
+def generate_cases(count, citizens, officers, rng):
+    # OFFSET 0 keeps each inner row's random values fixed, so status and
+    # resolved_at below are worked out from the same draw
+    query = f"""
+        INSERT INTO cases (citizen_id, officer_id, crime_type, description, location,
+                           status, reported_at, resolved_at)
+        SELECT
+            citizen_id,
+            CASE WHEN status = 'Pending' AND random() < 0.5 THEN NULL ELSE officer_id END,
+            crime_type, description, location, status, reported_at,
+            CASE WHEN status IN ('Resolved', 'Closed')
+                 THEN LEAST(reported_at + random() * INTERVAL '60 days', LOCALTIMESTAMP) END
+        FROM (
+            SELECT
+                citizen_id, officer_id, crime_type, description, location, reported_at,
+                -- Older cases are more likely to be finished
+                CASE
+                    WHEN r < 0.9 - age * 0.6 THEN 'Pending'
+                    WHEN r < 0.95 - age * 0.4 THEN 'Under Investigation'
+                    WHEN r < 0.98 - age * 0.1 THEN 'Resolved'
+                    ELSE 'Closed'
+                END AS status
+            FROM (
+                SELECT
+                    -- power() skews the choices: low IDs / first places get most cases
+                    1 + floor(power(random(), 3) * %(citizens)s)::int AS citizen_id,
+                    1 + floor(random() * %(officers)s)::int AS officer_id,
+                    {pick('crime_types')} AS crime_type,
+                    {pick('descriptions')} || ' ' || {pick('details')} AS description,
+                    (%(places)s::text[])[1 + floor(power(random(), 2) * cardinality(%(places)s::text[]))::int]
+                        || ' ' || {pick('areas')} AS location,
+                    -- Recent cases are more common than old ones
+                    LOCALTIMESTAMP - power(random(), 2) * %(days)s * INTERVAL '1 day' AS reported_at,
+                    random() AS r
+                FROM generate_series(%(first)s, %(last)s) AS n
+                OFFSET 0
+            ) AS drawn,
+            LATERAL (SELECT EXTRACT(EPOCH FROM LOCALTIMESTAMP - reported_at) / (%(days)s * 86400.0) AS age) AS a
+            OFFSET 0
+        ) AS generated;
+    """
+    params = {'citizens': citizens, 'officers': officers, 'days': DAYS_OF_HISTORY,
+              'crime_types': CRIME_TYPES, 'descriptions': DESCRIPTION_PARTS, 'details': DESCRIPTION_DETAILS,
+              'places': PLACES, 'areas': AREAS}
+    return insert_in_chunks("cases", count, query, params, rng)
+
+
+def generate_case_updates(cases, officers, seed, rng):
+    # The number of updates comes from a hash of the case ID, so it is the
+    # same on every run without depending on random()
+    query = f"""
+        INSERT INTO case_updates (case_id, case_reported_at, officer_id, update_note, updated_at)
+        SELECT
+            c.case_id,
+            c.reported_at,
+            COALESCE(c.officer_id, 1 + floor(random() * %(officers)s)::int),
+            {pick('notes')},
+            LEAST(c.reported_at + k * random() * INTERVAL '7 days', LOCALTIMESTAMP)
+        FROM cases c
+        CROSS JOIN LATERAL generate_series(1, abs(hashint4(c.case_id + %(seed)s)) %% 5) AS k
+        WHERE c.case_id BETWEEN %(first)s AND %(last)s
+        ORDER BY c.case_id, k;
+    """
+    params = {'officers': officers, 'seed': seed, 'notes': UPDATE_NOTES}
+    return insert_in_chunks("case updates (cases done)", cases, query, params, rng)
+
+
+def generate_status_history(cases, rng):
+    # Every case that left Pending went to Under Investigation first, and
+    # finished cases then went to their final status at resolved_at
+    query = """
+        INSERT INTO case_status_history (case_id, old_status, new_status, changed_by, changed_at)
+        SELECT c.case_id, s.old_status, s.new_status, c.officer_id, s.changed_at
+        FROM (
+            SELECT case_id, officer_id, status, resolved_at,
+                   reported_at + random() * 0.5 * (COALESCE(resolved_at, LOCALTIMESTAMP) - reported_at)
+                       AS investigated_at
+            FROM cases
+            WHERE case_id BETWEEN %(first)s AND %(last)s AND status <> 'Pending'
+            OFFSET 0
+        ) AS c
+        CROSS JOIN LATERAL (VALUES
+            ('Pending', 'Under Investigation', c.investigated_at),
+            ('Under Investigation', c.status, c.resolved_at)
+        ) AS s(old_status, new_status, changed_at)
+        WHERE s.changed_at IS NOT NULL
+        ORDER BY c.case_id, s.changed_at;
+    """
+    return insert_in_chunks("status history (cases done)", cases, query, {}, rng)
+
+
+def fill_update_summaries(cases):
+    """
+    Set last_update_at / last_update_officer_id / update_count on every case
+    (the generator inserts updates directly, not through add_case_update)
+    """
+    start = time.perf_counter()
+    for first in range(1, cases + 1, CHUNK_SIZE):
+        last = min(first + CHUNK_SIZE - 1, cases)
+        with transaction() as cur:
+            cur.execute("SET LOCAL synchronous_commit = off;")
+            cur.execute("""
+                UPDATE cases c
+                SET last_update_at = s.updated_at,
+                    last_update_officer_id = s.officer_id,
+                    update_count = s.update_count
+                FROM (
+                    SELECT DISTINCT ON (case_id)
+                        case_id, updated_at, officer_id, COUNT(*) OVER (PARTITION BY case_id) AS update_count
+                    FROM case_updates
+                    WHERE case_id BETWEEN %(first)s AND %(last)s
+                    ORDER BY case_id, updated_at DESC, update_id DESC
+                ) AS s
+                WHERE c.case_id = s.case_id;
+            """, {'first': first, 'last': last})
+        print(f"  update summaries: {last:,} / {cases:,} ({time.perf_counter() - start:.1f}s)")
+
+
+def generate(cases, seed=42):
+    """
+    Recreate the schema and fill it with synthetic data
+
+    Args:
+        cases: Number of cases (citizens, officers and updates are scaled to it)
+        seed: Same seed, same data
+
+    Returns:
+        Dictionary of {table: rows inserted}
+    """
+    rng = random.Random(seed)
+    citizens = max(1, int(cases * CITIZENS_PER_CASE))
+    officers = min(MAX_OFFICERS, max(MIN_OFFICERS, cases // CASES_PER_OFFICER))
+
+    recreate_schema()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # A partition for every month the cases are spread over
+        today = datetime.date.today()
+        if create_partitions(today - datetime.timedelta(days=DAYS_OF_HISTORY), today) is None:
+            raise RuntimeError("could not create the partitions")
+
+    start = time.perf_counter()
+    counts = {
+        'citizens': generate_citizens(citizens, rng),
+        'officers': generate_officers(officers, rng),
+        'cases': generate_cases(cases, citizens, officers, rng),
+    }
+    counts['case_updates'] = generate_case_updates(cases, officers, seed, rng)
+    fill_update_summaries(cases)
+    counts['case_status_history'] = generate_status_history(cases, rng)
+
+    # Fresh statistics so the planner sees the real table sizes
+    with transaction() as cur:
+        cur.execute("ANALYZE citizens, officers, cases, case_updates, case_status_history;")
+
+    print(f"✓ Generated {', '.join(f'{rows:,} {table}' for table, rows in counts.items())} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a scratch database with synthetic data")
+    parser.add_argument("--cases", type=int, default=10_000, help="Number of cases (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    add_database_arguments(parser)
+    args = parser.parse_args()
+    if not use_scratch_database(args):
+        return
+
+    # Every bulk INSERT here is "slow"; do not log (and EXPLAIN) each one
+    PROFILE_CONFIG['slow_query_ms'] = float('inf')
+    init_pool()
+    if not test_connection():
+        return
+    generate(args.cases, args.seed)
+    close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
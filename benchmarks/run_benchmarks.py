@@ -0,0 +1,467 @@
+"""
+Benchmark suite: every public operation and the main menu flows
+
+Fills a scratch database with synthetic data (see data_generator.py), then
+calls each operation `--repeat` times with random (but seeded) arguments and
+reports per operation:
+  - p50 / p95 / p99 latency and calls per second (one caller)
+  - database statements per call (from the query profiler)
+  - peak RSS of this process so far (it only ever grows, so a jump points
+    at the operation that needed the memory)
+
+Results are written as JSON; compare two runs (e.g. before and after a
+commit) with --compare.
+
+Reads run before writes, and deletes remove rows the benchmark itself
+created, so the generated data stays roughly the same size throughout.
+
+WARNING: this recreates the schema, so it needs DB_BENCHMARK_NAME (a scratch
+database) or --reset-database (see scratch_database.py)
+> export DB_BENCHMARK_NAME=crime_reporting_bench
+> python -m benchmarks.run_benchmarks --cases 100000 --output before.json
+> python -m benchmarks.run_benchmarks --cases 100000 --output after.json --compare before.json
+> python -m benchmarks.run_benchmarks --no-generate --only case_ops     (reuse the data, one module)
+"""
+import argparse
+import builtins
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Peak memory comes from getrusage, which Windows does not have
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from database.connection import (
+    init_pool, test_connection, close_all_connections, read, transaction,
+    PROFILE_CONFIG, get_query_stats, reset_query_stats
+)
+from benchmarks.data_generator import generate, CRIME_TYPES, PLACES, AREAS, UPDATE_NOTES
+from benchmarks.scratch_database import add_database_arguments, use_scratch_database
+from operations import (
+    citizen_ops, officer_ops, case_ops, case_update_ops, stats_ops, assignment_ops, export_ops, import_ops,
+    archive_ops,
+)
+import ui.menu as menu
+
+# Calls per operation (slow, whole-table operations use their own smaller count)
+DEFAULT_REPEAT = 50
+
+# Rows per call for the bulk operations
+BULK_ROWS = 1_000
+
+# Rows read from iter_cases per call (enough to need several round trips)
+STREAMED_ROWS = 5_000
+
+# Percentiles reported for every operation
+PERCENTILES = (50, 95, 99)
+
+STATUSES = ['Pending', 'Under Investigation', 'Resolved', 'Closed']
+SEARCH_WORDS = ["stolen phone", "knife", "\"broken into\"", "cctv", "suspect arrested", "market -bank"]
+
+
+# DATASET
+class Dataset:
+    """ID ranges of the generated data, used to pick random arguments"""
+
+    def __init__(self):
+        with read() as cur:
+            cur.execute("SELECT MIN(citizen_id), MAX(citizen_id) FROM citizens;")
+            self.citizens = cur.fetchone()
+            cur.execute("SELECT MIN(officer_id), MAX(officer_id) FROM officers;")
+            self.officers = cur.fetchone()
+            cur.execute("SELECT MIN(case_id), MAX(case_id) FROM cases;")
+            self.cases = cur.fetchone()
+            cur.execute("SELECT COUNT(*) FROM cases;")
+            self.case_count = cur.fetchone()[0]
+
+    def citizen(self, rng):
+        return rng.randint(*self.citizens)
+
+    def officer(self, rng):
+        return rng.randint(*self.officers)
+
+    def case(self, rng):
+        return rng.randint(*self.cases)
+
+
+def new_citizen(rng):
+    return citizen_ops.add_citizen(f"Bench Citizen {rng.randrange(10**9)}", "0700000000")
+
+
+def new_officer(rng):
+    return officer_ops.add_officer(f"Bench Officer {rng.randrange(10**9)}", f"BENCH-{rng.randrange(10**12)}",
+                                   "Constable", "0711000000", f"{rng.choice(PLACES)} Police Station")
+
+
+def new_case(data, rng):
+    return case_ops.add_case(data.citizen(rng), rng.choice(CRIME_TYPES), "Benchmark case",
+                             f"{rng.choice(PLACES)} {rng.choice(AREAS)}")
+
+
+def unassign_pending(count):
+    """Give the assignment benchmarks a backlog to work through"""
+    with transaction() as cur:
+        cur.execute("""
+            UPDATE cases SET officer_id = NULL
+            WHERE case_id IN (
+                SELECT case_id FROM cases
+                WHERE status = 'Pending' AND officer_id IS NOT NULL
+                LIMIT %s
+            );
+        """, (count,))
+
+
+def old_deleted_cases(data, rng, count):
+    """Give the archive benchmark cases deleted long enough ago to be archived"""
+    case_ids = case_ops.add_cases_bulk([(data.citizen(rng), rng.choice(CRIME_TYPES), "Benchmark case",
+                                         f"{rng.choice(PLACES)} {rng.choice(AREAS)}", None)
+                                        for _ in range(count)])
+    with transaction() as cur:
+        cur.execute("""
+            UPDATE cases SET deleted_at = LOCALTIMESTAMP - INTERVAL '2 years'
+            WHERE case_id = ANY(%s);
+        """, (case_ids,))
+
+
+# THE BENCHMARKS
+def bench(name, run, setup=None, repeat=None):
+    """
+    One benchmark
+
+    Args:
+        name: Reported name ("<module>.<function>" or "menu.<flow>")
+        run: Function taking (rng, *setup result), the only part that is timed
+        setup: (Optional) Function taking rng, run before every call, not timed
+        repeat: (Optional) Calls to make instead of --repeat
+    """
+    return {'name': name, 'run': run, 'setup': setup, 'repeat': repeat}
+
+
+def operation_benchmarks(data, workdir):
+    """Every public function in operations/*, reads first"""
+    return [
+        # citizen_ops
+        bench("citizen_ops.get_all_citizens", lambda rng: citizen_ops.get_all_citizens(), repeat=5),
+        bench("citizen_ops.get_citizen_by_id", lambda rng: citizen_ops.get_citizen_by_id(data.citizen(rng))),
+        bench("citizen_ops.add_citizen", lambda rng: new_citizen(rng)),
+        bench("citizen_ops.update_citizen",
+              lambda rng: citizen_ops.update_citizen(data.citizen(rng), phone_number="0722000000")),
+        bench("citizen_ops.delete_citizen", lambda rng, citizen_id: citizen_ops.delete_citizen(citizen_id),
+              setup=lambda rng: (new_citizen(rng),)),
+
+        # officer_ops
+        bench("officer_ops.get_all_officers", lambda rng: officer_ops.get_all_officers(), repeat=10),
+        bench("officer_ops.get_officer_by_id", lambda rng: officer_ops.get_officer_by_id(data.officer(rng))),
+        bench("officer_ops.add_officer", lambda rng: new_officer(rng)),
+        bench("officer_ops.update_officer",
+              lambda rng: officer_ops.update_officer(data.officer(rng), phone_number="0733000000")),
+        bench("officer_ops.delete_officer", lambda rng, officer_id: officer_ops.delete_officer(officer_id),
+              setup=lambda rng: (new_officer(rng),)),
+
+        # case_ops: reads
+        bench("case_ops.get_all_cases", lambda rng: case_ops.get_all_cases(menu.CASES_PER_PAGE)),
+        bench("case_ops.iter_cases",
+              lambda rng: sum(1 for _ in zip(range(STREAMED_ROWS), case_ops.iter_cases(status=rng.choice(STATUSES)))),
+              repeat=10),
+        bench("case_ops.get_case_by_id", lambda rng: case_ops.get_case_by_id(data.case(rng))),
+        bench("case_ops.get_cases_by_citizen", lambda rng: case_ops.get_cases_by_citizen(data.citizen(rng))),
+        bench("case_ops.get_cases_by_status",
+              lambda rng: case_ops.get_cases_by_status(rng.choice(STATUSES), menu.CASES_PER_PAGE)),
+        bench("case_ops.get_cases_by_location",
+              lambda rng: case_ops.get_cases_by_location(rng.choice(PLACES), menu.CASES_PER_PAGE)),
+        bench("case_ops.get_cases_by_crime_type",
+              lambda rng: case_ops.get_cases_by_crime_type(rng.choice(CRIME_TYPES), menu.CASES_PER_PAGE)),
+        bench("case_ops.find_cases",
+              lambda rng: case_ops.find_cases(status=rng.choice(STATUSES), location=rng.choice(PLACES),
+                                              limit=menu.CASES_PER_PAGE)),
+        bench("case_ops.find_cases (resolved in a month)",
+              lambda rng: case_ops.find_cases(
+                  resolved_from=datetime.date.today() - datetime.timedelta(days=rng.randrange(30, 365)),
+                  resolved_to=datetime.date.today(), limit=menu.CASES_PER_PAGE)),
+        bench("case_ops.get_status_history", lambda rng: case_ops.get_status_history(data.case(rng))),
+        bench("case_ops.explain_find_cases",
+              lambda rng: case_ops.explain_find_cases(status=rng.choice(STATUSES), crime_type=rng.choice(CRIME_TYPES)),
+              repeat=10),
+        bench("case_ops.search_cases_by_location",
+              lambda rng: case_ops.search_cases_by_location(rng.choice(PLACES)[:5])),
+        bench("case_ops.search_cases_by_crime_type",
+              lambda rng: case_ops.search_cases_by_crime_type(rng.choice(CRIME_TYPES)[:5])),
+        bench("case_ops.search_cases",
+              lambda rng: case_ops.search_cases(rng.choice(SEARCH_WORDS), {'status': rng.choice(STATUSES + [None])},
+                                                menu.SEARCH_RESULTS_LIMIT)),
+
+        # case_update_ops: reads
+        bench("case_update_ops.get_updates_by_case",
+              lambda rng: case_update_ops.get_updates_by_case(data.case(rng))),
+        bench("case_update_ops.get_case_timeline",
+              lambda rng: case_update_ops.get_case_timeline(data.case(rng))),
+
+        # stats_ops
+        bench("stats_ops.get_case_counts", lambda rng: stats_ops.get_case_counts(
+            rng.choice(stats_ops.STAT_DIMENSIONS), menu.STATS_TOP_LIMIT)),
+        bench("stats_ops.get_total_cases", lambda rng: stats_ops.get_total_cases()),
+        bench("stats_ops.get_daily_counts", lambda rng: stats_ops.get_daily_counts(menu.STATS_DAYS)),
+        bench("stats_ops.get_officer_resolution_stats",
+              lambda rng: stats_ops.get_officer_resolution_stats(menu.STATS_TOP_LIMIT)),
+        bench("stats_ops.get_station_resolution_stats", lambda rng: stats_ops.get_station_resolution_stats()),
+
+        # assignment_ops: reads
+        bench("assignment_ops.suggest_officer",
+              lambda rng: assignment_ops.suggest_officer(f"{rng.choice(PLACES)} {rng.choice(AREAS)}"), repeat=20),
+        bench("assignment_ops.get_officer_workloads", lambda rng: assignment_ops.get_officer_workloads(), repeat=20),
+
+        # export_ops (the last 30 days of cases, so the file size does not depend on the scale much)
+        bench("export_ops.export_table",
+              lambda rng: export_ops.export_table(
+                  'cases', os.path.join(workdir, "cases.csv"), rng.choice(["csv", "jsonl"]),
+                  date_from=datetime.date.today() - datetime.timedelta(days=30)),
+              repeat=5),
+
+        # Writes
+        bench("case_ops.add_case", lambda rng: new_case(data, rng)),
+        bench("case_ops.add_cases_bulk",
+              lambda rng: case_ops.add_cases_bulk([(data.citizen(rng), rng.choice(CRIME_TYPES), "Bulk case",
+                                                    rng.choice(PLACES)) for _ in range(BULK_ROWS)]),
+              repeat=10),
+        bench("case_ops.assign_officer_to_case",
+              lambda rng: case_ops.assign_officer_to_case(data.case(rng), data.officer(rng))),
+        bench("case_ops.update_case_status",
+              lambda rng, case_id: case_ops.update_case_status(case_id, "Under Investigation", data.officer(rng)),
+              setup=lambda rng: (new_case(data, rng),)),
+        bench("case_update_ops.add_case_update",
+              lambda rng: case_update_ops.add_case_update(data.case(rng), data.officer(rng), rng.choice(UPDATE_NOTES))),
+        bench("case_update_ops.add_case_updates_bulk",
+              lambda rng: case_update_ops.add_case_updates_bulk(
+                  [(data.case(rng), data.officer(rng), rng.choice(UPDATE_NOTES)) for _ in range(BULK_ROWS)]),
+              repeat=10),
+        bench("import_ops.bulk_import",
+              lambda rng: import_ops.bulk_import(
+                  'citizens',
+                  [(n, {'full_name': f"Imported {n}", 'phone_number': "0744000000"}) for n in range(BULK_ROWS)],
+                  show_progress=False),
+              repeat=10),
+        bench("assignment_ops.auto_assign_case", lambda rng, case_id: assignment_ops.auto_assign_case(case_id),
+              setup=lambda rng: (new_case(data, rng),), repeat=20),
+        bench("assignment_ops.assign_pending_backlog", lambda rng: assignment_ops.assign_pending_backlog(),
+              setup=lambda rng: unassign_pending(BULK_ROWS), repeat=5),
+        bench("stats_ops.fold_statistics", lambda rng: stats_ops.fold_statistics(), repeat=3),
+        bench("stats_ops.rebuild_statistics", lambda rng: stats_ops.rebuild_statistics(), repeat=3),
+
+        # Deletes (of rows made in the untimed setup)
+        bench("case_ops.delete_case", lambda rng, case_id: case_ops.delete_case(case_id),
+              setup=lambda rng: (new_case(data, rng),)),
+        bench("case_update_ops.delete_case_update",
+              lambda rng, update_id: case_update_ops.delete_case_update(update_id),
+              setup=lambda rng: (case_update_ops.add_case_update(data.case(rng), data.officer(rng), "To delete"),)),
+        bench("archive_ops.archive_old_cases", lambda rng: archive_ops.archive_old_cases(),
+              setup=lambda rng: old_deleted_cases(data, rng, BULK_ROWS), repeat=5),
+    ]
+
+
+def menu_benchmarks(data):
+    """The main menu flows, driven with scripted answers to every prompt"""
+    def flow(function, answers):
+        # Answers are strings, or functions of rng (for random IDs)
+        return lambda rng: run_menu(function, [a(rng) if callable(a) else a for a in answers])
+
+    return [
+        bench("menu.view_all_cases", flow(menu.view_all_cases_public, ["n", "n", ""])),
+        bench("menu.citizen_my_cases", flow(menu.view_citizen_cases, [lambda rng: str(data.citizen(rng)), "n", ""])),
+        bench("menu.report_crime", flow(menu.report_crime, [
+            lambda rng: str(data.citizen(rng)), "Theft", "Phone stolen at the stage", "Nairobi CBD", ""])),
+        bench("menu.filter_by_status", flow(menu.filter_cases_by_status, [
+            lambda rng: str(rng.randint(1, 4)), "n", ""])),
+        bench("menu.search_cases", flow(menu.search_cases_menu, [lambda rng: rng.choice(SEARCH_WORDS), "", ""])),
+        bench("menu.find_cases", flow(menu.find_cases_menu, [
+            "1", lambda rng: rng.choice(PLACES), "", "", "", "", "", ""])),
+        bench("menu.add_case_update", flow(menu.add_update, [
+            lambda rng: str(data.case(rng)), lambda rng: str(data.officer(rng)), "Witness interviewed", ""])),
+        bench("menu.view_case_updates", flow(menu.view_case_updates, [lambda rng: str(data.case(rng)), ""])),
+        bench("menu.statistics", flow(menu.statistics_menu, [
+            "1", "", "2", "", "3", "", "4", "", "5", "", "6", "", "7"]), repeat=20),
+    ]
+
+
+def run_menu(function, answers):
+    """Run one menu screen, answering its prompts from `answers` (then Enter)"""
+    answers = iter(answers)
+    original_input, original_clear = builtins.input, menu.clear_screen
+    # The screen is not cleared: starting a shell for `clear` would dwarf the database work
+    builtins.input = lambda prompt="": next(answers, "")
+    menu.clear_screen = lambda: None
+    try:
+        function()
+    finally:
+        builtins.input, menu.clear_screen = original_input, original_clear
+
+
+# MEASURING
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb():
+    """Highest resident memory of this process so far, None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_benchmark(spec, repeat, rng):
+    """
+    Time one benchmark
+
+    Returns:
+        Dictionary of results (latencies in milliseconds)
+    """
+    calls = spec['repeat'] or repeat
+    samples = []
+    reset_query_stats()
+    # Messages printed by the operations would only slow the loop down
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(calls):
+            args = spec['setup'](rng) if spec['setup'] else ()
+            start = time.perf_counter()
+            spec['run'](rng, *(args or ()))
+            samples.append(time.perf_counter() - start)
+
+    # Statements made by the timed calls only (setups are profiled too, so
+    # count those of the operation itself when it has a name of its own)
+    operations = get_query_stats()['operations']
+    profiled = operations.get(spec['name'])
+    if profiled:
+        queries, errors = profiled['queries'] / profiled['calls'], profiled['errors']
+    else:
+        queries = sum(totals['queries'] for totals in operations.values()) / calls
+        errors = sum(totals['errors'] for totals in operations.values())
+
+    ordered = sorted(samples)
+    result = {
+        'name': spec['name'],
+        'calls': calls,
+        'mean_ms': round(sum(samples) / calls * 1000, 3),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+    for p in PERCENTILES:
+        result[f'p{p}_ms'] = round(percentile(ordered, p) * 1000, 3)
+    result['calls_per_second'] = round(calls / sum(samples), 1)
+    result['queries_per_call'] = round(queries, 2)
+    result['errors'] = errors
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def environment(args, counts):
+    """What was measured, and where (stored with the results)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    with read() as cur:
+        cur.execute("SHOW server_version;")
+        server_version = cur.fetchone()[0]
+    return {
+        'commit': commit,
+        'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'postgresql': server_version,
+        'machine': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'rows': counts,
+    }
+
+
+# REPORTING
+def print_results(results, baseline=None):
+    """Print the results as a table, with the p95 change against a baseline run"""
+    previous = {row['name']: row for row in baseline['results']} if baseline else {}
+    header = f"{'Operation':<45} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>10} {'queries':>8} {'RSS MB':>8}"
+    if previous:
+        header += f" {'p95 change':>11}"
+    print("\n" + header)
+    print("=" * len(header))
+    for row in results:
+        line = (f"{row['name'][:45]:<45} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                f"{row['calls_per_second']:>10,.1f} {row['queries_per_call']:>8} {row['peak_rss_mb'] or '-':>8}")
+        if previous:
+            before = previous.get(row['name'])
+            change = f"{(row['p95_ms'] / before['p95_ms'] - 1):+.0%}" if before and before['p95_ms'] else "new"
+            line += f" {change:>11}"
+        print(line)
+    print("=" * len(header))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every operation and menu flow on synthetic data")
+    parser.add_argument("--cases", type=int, default=10_000, help="Number of cases to generate (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the data and the arguments")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"Calls per operation (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--no-generate", action="store_true", help="Reuse the data already in the database")
+    parser.add_argument("--only", help="Only benchmarks whose name contains this text")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="Earlier results file to compare the p95 latencies with")
+    add_database_arguments(parser)
+    args = parser.parse_args()
+    if not use_scratch_database(args):
+        return 1
+
+    # Statements are counted but never EXPLAINed, so the timings stay honest
+    PROFILE_CONFIG['slow_query_ms'] = float('inf')
+    init_pool()
+    if not test_connection():
+        return 1
+
+    if args.no_generate:
+        counts = None
+    else:
+        counts = generate(args.cases, args.seed)
+    data = Dataset()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        specs = operation_benchmarks(data, workdir) + menu_benchmarks(data)
+        if args.only:
+            specs = [spec for spec in specs if args.only in spec['name']]
+
+        results = []
+        for spec in specs:
+            print(f"  {spec['name']} ...", end=" ", flush=True)
+            results.append(run_benchmark(spec, args.repeat, rng))
+            print(f"p95 {results[-1]['p95_ms']:.2f} ms")
+
+    report = {'environment': environment(args, counts or {'cases': data.case_count}), 'results': results}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f"✓ Results saved to {args.output}")
+
+    close_all_connections()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
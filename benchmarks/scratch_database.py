@@ -0,0 +1,62 @@
+"""
+The database the benchmarks are allowed to wipe
+
+Every benchmark (and the data generator) starts by dropping everything in its
+database (database.migrate.reset_schema), so none of them runs until told
+which database that may be:
+  - DB_BENCHMARK_NAME=<name>   use that database instead of DB_NAME
+  - --reset-database           wipe the DB_NAME database itself
+With neither, the benchmark stops before connecting.
+
+> DB_BENCHMARK_NAME=crime_reporting_bench python -m benchmarks.run_benchmarks
+> python -m benchmarks.bench_bulk_writes --reset-database
+"""
+import contextlib
+import io
+import os
+
+from database.connection import DB_CONFIG
+from database.migrate import reset_schema
+
+
+def add_database_arguments(parser):
+    """Add the --reset-database option to a benchmark's argument parser"""
+    parser.add_argument("--reset-database", action="store_true",
+                        help="Wipe the DB_NAME database (not needed when DB_BENCHMARK_NAME is set)")
+
+
+def use_scratch_database(args):
+    """
+    Point the connection settings at the database the benchmark may wipe
+    (call it before init_pool)
+
+    Args:
+        args: Parsed arguments (from a parser given add_database_arguments)
+
+    Returns:
+        True if there is such a database, False (after saying why) if not
+    """
+    name = os.getenv('DB_BENCHMARK_NAME')
+    if name:
+        DB_CONFIG['database'] = name
+        return True
+    if args.reset_database:
+        return True
+
+    print(f"✗ Benchmarks drop every table in their database. Set DB_BENCHMARK_NAME to a scratch "
+          f"database, or pass --reset-database to wipe {DB_CONFIG['database']}")
+    return False
+
+
+def recreate_schema():
+    """
+    reset_schema() with its messages hidden
+
+    Raises:
+        RuntimeError: If the schema could not be recreated (with the messages)
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        recreated = reset_schema()
+    if not recreated:
+        raise RuntimeError(f"could not recreate the schema\n{output.getvalue().strip()}")
@@ -0,0 +1,196 @@
+# Async (asyncio) connection handling, used by operations/async_ops.py
+# Mirrors database/connection.py: a pool plus transaction() / read() blocks,
+# built on psycopg 3 (psycopg2 has no asyncio support)
+import contextvars
+import os
+from contextlib import asynccontextmanager
+
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+from database.connection import DB_CONFIG, POOL_CONFIG, TransactionError
+
+# Async pool settings (uses .env values or defaults)
+# One process can serve many concurrent requests, so it gets its own limits
+ASYNC_POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_ASYNC_POOL_MIN', '2')),
+    'max_size': int(os.getenv('DB_ASYNC_POOL_MAX', '20')),
+}
+
+# This will hold the async connection pool
+async_pool = None
+
+# The open block of the current task (asyncio's version of a thread-local)
+_current_scope = contextvars.ContextVar('async_db_scope', default=None)
+
+
+class _Scope:
+    """The connection and cursor shared by nested blocks in one task"""
+    
+    def __init__(self, conn, cursor, read_only):
+        self.conn = conn
+        self.cursor = cursor
+        self.read_only = read_only
+        self.failed = False
+        # (callback, args) to run once the transaction has committed
+        self.on_commit = []
+
+
+async def _configure(conn):
+    """Every pooled connection runs in autocommit; transaction() adds BEGIN/COMMIT"""
+    await conn.set_autocommit(True)
+
+
+async def init_async_pool():
+    """Create (and open) the async connection pool"""
+    global async_pool
+    conninfo = make_conninfo(
+        host=DB_CONFIG['host'],
+        dbname=DB_CONFIG['database'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        port=DB_CONFIG['port'],
+    )
+    async_pool = AsyncConnectionPool(
+        conninfo,
+        min_size=ASYNC_POOL_CONFIG['min_size'],
+        max_size=ASYNC_POOL_CONFIG['max_size'],
+        # Same waiting / recycling rules as the sync pool
+        timeout=POOL_CONFIG['checkout_timeout'],
+        max_lifetime=POOL_CONFIG['max_age'],
+        max_idle=POOL_CONFIG['max_idle'],
+        # No health check query on every borrow (it costs a round trip);
+        # broken connections are thrown away when they are given back
+        configure=_configure,
+        open=False,
+    )
+    await async_pool.open(wait=True)
+    print("✓ Async database connection pool created successfully")
+
+
+async def close_async_pool():
+    """Close every connection in the async pool"""
+    global async_pool
+    if async_pool:
+        await async_pool.close()
+        async_pool = None
+        print("✓ All async database connections closed")
+
+
+def get_async_pool_stats():
+    """Live async pool statistics (psycopg_pool's counters), empty if no pool"""
+    if async_pool:
+        return async_pool.get_stats()
+    return {}
+
+
+def _require_pool():
+    if not async_pool:
+        raise TransactionError("async pool is not initialised, call init_async_pool() first")
+    return async_pool
+
+
+@asynccontextmanager
+async def _join(scope):
+    """Run a nested block on the surrounding block's cursor"""
+    try:
+        yield scope.cursor
+    except BaseException:
+        scope.failed = True
+        raise
+
+
+@asynccontextmanager
+async def transaction():
+    """
+    async with transaction() as cur:
+    Runs statements in one transaction, committed when the block ends.
+    Nested blocks in the same task join the outer transaction.
+    """
+    scope = _current_scope.get()
+    if scope is not None:
+        if scope.read_only:
+            raise TransactionError("transaction() can not be opened inside read()")
+        async with _join(scope) as cur:
+            yield cur
+        return
+    
+    async with _require_pool().connection() as conn:
+        async with conn.cursor() as cur:
+            scope = _Scope(conn, cur, read_only=False)
+            token = _current_scope.set(scope)
+            try:
+                # psycopg's transaction block sends BEGIN, then COMMIT or ROLLBACK
+                async with conn.transaction():
+                    yield cur
+                    if scope.failed:
+                        raise TransactionError("a statement in this transaction failed, nothing was saved")
+            finally:
+                _current_scope.reset(token)
+    
+    # Only reached when the commit worked
+    for callback, args in scope.on_commit:
+        callback(*args)
+
+
+@asynccontextmanager
+async def read():
+    """
+    async with read() as cur:
+    Runs read-only statements; each query is one round trip (autocommit).
+    Inside transaction() the block joins it and sees its changes.
+    """
+    scope = _current_scope.get()
+    if scope is not None:
+        async with _join(scope) as cur:
+            yield cur
+        return
+    
+    async with _require_pool().connection() as conn:
+        async with conn.cursor() as cur:
+            token = _current_scope.set(_Scope(conn, cur, read_only=True))
+            try:
+                yield cur
+            finally:
+                _current_scope.reset(token)
+
+
+def in_async_transaction():
+    """True if a transaction() block is open in this task"""
+    scope = _current_scope.get()
+    return scope is not None and not scope.read_only
+
+
+def on_async_commit(callback, *args):
+    """Call callback(*args) once this task's transaction has committed (see connection.on_commit)"""
+    if in_async_transaction():
+        _current_scope.get().on_commit.append((callback, args))
+    else:
+        callback(*args)
+
+
+async def run_pipeline(statements):
+    """
+    Run several independent queries on one connection in a single round trip
+    (psycopg pipeline mode: all queries are sent before any result is read)
+    
+    Args:
+        statements: List of (sql, values) pairs
+    
+    Returns:
+        List with the rows of each query (empty list for queries without rows)
+    """
+    async with _require_pool().connection() as conn:
+        cursors = []
+        async with conn.pipeline():
+            for sql, values in statements:
+                cur = conn.cursor()
+                await cur.execute(sql, values)
+                cursors.append(cur)
+        
+        # Leaving the pipeline block waited for every result
+        results = []
+        for cur in cursors:
+            results.append(await cur.fetchall() if cur.description else [])
+            await cur.close()
+        return results
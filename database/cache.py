@@ -0,0 +1,199 @@
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+
+from database.connection import DB_CONFIG
+
+# Cache settings (uses .env values or defaults)
+CACHE_CONFIG = {
+    # Most entries kept per table, least recently used are dropped first
+    'max_size': int(os.getenv('DB_CACHE_SIZE', '1000')),
+    # Seconds an entry is trusted before it is read again from the database
+    'ttl': float(os.getenv('DB_CACHE_TTL', '300')),
+    # Listen for changes made by other processes (see start_cache_listener)
+    'listen': os.getenv('DB_CACHE_LISTEN', '0').lower() in ('1', 'true', 'yes'),
+}
+
+# Channel the citizens/officers triggers notify on (see database/migrations)
+NOTIFY_CHANNEL = 'lookup_cache'
+
+
+class LookupCache:
+    """
+    A small thread-safe cache of rows looked up by ID
+    Entries expire after `ttl` seconds, and the least recently used entry
+    is dropped when more than `max_size` are stored
+    """
+    
+    def __init__(self, name, max_size, ttl):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, row)
+        self._lock = threading.Lock()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, key):
+        """
+        Look up a key
+        
+        Returns:
+            (True, row) if cached and fresh, (False, None) otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            
+            expires_at, row = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return False, None
+            
+            # Mark as most recently used
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, row
+    
+    def put(self, key, row):
+        """Store a row, dropping the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, row)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key):
+        """Forget one key (after it was updated or deleted)"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+    
+    def clear(self):
+        """Forget everything"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+    
+    def stats(self):
+        """Counters for this cache, including the hit rate (0.0 - 1.0)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+# One cache per table, shared by the whole process
+citizen_cache = LookupCache('citizens', CACHE_CONFIG['max_size'], CACHE_CONFIG['ttl'])
+officer_cache = LookupCache('officers', CACHE_CONFIG['max_size'], CACHE_CONFIG['ttl'])
+
+CACHES = {
+    'citizens': citizen_cache,
+    'officers': officer_cache,
+}
+
+
+def cache_key(record_id):
+    """
+    Turn an ID (int, or a string typed into a menu) into a cache key
+    
+    Returns:
+        The ID as an int, None if it is not a valid ID (then it is not cached)
+    """
+    try:
+        return int(record_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_cache_stats():
+    """Counters for every lookup cache, keyed by table name"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+# CROSS-PROCESS INVALIDATION
+#
+# Triggers on citizens and officers run pg_notify('lookup_cache', '<table>:<id>')
+# when a row is updated or deleted. The listener thread receives these
+# (after the writing transaction commits) and drops the matching entry, so
+# several processes sharing one database never serve stale rows for long.
+
+_listener_thread = None
+_listener_stop = threading.Event()
+
+
+def start_cache_listener():
+    """Start the background thread that applies invalidations from other processes"""
+    global _listener_thread
+    if _listener_thread and _listener_thread.is_alive():
+        return
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(target=_listen, name='cache-listener', daemon=True)
+    _listener_thread.start()
+
+
+def stop_cache_listener():
+    """Stop the background listener thread"""
+    _listener_stop.set()
+    if _listener_thread:
+        _listener_thread.join(timeout=5)
+
+
+def _listen():
+    """Listener loop: reconnects (and clears the caches) if the connection drops"""
+    while not _listener_stop.is_set():
+        conn = None
+        try:
+            # A dedicated connection: LISTEN needs one that stays open
+            conn = psycopg2.connect(**DB_CONFIG)
+            conn.autocommit = True
+            cur = conn.cursor()
+            cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+            
+            # Changes may have been missed while we were not listening
+            for cache in CACHES.values():
+                cache.clear()
+            
+            while not _listener_stop.is_set():
+                # Wait up to 1 second for a notification, then check for stop
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _apply_notification(conn.notifies.pop(0).payload)
+        
+        except Exception as e:
+            print(f"✗ Cache listener error: {e}")
+            # Back off before reconnecting
+            _listener_stop.wait(5)
+        
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def _apply_notification(payload):
+    """Handle one '<table>:<id>' notification"""
+    table, _, record_id = payload.partition(':')
+    cache = CACHES.get(table)
+    if cache is not None:
+        cache.invalidate(cache_key(record_id))
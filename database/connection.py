@@ -1,8 +1,21 @@
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import errors, extensions, pool
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import logging
 import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
+from database.rows import RowCursor
+
 # Load environment variables from the .env file
 load_dotenv()
 
@@ -15,82 +28,1456 @@ DB_CONFIG = {
     'port': os.getenv('DB_PORT', '5432')
 }
 
+# Connection pool settings (uses .env values or defaults)
+POOL_CONFIG = {
+    # Connections opened up front, and the most we will ever open
+    'min_size': int(os.getenv('DB_POOL_MIN', '1')),
+    'max_size': int(os.getenv('DB_POOL_MAX', '20')),
+    # Seconds a caller waits for a free connection before giving up
+    'checkout_timeout': float(os.getenv('DB_POOL_TIMEOUT', '5')),
+    # Connections older than this (seconds) are closed and replaced
+    'max_age': float(os.getenv('DB_POOL_MAX_AGE', '1800')),
+    # Connections unused for this long (seconds) are closed and replaced
+    'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+    # Connections unused for this long (seconds) are pinged before use
+    'validate_after': float(os.getenv('DB_POOL_VALIDATE_AFTER', '30')),
+}
+
+# Read replicas (uses .env values or defaults)
+REPLICA_CONFIG = {
+    # Streaming replicas (standbys) of the primary, separated by commas, e.g.
+    # "host=replica1,host=replica2 port=5433"; settings a DSN leaves out
+    # (user, password, database...) are the primary's. Empty = no replicas
+    'dsns': [dsn.strip() for dsn in os.getenv('DB_REPLICA_DSNS', '').split(',') if dsn.strip()],
+    # Replicas further behind the primary than this (seconds) are not read from
+    'max_lag': float(os.getenv('DB_REPLICA_MAX_LAG', '5')),
+    # Seconds between two checks of how far behind a replica is
+    'lag_check_interval': float(os.getenv('DB_REPLICA_LAG_CHECK', '1')),
+    # Seconds a replica that failed (or is not a standby) is left alone
+    'retry_after': float(os.getenv('DB_REPLICA_RETRY_AFTER', '30')),
+}
+
+# Upper bounds (seconds) of the checkout wait time histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+# Query profiling settings (uses .env values or defaults)
+PROFILE_CONFIG = {
+    # Record latency, rows, pool wait and errors of every operation
+    'enabled': os.getenv('DB_PROFILING', '1') == '1',
+    # Statements slower than this (milliseconds) are logged with their plan
+    'slow_query_ms': float(os.getenv('DB_SLOW_QUERY_MS', '200')),
+    # Run EXPLAIN on slow statements (costs one extra round trip each)
+    'explain_slow': os.getenv('DB_EXPLAIN_SLOW', '1') == '1',
+    # Log slow statements with their values (names, phone numbers, notes...);
+    # off by default, so logs and metrics files only hold the query text
+    'log_values': os.getenv('DB_SLOW_QUERY_VALUES', '0') == '1',
+    # How many slow statements are kept for get_query_stats()
+    'slow_query_history': int(os.getenv('DB_SLOW_QUERY_HISTORY', '50')),
+    # (Optional) File the statistics are saved to when the program exits
+    # (.prom for the Prometheus text format, anything else for JSON)
+    'metrics_file': os.getenv('DB_METRICS_FILE'),
+}
+
+# Server-side prepared statements for the hot queries (see prepare_statement)
+PREPARE_CONFIG = {
+    # Parse and plan the registered statements once per connection instead of
+    # on every call (turn off behind a pooler that does not keep sessions,
+    # e.g. PgBouncer in transaction mode)
+    'enabled': os.getenv('DB_PREPARED_STATEMENTS', '1') == '1',
+}
+
+# Upper bounds (seconds) of the operation latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float('inf'))
+
 # This will hold our connection pool
 connection_pool = None
 
+# And this one pool per read replica (see READ REPLICAS)
+replicas = []
+
+
+class PoolTimeoutError(pool.PoolError):
+    """Raised when no connection became free within the checkout timeout"""
+
+
+class PreparedConnection(extensions.connection):
+    """A connection that remembers which registered statements are prepared on it"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of PostgreSQL connections
+
+    - Callers wait (up to a timeout) for a free connection instead of failing
+    - Connections are checked before they are handed out
+    - Old or long-idle connections are closed and replaced
+    - Live statistics are available from stats()
+    """
+
+    def __init__(self, min_size, max_size, checkout_timeout, max_age,
+                 max_idle, validate_after, **connect_kwargs):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self.validate_after = validate_after
+        self._connect_kwargs = connect_kwargs
+
+        # One lock protects everything below; waiters sleep on the condition
+        self._cond = threading.Condition()
+        self._idle = deque()       # (conn, created_at, last_used), newest on the right
+        self._in_use = {}          # id(conn) -> created_at
+        self._opened = 0           # connections open or being opened
+        self._closed = False
+
+        # Statistics
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._wait_counts = [0] * len(WAIT_BUCKETS)
+        self._wait_total = 0.0
+
+        # Open the minimum number of connections now, so errors show up early
+        # (if one fails, the ones already opened are closed, not leaked)
+        try:
+            for _ in range(min_size):
+                conn = self._connect()
+                self._idle.append((conn, time.monotonic(), time.monotonic()))
+                self._opened += 1
+        except Exception:
+            self.closeall()
+            raise
+
+    def _connect(self):
+        return psycopg2.connect(**self._connect_kwargs)
+
+    def getconn(self, timeout=None):
+        """
+        Borrow a connection, waiting up to `timeout` seconds for one to free up
+
+        Raises:
+            PoolTimeoutError if none became free in time
+            psycopg2.Error if a new connection could not be opened
+        """
+        if timeout is None:
+            timeout = self.checkout_timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            conn = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        self._checkout_failures += 1
+                        raise pool.PoolError("connection pool is closed")
+                    if self._idle:
+                        # Most recently used first: it is the most likely to be healthy
+                        conn, created_at, last_used = self._idle.pop()
+                        break
+                    if self._opened < self.max_size:
+                        # Reserve a slot now, open the connection outside the lock
+                        self._opened += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._checkout_failures += 1
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"no free connection after {timeout:.1f}s "
+                            f"({self.max_size} in use)"
+                        )
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                # Open a brand new connection in the slot we reserved
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opened -= 1
+                        self._checkout_failures += 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+            elif not self._is_usable(conn, created_at, last_used):
+                # Throw it away and try again with another connection
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._in_use[id(conn)] = created_at
+                self._checkouts += 1
+                self._record_wait(time.monotonic() - start)
+            return conn
+
+    def _is_usable(self, conn, created_at, last_used):
+        """Check an idle connection before handing it out"""
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if now - created_at > self.max_age or now - last_used > self.max_idle:
+            with self._cond:
+                self._recycled += 1
+            return False
+
+        # Recently used connections are trusted; older ones get a quick ping,
+        # which also tells which prepared statements the server still has
+        # (a reset session forgets them, see execute_prepared)
+        if now - last_used > self.validate_after:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT name FROM pg_prepared_statements;")
+                if isinstance(conn, PreparedConnection):
+                    conn.prepared &= {row[0] for row in cur.fetchall()}
+                cur.close()
+                conn.rollback()
+            except Exception:
+                return False
+        return True
+
+    def putconn(self, conn, close=False):
+        """Give a borrowed connection back to the pool"""
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+        if created_at is None:
+            # Not one of ours (or returned twice)
+            return
+
+        # Never hand out a connection with a transaction still open
+        if not close and not conn.closed:
+            status = conn.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+
+        if close or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        """Close a connection and free its slot for a new one"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def _record_wait(self, waited):
+        """Add one checkout wait time to the histogram (lock must be held)"""
+        self._wait_total += waited
+        for i, upper in enumerate(WAIT_BUCKETS):
+            if waited <= upper:
+                self._wait_counts[i] += 1
+                break
+
+    def closeall(self):
+        """Close every idle connection and stop handing out new ones"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """
+        Snapshot of the pool's live statistics
+
+        Returns:
+            Dictionary with connection counts, checkout counts and
+            the checkout wait time histogram (bucket upper bound -> count)
+        """
+        with self._cond:
+            return {
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'opened': self._opened,
+                'max_size': self.max_size,
+                'checkouts': self._checkouts,
+                'checkout_failures': self._checkout_failures,
+                'timeouts': self._timeouts,
+                'recycled': self._recycled,
+                'wait_seconds_total': self._wait_total,
+                'wait_histogram': {
+                    ('+Inf' if upper == float('inf') else str(upper)): count
+                    for upper, count in zip(WAIT_BUCKETS, self._wait_counts)
+                },
+            }
+
+
 def init_pool():
-    """Create a pool of database connections"""
+    """
+    Create a pool of database connections (and one per read replica)
+
+    Returns:
+        True if the pool was created, False if not (the replicas are optional:
+        if one can not be set up, reads go to the primary)
+    """
     global connection_pool
     try:
-        connection_pool = psycopg2.pool.SimpleConnectionPool(1, 20, **DB_CONFIG)
+        # Every cursor builds the operations' row types (see database/rows.py)
+        # and records its statements for the query profiler
+        cursor_factory = ProfilingCursor if PROFILE_CONFIG['enabled'] else RowCursor
+        connection_pool = ConnectionPool(**POOL_CONFIG, **DB_CONFIG, cursor_factory=cursor_factory,
+                                         connection_factory=PreparedConnection)
         if connection_pool:
             print("✓ Database connection pool created successfully")
     except Exception as e:
         print(f"✗ Error creating connection pool: {e}")
+        connection_pool = None
+        return False
+
+    replicas.clear()
+    for dsn in REPLICA_CONFIG['dsns']:
+        try:
+            replicas.append(Replica(dsn, cursor_factory))
+        except Exception as e:
+            print(f"✗ Error in replica settings {dsn!r}: {e}")
+    if replicas:
+        print(f"✓ Reading from {len(replicas)} replica(s): {', '.join(r.name for r in replicas)}")
+    return True
 
-def get_connection():
-    """Get one connection from the pool"""
+def get_connection(timeout=None):
+    """
+    Get one connection from the pool
+    Waits up to `timeout` seconds (default DB_POOL_TIMEOUT) if all are busy
+    """
     try:
         if connection_pool:
-            return connection_pool.getconn()
+            return connection_pool.getconn(timeout)
     except Exception as e:
         print(f"✗ Error getting connection: {e}")
         return None
 
 def release_connection(conn):
-    """Return a connection back to the pool"""
+    """Return a connection back to the pool (the replica's pool if it came from one)"""
     try:
-        if connection_pool and conn:
+        replica = getattr(conn, 'replica', None)
+        if replica is not None:
+            replica.pool.putconn(conn)
+        elif connection_pool and conn:
             connection_pool.putconn(conn)
     except Exception as e:
         print(f"✗ Error releasing connection: {e}")
 
 def close_all_connections():
-    """Close every connection in the pool"""
+    """Close every connection in the pool and the replica pools"""
     try:
+        for replica in replicas:
+            replica.pool.closeall()
         if connection_pool:
             connection_pool.closeall()
             print("✓ All database connections closed")
     except Exception as e:
         print(f"✗ Error closing connections: {e}")
 
-def test_connection():
-    """Check if the database connection works"""
-    conn = get_connection()
-    if conn:
+def get_pool_stats():
+    """Live pool statistics (see ConnectionPool.stats), empty if no pool"""
+    if connection_pool:
+        return connection_pool.stats()
+    return {}
+
+
+# READ REPLICAS
+#
+# Listings and searches that may show data a moment old read with
+# `read(replica=True)` (or `stream(..., replica=True)`). Such a block gets a
+# connection to a replica (in turn, when there are several) only if:
+#   - the replica answered, and is a standby
+#   - it is at most REPLICA_CONFIG['max_lag'] seconds behind the primary
+#     (checked at most every 'lag_check_interval' seconds)
+#   - it has replayed everything this session committed (read your writes)
+#   - its pool has a free connection right now
+# Otherwise the block reads from the primary, so a slow, lagging or broken
+# replica never makes a read fail or wait.
+#
+# Read your writes: when a transaction() commits, the session (thread or
+# asyncio task) remembers the primary's WAL position; replicas that have not
+# replayed up to it are skipped for this session until they have. So a
+# citizen who reports a case sees it in the next listing.
+
+# How far behind the primary a replica is; lag is 0 while it is streaming and
+# has replayed all it received, else the age of the last transaction replayed
+_REPLICA_STATUS_QUERY = """
+    SELECT
+        pg_is_in_recovery(),
+        pg_last_wal_replay_lsn()::text,
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+                  AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming')
+             THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END;
+"""
+
+# WAL position of this session's latest commit on the primary (0 = none yet)
+_written_lsn = contextvars.ContextVar('written_lsn', default=0)
+
+# Picks the replica tried first, so reads are spread over all of them
+_replica_turn = itertools.count()
+
+# Reads that asked for a replica but went to the primary
+_replica_fallbacks = 0
+
+
+def _lsn_value(text):
+    """A WAL position ('16/B374D848') as a number that can be compared"""
+    high, low = text.split('/')
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+class ReplicaConnection(extensions.connection):
+    """A connection to a read replica; knows its Replica so it can be given back"""
+
+    replica = None
+
+
+class Replica:
+    """One read replica: its connection pool and how far behind it was last seen"""
+
+    def __init__(self, dsn, cursor_factory):
+        # The replica's own settings win, the rest is the primary's
+        settings = dict(DB_CONFIG)
+        settings['dbname'] = settings.pop('database')
+        settings.update(extensions.parse_dsn(dsn))
+        self.name = f"{settings.get('host')}:{settings.get('port')}"
+
+        # Same limits as the primary, but nothing is opened up front: a
+        # replica that is down must not stop the program from starting
+        self.pool = ConnectionPool(**{**POOL_CONFIG, 'min_size': 0}, **settings,
+                                   cursor_factory=cursor_factory, connection_factory=ReplicaConnection)
+
+        self._lock = threading.Lock()
+        self.lag = None             # seconds behind the primary, None = unknown
+        self.replay_lsn = 0         # WAL position it had replayed at the last check
+        self.checked_at = None      # time.monotonic() of the last check
+        self.down_until = 0.0       # not used again before this time
+        self.reads = 0
+        self.lagging = 0            # reads sent elsewhere because it was behind
+        self.failures = 0
+
+    def getconn(self, written_lsn):
+        """
+        A connection to this replica if it is fit to read from
+
+        Args:
+            written_lsn: WAL position the session's reads must include
+
+        Returns:
+            A connection, None if this replica should not be used now
+        """
+        now = time.monotonic()
+        if now < self.down_until:
+            return None
+        checked = self.checked_at is not None and now - self.checked_at < REPLICA_CONFIG['lag_check_interval']
+        if checked and not self._fit(0):
+            # Known to be too far behind: no need to ask again yet
+            return self._skip()
+
         try:
-            cur = conn.cursor()
-            cur.execute("SELECT version();")
-            db_version = cur.fetchone()
-            print(f"✓ Connected to PostgreSQL: {db_version[0]}")
-            cur.close()
-            release_connection(conn)
-            return True
+            # Never wait: if every replica connection is busy the primary reads
+            conn = self.pool.getconn(timeout=0)
+        except PoolTimeoutError:
+            return None
         except Exception as e:
-            print(f"✗ Connection test failed: {e}")
-            if conn:
-                release_connection(conn)
-            return False
-    return False
+            self._mark_down(e)
+            return None
 
-def execute_schema():
-    """Run the schema.sql file to create tables"""
-    conn = get_connection()
-    if conn:
+        # Check again when the last answer is old, or older than the write
+        # this session wants to see (it has most likely been replayed since)
+        if not checked or self.replay_lsn < written_lsn:
+            try:
+                standby = self._check(conn)
+            except Exception as e:
+                self.pool.putconn(conn, close=True)
+                self._mark_down(e)
+                return None
+            if not standby:
+                self.pool.putconn(conn)
+                self._mark_down("not a standby (it is not replicating from a primary)")
+                return None
+
+        if not self._fit(written_lsn):
+            self.pool.putconn(conn)
+            return self._skip()
+
+        conn.replica = self
+        with self._lock:
+            self.reads += 1
+        return conn
+
+    def _fit(self, written_lsn):
+        """Close enough behind the primary, and has the session's latest write"""
+        return (self.lag is not None and self.lag <= REPLICA_CONFIG['max_lag']
+                and self.replay_lsn >= written_lsn)
+
+    def _check(self, conn):
+        """
+        Ask the replica how far behind it is (a plain cursor: not profiled)
+
+        Returns:
+            False if the server is not a standby at all
+        """
+        cur = conn.cursor(cursor_factory=extensions.cursor)
         try:
-            cur = conn.cursor()
-            with open('database/schema.sql', 'r') as f:
-                schema = f.read()
-            cur.execute(schema)
-            conn.commit()
-            print("✓ Database schema created successfully")
+            cur.execute(_REPLICA_STATUS_QUERY)
+            in_recovery, replay_lsn, lag = cur.fetchone()
+        finally:
             cur.close()
-            release_connection(conn)
-            return True
-        except Exception as e:
-            print(f"✗ Error creating schema: {e}")
             conn.rollback()
-            if conn:
-                release_connection(conn)
+        if not in_recovery:
             return False
-    return False
+
+        with self._lock:
+            self.replay_lsn = _lsn_value(replay_lsn) if replay_lsn else 0
+            self.lag = float(lag) if lag is not None else None
+            self.checked_at = time.monotonic()
+        return True
+
+    def _skip(self):
+        with self._lock:
+            self.lagging += 1
+        return None
+
+    def _mark_down(self, error):
+        """Leave this replica alone for a while"""
+        with self._lock:
+            self.failures += 1
+            self.lag = None
+            self.checked_at = None
+            self.down_until = time.monotonic() + REPLICA_CONFIG['retry_after']
+        logger.warning("Replica %s not used for %.0fs: %s", self.name, REPLICA_CONFIG['retry_after'],
+                       str(error).strip())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'lag_seconds': self.lag,
+                'down': time.monotonic() < self.down_until,
+                'reads': self.reads,
+                'lagging': self.lagging,
+                'failures': self.failures,
+                'pool': self.pool.stats(),
+            }
+
+
+def _replica_connection():
+    """
+    A connection to the next replica that is fit to read from
+
+    Returns:
+        A connection, None if no replica is fit (read from the primary)
+    """
+    global _replica_fallbacks
+    if not replicas:
+        return None
+    written_lsn = _written_lsn.get()
+    first = next(_replica_turn)
+    for i in range(len(replicas)):
+        conn = replicas[(first + i) % len(replicas)].getconn(written_lsn)
+        if conn is not None:
+            return conn
+    _replica_fallbacks += 1
+    return None
+
+
+def _remember_write(conn):
+    """After a commit: this session's replica reads must include it from now on"""
+    cur = conn.cursor(cursor_factory=extensions.cursor)
+    try:
+        cur.execute("SELECT pg_current_wal_lsn()::text;")
+        lsn = _lsn_value(cur.fetchone()[0])
+        conn.rollback()
+    except psycopg2.Error:
+        # The connection broke right after the commit: nothing to go on
+        return
+    finally:
+        cur.close()
+    if lsn > _written_lsn.get():
+        _written_lsn.set(lsn)
+
+
+def get_replica_stats():
+    """
+    Live read replica statistics
+
+    Returns:
+        Dictionary with
+          fallbacks: reads that asked for a replica but went to the primary
+          replicas: {host:port: {lag_seconds, down, reads, lagging, failures, pool}}
+    """
+    return {
+        'fallbacks': _replica_fallbacks,
+        'replicas': {replica.name: replica.stats() for replica in replicas},
+    }
+
+
+# TRANSACTIONS
+#
+# Operations run inside `with transaction() as cur:` (writes) or
+# `with read() as cur:` (reads). If one of these blocks is already open on
+# this thread, the inner block reuses its connection and cursor, so several
+# operations can share one connection and one commit:
+#
+#     with transaction():
+#         citizen_id = add_citizen(...)
+#         add_case(citizen_id, ...)       # same connection, same commit
+
+class TransactionError(Exception):
+    """Raised when a transaction has to be rolled back or can not be started"""
+
+
+class _Scope:
+    """The connection and cursor shared by nested blocks on one thread"""
+
+    def __init__(self, conn, cursor, read_only):
+        self.conn = conn
+        self.cursor = cursor
+        self.read_only = read_only
+        self.failed = False
+        # (callback, args) to run once the transaction has committed
+        self.on_commit = []
+
+
+# Each thread has its own open block (if any)
+_local = threading.local()
+
+
+def _current_scope():
+    return getattr(_local, 'scope', None)
+
+
+def in_transaction():
+    """True if a transaction() block is open on this thread"""
+    scope = _current_scope()
+    return scope is not None and not scope.read_only
+
+
+def on_commit(callback, *args):
+    """
+    Call callback(*args) once the open transaction has committed
+    (e.g. to drop a cached row only when the change is really saved)
+
+    Inside nested blocks this waits for the outermost one; if the
+    transaction rolls back the callback is never called. Outside a
+    transaction it is called right away.
+    """
+    if in_transaction():
+        _current_scope().on_commit.append((callback, args))
+    else:
+        callback(*args)
+
+
+def _borrow(replica=False):
+    """
+    Get a connection from the pool, raising instead of returning None
+    With replica=True it comes from a read replica when one is fit (see
+    READ REPLICAS). The registered statements it does not have yet are
+    prepared on it first
+    """
+    call = _current_call.get()
+    if not connection_pool:
+        if call is not None:
+            call.failed = True
+        raise TransactionError("connection pool is not initialised, call init_pool() first")
+    if call is None:
+        conn = (replica and _replica_connection()) or connection_pool.getconn()
+    else:
+        # Time spent waiting for a free connection counts against the operation
+        start = time.perf_counter()
+        try:
+            conn = (replica and _replica_connection()) or connection_pool.getconn()
+        except Exception:
+            call.failed = True
+            raise
+        finally:
+            call.pool_wait += time.perf_counter() - start
+
+    _prepare_statements(conn)
+    return conn
+
+
+@contextmanager
+def _join(scope):
+    """Run a nested block on the surrounding block's cursor"""
+    try:
+        yield scope.cursor
+    except GeneratorExit:
+        # A generator stopped early (e.g. a loop over iter_cases), not an error
+        raise
+    except BaseException:
+        # The outer block can no longer commit what it has done so far
+        scope.failed = True
+        raise
+
+
+@contextmanager
+def transaction():
+    """
+    Run statements in one transaction, committed when the block ends
+
+    Rolls back (and re-raises) if the block raises. Nested blocks join the
+    outer transaction; if a nested block fails, the outer one rolls back.
+
+    Yields:
+        A cursor on the transaction's connection
+    """
+    scope = _current_scope()
+    if scope is not None:
+        if scope.read_only:
+            raise TransactionError("transaction() can not be opened inside read()")
+        with _join(scope) as cur:
+            yield cur
+        return
+
+    conn = _borrow()
+    cur = conn.cursor()
+    scope = _Scope(conn, cur, read_only=False)
+    _local.scope = scope
+    try:
+        yield cur
+        if scope.failed:
+            raise TransactionError("a statement in this transaction failed, nothing was saved")
+        conn.commit()
+        if replicas:
+            _remember_write(conn)
+    except BaseException:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        _local.scope = None
+        cur.close()
+        release_connection(conn)
+
+    # Only reached when the commit worked
+    for callback, args in scope.on_commit:
+        callback(*args)
+
+
+@contextmanager
+def read(replica=False):
+    """
+    Run read-only statements
+
+    Outside a transaction the connection is put in autocommit mode, so each
+    query is a single round trip (no BEGIN / ROLLBACK around it). Inside
+    transaction() the block joins it and sees its uncommitted changes.
+
+    Args:
+        replica: Read from a read replica when one is fit (see READ REPLICAS);
+                 only for reads that may be a moment behind other sessions
+
+    Yields:
+        A cursor
+    """
+    scope = _current_scope()
+    if scope is not None:
+        with _join(scope) as cur:
+            yield cur
+        return
+
+    conn = _borrow(replica)
+    conn.autocommit = True
+    cur = conn.cursor()
+    _local.scope = _Scope(conn, cur, read_only=True)
+    try:
+        yield cur
+    finally:
+        _local.scope = None
+        cur.close()
+        try:
+            conn.autocommit = False
+        except Exception:
+            pass
+        release_connection(conn)
+
+
+@contextmanager
+def stream(name, itersize=2000, replica=False):
+    """
+    Open a named (server-side) cursor for reading large results in batches
+
+    Args:
+        name: Name of the cursor on the server
+        itersize: Rows fetched per round trip while iterating
+        replica: Read from a read replica when one is fit (see read())
+
+    Yields:
+        A named cursor; iterate over it to receive the rows
+    """
+    scope = _current_scope()
+    if scope is not None and not scope.read_only:
+        # Inside a transaction: stream on its connection, so we see its changes
+        cur = scope.conn.cursor(name=name)
+        cur.itersize = itersize
+        try:
+            with _join(scope):
+                yield cur
+        finally:
+            if not cur.closed:
+                cur.close()
+        return
+
+    # Named cursors need a transaction, so this one gets its own connection
+    conn = _borrow(replica)
+    cur = conn.cursor(name=name)
+    cur.itersize = itersize
+    try:
+        yield cur
+    finally:
+        try:
+            cur.close()
+            conn.rollback()
+        except Exception:
+            pass
+        release_connection(conn)
+
+
+# PREPARED STATEMENTS
+#
+# The hot queries are registered once, when their module is imported, and run
+# with execute_prepared(). Every connection PREPAREs them the first time it is
+# borrowed (see _borrow), so PostgreSQL parses each one once per connection
+# and, after a few calls, keeps reusing one plan instead of planning every
+# call. Whenever a statement is not prepared on the connection at hand (it
+# failed to prepare, the session was reset, PREPARE_CONFIG is off), it simply
+# runs as plain SQL.
+#
+#     _GET_CITIZEN = prepare_statement("get_citizen_by_id", "SELECT ... WHERE citizen_id = %s;")
+#     ...
+#     with read() as cur:
+#         execute_prepared(cur, _GET_CITIZEN, (citizen_id,))
+
+# Registered statements: name -> PreparedStatement
+_prepared_statements = {}
+
+# A value placeholder (%s) or an escaped percent sign (%%) in a query
+_PLACEHOLDER = re.compile(r'%([s%])')
+
+
+class PreparedStatement:
+    """One registered query, as plain SQL and as its PREPARE / EXECUTE statements"""
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+
+        # PREPARE numbers the values ($1, $2, ...) where psycopg2 uses %s
+        count = 0
+
+        def number(match):
+            nonlocal count
+            if match.group(1) == '%':
+                return '%'
+            count += 1
+            return f"${count}"
+
+        body = _PLACEHOLDER.sub(number, sql).strip().rstrip(';')
+        self.prepare_sql = f"PREPARE {name} AS {body};"
+        self.execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * count)});" if count else f"EXECUTE {name};"
+
+
+def prepare_statement(name, sql):
+    """
+    Register a hot query to be prepared on every connection
+
+    Args:
+        name: Statement name, unique and a plain identifier
+        sql: The query, with %s placeholders for its values
+
+    Returns:
+        The name, for execute_prepared()
+    """
+    if name in _prepared_statements:
+        raise ValueError(f"prepared statement {name} is already registered")
+    _prepared_statements[name] = PreparedStatement(name, sql)
+    return name
+
+
+def execute_prepared(cur, name, values=(), row_type=None):
+    """
+    Run a registered statement on this cursor: its prepared version when the
+    connection has it, the plain SQL otherwise
+
+    Args:
+        cur: Cursor from transaction() / read()
+        name: Name given to prepare_statement()
+        values: Values for the query's %s placeholders
+        row_type: (Optional) Type of the rows it returns (see database/rows.py)
+    """
+    statement = _prepared_statements[name]
+    conn = cur.connection
+    if not PREPARE_CONFIG['enabled'] or name not in getattr(conn, 'prepared', ()):
+        cur.execute(statement.sql, values, row_type=row_type)
+        return
+
+    try:
+        cur.execute(statement.execute_sql, values, row_type=row_type)
+    except errors.InvalidSqlStatementName:
+        # The server forgot its prepared statements (e.g. the session was
+        # reset): prepare them again on the next checkout. Outside a
+        # transaction nothing was aborted, so the plain SQL can run right away
+        conn.prepared.clear()
+        if not conn.autocommit:
+            raise
+        cur.execute(statement.sql, values, row_type=row_type)
+
+
+def _prepare_statements(conn):
+    """PREPARE the registered statements this connection does not have yet"""
+    if (not PREPARE_CONFIG['enabled'] or not isinstance(conn, PreparedConnection)
+            or len(conn.prepared) == len(_prepared_statements)):
+        return
+
+    # Autocommit: PREPARE needs no transaction, and one failing must not
+    # abort the others; a plain cursor keeps them out of the statistics
+    autocommit = conn.autocommit
+    try:
+        conn.autocommit = True
+        cur = conn.cursor(cursor_factory=extensions.cursor)
+        try:
+            for name, statement in _prepared_statements.items():
+                if name in conn.prepared:
+                    continue
+                try:
+                    cur.execute(statement.prepare_sql)
+                    conn.prepared.add(name)
+                except errors.DuplicatePreparedStatement:
+                    conn.prepared.add(name)
+                except psycopg2.Error as e:
+                    # e.g. its table does not exist yet: it runs as plain SQL
+                    # for now, and is tried again on the next checkout
+                    if conn.closed:
+                        return
+                    logger.info("Could not prepare %s: %s", name, e)
+        finally:
+            cur.close()
+            conn.autocommit = autocommit
+    except psycopg2.Error:
+        # A broken connection: the statement that uses it will report it
+        pass
+
+
+# QUERY PROFILING
+#
+# Every operation function is wrapped with @profiled, and every cursor from
+# the pool is a ProfilingCursor. Together they record, per operation:
+#   calls, errors, total / slowest latency (and a histogram), statements run,
+#   rows returned or changed, and time spent waiting for a pool connection.
+# Statements slower than PROFILE_CONFIG['slow_query_ms'] are logged with
+# their EXPLAIN plan. Read the numbers with get_query_stats(), or export them
+# with export_prometheus() / write_query_stats().
+#
+#     @profiled
+#     def get_case_by_id(case_id):      # recorded as "case_ops.get_case_by_id"
+#         ...
+
+# Slow statements are logged here (shown on stderr unless logging is configured)
+logger = logging.getLogger(__name__)
+
+# Statements that EXPLAIN accepts
+_EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete', 'values', 'execute')
+
+# Name under which statements outside any @profiled function are recorded
+UNPROFILED = "other"
+
+
+class _Call:
+    """What one call of an operation did (filled in by the cursor and _borrow)"""
+
+    __slots__ = ('name', 'queries', 'rows', 'query_seconds', 'pool_wait', 'failed', 'slow')
+
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.rows = 0
+        self.query_seconds = 0.0
+        self.pool_wait = 0.0
+        self.failed = False
+        self.slow = 0
+
+
+# The operation running right now (per thread, like the transaction scope)
+_current_call = contextvars.ContextVar('current_call', default=None)
+
+
+class QueryStats:
+    """Thread-safe totals per operation name, plus the latest slow statements"""
+
+    def __init__(self, history):
+        self._lock = threading.Lock()
+        self._operations = {}
+        self._slow = deque(maxlen=history)
+
+    def _totals(self, name):
+        """The totals of one operation, created on first use (lock must be held)"""
+        totals = self._operations.get(name)
+        if totals is None:
+            totals = self._operations[name] = {
+                'calls': 0,
+                'errors': 0,
+                'seconds_total': 0.0,
+                'seconds_max': 0.0,
+                'queries': 0,
+                'query_seconds_total': 0.0,
+                'rows': 0,
+                'pool_wait_seconds_total': 0.0,
+                'slow_queries': 0,
+                'latency_counts': [0] * len(LATENCY_BUCKETS),
+            }
+        return totals
+
+    def record_call(self, call, seconds):
+        """Add one finished operation call"""
+        with self._lock:
+            totals = self._totals(call.name)
+            totals['calls'] += 1
+            totals['errors'] += call.failed
+            totals['seconds_total'] += seconds
+            totals['seconds_max'] = max(totals['seconds_max'], seconds)
+            totals['queries'] += call.queries
+            totals['query_seconds_total'] += call.query_seconds
+            totals['rows'] += call.rows
+            totals['pool_wait_seconds_total'] += call.pool_wait
+            totals['slow_queries'] += call.slow
+            for i, upper in enumerate(LATENCY_BUCKETS):
+                if seconds <= upper:
+                    totals['latency_counts'][i] += 1
+                    break
+
+    def record_slow(self, entry):
+        """Keep one slow statement (the oldest is dropped when full)"""
+        with self._lock:
+            self._slow.append(entry)
+
+    def snapshot(self):
+        """Copy of every total, safe to read while other threads keep recording"""
+        with self._lock:
+            operations = {}
+            for name, totals in sorted(self._operations.items()):
+                copy = dict(totals)
+                copy['latency_histogram'] = {
+                    ('+Inf' if upper == float('inf') else str(upper)): count
+                    for upper, count in zip(LATENCY_BUCKETS, copy.pop('latency_counts'))
+                }
+                operations[name] = copy
+            return {'operations': operations, 'slow_queries': list(self._slow)}
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            self._slow.clear()
+
+
+query_stats = QueryStats(PROFILE_CONFIG['slow_query_history'])
+
+
+def profiled(func=None, *, name=None):
+    """
+    Record every call of an operation function in query_stats
+
+    Use as @profiled (named "<module>.<function>") or @profiled(name="...").
+    Works for plain functions and generators (a generator is timed while it
+    runs, not while the caller handles the rows it yields). A call counts as
+    an error if it raised, or if any of its statements or connection
+    checkouts failed, even when the function caught the exception itself.
+    """
+    if func is None:
+        return lambda f: profiled(f, name=name)
+
+    if name is None:
+        name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if not PROFILE_CONFIG['enabled']:
+                yield from func(*args, **kwargs)
+                return
+            call = _Call(name)
+            elapsed = 0.0
+            generator = func(*args, **kwargs)
+            try:
+                while True:
+                    # Only the generator's own work is attributed to the call
+                    token = _current_call.set(call)
+                    start = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    except BaseException:
+                        call.failed = True
+                        raise
+                    finally:
+                        elapsed += time.perf_counter() - start
+                        _current_call.reset(token)
+                    yield item
+            finally:
+                # Stopped early: let the generator clean up under this call too
+                token = _current_call.set(call)
+                try:
+                    generator.close()
+                finally:
+                    _current_call.reset(token)
+                query_stats.record_call(call, elapsed)
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not PROFILE_CONFIG['enabled']:
+            return func(*args, **kwargs)
+        call = _Call(name)
+        token = _current_call.set(call)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            _current_call.reset(token)
+            query_stats.record_call(call, time.perf_counter() - start)
+    return wrapper
+
+
+class ProfilingCursor(RowCursor):
+    """
+    A cursor that times every statement and counts its rows (and builds
+    the row types, see RowCursor)
+
+    The numbers go to the operation running on this thread (see profiled);
+    statements outside any operation are recorded under UNPROFILED.
+    """
+
+    def execute(self, query, vars=None, row_type=None):
+        return self._profile(functools.partial(super().execute, row_type=row_type), query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._profile(super().executemany, query, vars_list, many=True)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._profile(super().copy_expert, sql, file, size, copy=True)
+
+    def _profile(self, run, query, *args, many=False, copy=False):
+        call = _current_call.get()
+        own_call = call is None
+        if own_call:
+            call = _Call(UNPROFILED)
+
+        start = time.perf_counter()
+        try:
+            result = run(query, *args)
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            call.queries += 1
+            call.query_seconds += seconds
+            call.rows += max(self.rowcount, 0)
+            if own_call:
+                query_stats.record_call(call, seconds)
+
+        if seconds * 1000 >= PROFILE_CONFIG['slow_query_ms']:
+            call.slow += 1
+            # The values of COPY / executemany are not part of the statement
+            values = None if (copy or many) else args[0]
+            self._log_slow(call.name, query, values, seconds, explain=not (copy or many))
+        return result
+
+    def _log_slow(self, operation, query, values, seconds, explain):
+        """
+        Log a slow statement, with its plan if it can be explained
+
+        Without log_values only the statement with its placeholders is
+        logged, and the plan is the generic one (with $1, $2, ... in place
+        of the values)
+        """
+        generic = False
+        if isinstance(query, bytes):
+            # Built by execute_values / execute_batch: the values are part of the text
+            if PROFILE_CONFIG['log_values']:
+                sql = self._decode(query)
+            else:
+                sql, explain = "(statement with its values inlined, not logged)", False
+        elif PROFILE_CONFIG['log_values']:
+            try:
+                sql = self._decode(self.mogrify(query, values) if values is not None else query)
+            except Exception:
+                sql = str(query)
+        elif values is not None:
+            sql, generic = _generic_statement(query)
+        else:
+            sql = query
+
+        plan = None
+        if explain and PROFILE_CONFIG['explain_slow'] and sql.lstrip().lower().startswith(_EXPLAINABLE):
+            plan = _explain(self.connection, sql, generic=generic)
+
+        entry = {
+            'operation': operation,
+            'milliseconds': round(seconds * 1000, 3),
+            'rows': max(self.rowcount, 0),
+            'query': sql.strip(),
+            'plan': plan,
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+        query_stats.record_slow(entry)
+        logger.warning(
+            "Slow query in %s (%.1f ms, %d rows):\n%s%s",
+            operation, entry['milliseconds'], entry['rows'], entry['query'],
+            "\n" + plan if plan else ""
+        )
+
+    def _decode(self, sql):
+        """Text of a statement the driver built as bytes"""
+        if isinstance(sql, bytes):
+            return sql.decode(extensions.encodings.get(self.connection.encoding, 'utf-8'), 'replace')
+        return sql
+
+
+# psycopg2 placeholders: %s, %(name)s, and %% for a literal %
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+def _generic_statement(query):
+    """
+    The statement with $1, $2, ... in place of its %s / %(name)s placeholders
+    (a registered statement run with EXECUTE gives its own SQL, since
+    EXPLAIN can not show a generic plan of EXECUTE)
+
+    Returns:
+        (statement, True if it has numbered placeholders)
+    """
+    for statement in _prepared_statements.values():
+        if statement.execute_sql == query:
+            query = statement.sql
+            break
+
+    numbers = {}
+
+    def number(match):
+        if match.group(0) == "%%":
+            return "%"
+        key = match.group(1) or len(numbers)
+        if key not in numbers:
+            numbers[key] = len(numbers) + 1
+        return f"${numbers[key]}"
+
+    numbered = _PLACEHOLDER.sub(number, query)
+    return numbered, bool(numbers)
+
+
+def _explain(conn, sql, generic=False):
+    """
+    EXPLAIN a statement on the connection that ran it (without running it again)
+
+    Args:
+        conn: The connection that ran it
+        sql: The statement
+        generic: The statement has $1, $2, ... placeholders (GENERIC_PLAN,
+                 PostgreSQL 16 or newer)
+
+    Returns:
+        The plan as text, None if it could not be explained
+    """
+    if generic and conn.server_version < 160000:
+        return None
+    # Inside a transaction a failed EXPLAIN must not abort it, so it runs
+    # in a savepoint; a plain cursor keeps it out of the statistics
+    in_transaction = (not conn.autocommit
+                      and conn.get_transaction_status() == extensions.TRANSACTION_STATUS_INTRANS)
+    cur = conn.cursor(cursor_factory=extensions.cursor)
+    try:
+        if in_transaction:
+            cur.execute("SAVEPOINT explain_slow_query;")
+        try:
+            cur.execute(("EXPLAIN (GENERIC_PLAN) " if generic else "EXPLAIN ") + sql.rstrip().rstrip(';'))
+            plan = "\n".join(row[0] for row in cur.fetchall())
+        except psycopg2.Error:
+            plan = None
+            if in_transaction:
+                cur.execute("ROLLBACK TO SAVEPOINT explain_slow_query;")
+        if in_transaction:
+            cur.execute("RELEASE SAVEPOINT explain_slow_query;")
+        return plan
+    except Exception:
+        return None
+    finally:
+        cur.close()
+
+
+# QUERY STATISTICS EXPORT
+def get_query_stats():
+    """
+    Everything recorded by the query profiler so far
+
+    Returns:
+        Dictionary with
+          operations: {operation name: {calls, errors, seconds_total, seconds_max,
+                       queries, query_seconds_total, rows, pool_wait_seconds_total,
+                       slow_queries, latency_histogram}}
+          slow_queries: the latest slow statements with their plans
+          pool: the connection pool statistics (see get_pool_stats)
+          replicas: the read replica statistics (see get_replica_stats)
+    """
+    stats = query_stats.snapshot()
+    stats['pool'] = get_pool_stats()
+    stats['replicas'] = get_replica_stats()
+    return stats
+
+
+def reset_query_stats():
+    """Forget everything recorded by the query profiler"""
+    query_stats.reset()
+
+
+def export_prometheus(prefix="crime_reporting"):
+    """
+    The query and pool statistics in the Prometheus text exposition format
+
+    Returns:
+        Text that can be served at /metrics or written for a textfile collector
+    """
+    stats = get_query_stats()
+    operations = stats['operations']
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{key}="{_label_value(val)}"' for key, val in labels)
+            lines.append(f"{prefix}_{name}{suffix}{{{label_text}}} {value!r}" if label_text
+                         else f"{prefix}_{name}{suffix} {value!r}")
+
+    def per_operation(key):
+        return [("", [("operation", name)], totals[key]) for name, totals in operations.items()]
+
+    metric("operation_calls_total", "counter", "Calls of each operation", per_operation('calls'))
+    metric("operation_errors_total", "counter", "Calls that raised or had a failed statement",
+           per_operation('errors'))
+    metric("operation_queries_total", "counter", "Statements run by each operation", per_operation('queries'))
+    metric("operation_rows_total", "counter", "Rows returned or changed by each operation's statements",
+           per_operation('rows'))
+    metric("operation_query_seconds_total", "counter", "Time spent in statements",
+           per_operation('query_seconds_total'))
+    metric("operation_pool_wait_seconds_total", "counter", "Time spent waiting for a pool connection",
+           per_operation('pool_wait_seconds_total'))
+    metric("operation_slow_queries_total", "counter", "Statements slower than the slow query threshold",
+           per_operation('slow_queries'))
+    metric("operation_duration_seconds_max", "gauge", "Slowest call of each operation",
+           per_operation('seconds_max'))
+
+    # Histograms count cumulatively: each bucket includes the ones below it
+    samples = []
+    for name, totals in operations.items():
+        cumulative = 0
+        for upper, count in totals['latency_histogram'].items():
+            cumulative += count
+            samples.append(("_bucket", [("operation", name), ("le", upper)], cumulative))
+        samples.append(("_sum", [("operation", name)], totals['seconds_total']))
+        samples.append(("_count", [("operation", name)], totals['calls']))
+    metric("operation_duration_seconds", "histogram", "Latency of each operation", samples)
+
+    pool_stats = stats['pool']
+    if pool_stats:
+        metric("pool_connections", "gauge", "Pool connections by state",
+               [("", [("state", "in_use")], pool_stats['in_use']),
+                ("", [("state", "idle")], pool_stats['idle'])])
+        metric("pool_checkouts_total", "counter", "Connections handed out", [("", [], pool_stats['checkouts'])])
+        metric("pool_timeouts_total", "counter", "Checkouts that timed out", [("", [], pool_stats['timeouts'])])
+        samples = []
+        cumulative = 0
+        for upper, count in pool_stats['wait_histogram'].items():
+            cumulative += count
+            samples.append(("_bucket", [("le", upper)], cumulative))
+        samples.append(("_sum", [], pool_stats['wait_seconds_total']))
+        samples.append(("_count", [], pool_stats['checkouts']))
+        metric("pool_wait_seconds", "histogram", "Time waited for a free connection", samples)
+
+    replica_stats = stats['replicas']
+    if replica_stats['replicas']:
+        per_replica = replica_stats['replicas'].items()
+        metric("replica_reads_total", "counter", "Reads served by each replica",
+               [("", [("replica", name)], totals['reads']) for name, totals in per_replica])
+        metric("replica_lag_seconds", "gauge", "How far behind the primary each replica was last seen",
+               [("", [("replica", name)], totals['lag_seconds']) for name, totals in per_replica
+                if totals['lag_seconds'] is not None])
+        metric("replica_fallbacks_total", "counter", "Replica reads that went to the primary",
+               [("", [], replica_stats['fallbacks'])])
+
+    return "\n".join(lines) + "\n"
+
+
+def _label_value(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_query_stats(path):
+    """
+    Save the query statistics to a file
+    Files ending in .prom get the Prometheus text format (for node_exporter's
+    textfile collector), anything else gets JSON. The file is replaced in
+    one step, so a reader never sees it half written.
+
+    Returns:
+        True if successful, False if failed
+    """
+    try:
+        if path.endswith(".prom"):
+            content = export_prometheus()
+        else:
+            content = json.dumps(get_query_stats(), indent=2, default=str) + "\n"
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        print(f"✗ Error writing query statistics: {e}")
+        return False
+
+
+def test_connection():
+    """Check if the database connection works"""
+    try:
+        with read() as cur:
+            cur.execute("SELECT version();")
+            db_version = cur.fetchone()
+        print(f"✓ Connected to PostgreSQL: {db_version[0]}")
+        return True
+    except Exception as e:
+        print(f"✗ Connection test failed: {e}")
+        return False
+
+def execute_schema():
+    """
+    Create the tables, or bring them up to date, by applying every migration
+    not applied yet (see database/migrate.py); existing data is kept
+    """
+    # Imported here: database.migrate itself uses this module
+    from database.migrate import migrate
+    return migrate()
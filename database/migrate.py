@@ -0,0 +1,658 @@
+# Versioned schema migrations
+#
+# The schema is built by the numbered files in database/migrations/, applied
+# in order and each only once: 0001_initial_schema.sql, 0002_..., and so on.
+# Every applied file is recorded in the schema_migrations table, so running
+# the migrations again only applies the new ones and never touches data.
+#
+# To change the schema, add the next numbered file; never edit one that was
+# already applied somewhere (migrate() warns when an applied file changed).
+#
+# A file runs in one transaction (all of it or nothing), unless one of its
+# first lines says:
+#     -- migrate: no-transaction
+# Then each statement commits on its own. This is needed for
+# CREATE INDEX CONCURRENTLY, which builds an index without blocking writes
+# but can not run inside a transaction. Such a file can stop half way, so its
+# statements must be safe to run again (IF NOT EXISTS).
+import hashlib
+import os
+import re
+import time
+
+from psycopg2.extensions import quote_ident
+
+from database.connection import transaction, read, get_connection, release_connection
+
+# Folder with the numbered migration files
+MIGRATIONS_DIR = 'database/migrations'
+
+# How long a migration waits for a table lock before giving up (so a schema
+# change stuck behind a long query does not hold up everyone queued behind it)
+LOCK_TIMEOUT = os.getenv('DB_MIGRATION_LOCK_TIMEOUT', '5s')
+
+# 0003_add_officer_index.sql -> version 3, name "add_officer_index"
+_FILE_NAME = re.compile(r'^(\d+)_(\w+)\.sql$')
+_NO_TRANSACTION = re.compile(r'^--\s*migrate:\s*no-transaction\s*$', re.MULTILINE)
+
+_CREATE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        -- NULL for versions marked as applied by baseline()
+        duration_ms NUMERIC
+    );
+"""
+
+_RECORD_QUERY = """
+    INSERT INTO schema_migrations (version, name, checksum, duration_ms)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (version) DO NOTHING;
+"""
+
+# Only one process migrates at a time; the others wait, then find the
+# migration already applied
+_LOCK_QUERY = "SELECT pg_advisory_xact_lock(hashtext('schema_migrations'));"
+_SESSION_LOCK_QUERY = "SELECT pg_advisory_lock(hashtext('schema_migrations'));"
+_SESSION_UNLOCK_QUERY = "SELECT pg_advisory_unlock(hashtext('schema_migrations'));"
+
+# One SQL token: a comment, a quoted string or identifier, a $$ body, a
+# semicolon, or anything else (used to split a file into statements)
+_SQL_TOKEN = re.compile(r"""
+      --[^\n]*
+    | /\*.*?\*/
+    | '(?:[^']|'')*'
+    | "(?:[^"]|"")*"
+    | \$(?P<tag>\w*)\$.*?\$(?P=tag)\$
+    | ;
+    | [^-/'"$;]+
+    | .
+""", re.VERBOSE | re.DOTALL)
+
+
+# MIGRATION FILES
+def get_migrations():
+    """
+    Read every migration file, in version order
+    
+    Returns:
+        List of dicts with version, name, sql, checksum and transactional
+    
+    Raises:
+        ValueError: if two files have the same version
+    """
+    migrations = {}
+    for file_name in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _FILE_NAME.match(file_name)
+        if not match:
+            continue
+        
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"two migrations have version {version}: "
+                             f"{migrations[version]['file']} and {file_name}")
+        
+        with open(os.path.join(MIGRATIONS_DIR, file_name), 'r') as f:
+            text = f.read()
+        migrations[version] = {
+            'version': version,
+            'name': match.group(2),
+            'file': file_name,
+            'sql': text,
+            'checksum': hashlib.sha256(text.encode()).hexdigest(),
+            'transactional': not _NO_TRANSACTION.search(text),
+        }
+    
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(text):
+    """
+    Split SQL into its statements, without the comments
+    Semicolons inside strings, quoted names and $$ bodies do not split
+    
+    Args:
+        text: SQL of one or more statements
+    
+    Returns:
+        List of statements (without the final semicolon)
+    """
+    statements = []
+    current = []
+    for match in _SQL_TOKEN.finditer(text):
+        token = match.group()
+        if token.startswith('--') or token.startswith('/*'):
+            current.append(' ')
+        elif token == ';':
+            statements.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(token)
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+# APPLIED MIGRATIONS
+def get_applied_migrations():
+    """
+    Get the migrations recorded in schema_migrations
+    
+    Returns:
+        Dict of version -> (name, checksum, applied_at, duration_ms),
+        empty if none were applied yet
+    """
+    with read() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL;")
+        if not cur.fetchone()[0]:
+            return {}
+        cur.execute("SELECT version, name, checksum, applied_at, duration_ms FROM schema_migrations;")
+        return {row[0]: row[1:] for row in cur.fetchall()}
+
+
+def get_migration_status():
+    """
+    Get every migration with its state:
+        applied  - applied, file unchanged since
+        changed  - applied, but the file was edited afterwards
+        pending  - not applied yet
+        missing  - applied, but its file is gone
+    
+    Returns:
+        List of (version, name, state, applied_at), empty list if failed
+    """
+    try:
+        applied = get_applied_migrations()
+        rows = []
+        for migration in get_migrations():
+            record = applied.pop(migration['version'], None)
+            if record is None:
+                rows.append((migration['version'], migration['name'], 'pending', None))
+            else:
+                state = 'applied' if record[1] == migration['checksum'] else 'changed'
+                rows.append((migration['version'], migration['name'], state, record[2]))
+        
+        for version, record in applied.items():
+            rows.append((version, record[0], 'missing', record[2]))
+        
+        return sorted(rows)
+    
+    except Exception as e:
+        print(f"✗ Error reading migrations: {e}")
+        return []
+
+
+# APPLY MIGRATIONS
+def migrate(target=None):
+    """
+    Apply every migration not applied yet, in order
+    Safe to run on a database in use: existing data is never dropped, and
+    only the new files run.
+    
+    Args:
+        target: (Optional) Stop after this version
+    
+    Returns:
+        True if the schema is now up to date (or at target), False if failed
+    """
+    try:
+        with transaction() as cur:
+            cur.execute(_CREATE_TABLE_QUERY)
+        
+        applied = get_applied_migrations()
+        migrations = get_migrations()
+        
+        if not applied and _has_tables():
+            print("✗ The tables already exist, but no migrations are recorded")
+            print("  Mark the versions they match as applied first: python migrate.py baseline <version>")
+            return False
+        
+        for migration in migrations:
+            record = applied.get(migration['version'])
+            if record is not None and record[1] != migration['checksum']:
+                print(f"✗ Warning: {migration['file']} changed after it was applied "
+                      f"(the change is not applied, add a new migration instead)")
+        
+        pending = [migration for migration in migrations
+                   if migration['version'] not in applied
+                   and (target is None or migration['version'] <= target)]
+        
+        for migration in pending:
+            start = time.perf_counter()
+            if migration['transactional']:
+                _apply_in_transaction(migration, start)
+            else:
+                _apply_without_transaction(migration, start)
+            print(f"✓ {migration['file']} applied ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        
+        print(f"✓ Database schema is up to date ({len(pending)} migrations applied)")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error applying migrations: {e}")
+        return False
+
+
+def _has_tables():
+    """True if the application's tables exist (created before migrations were tracked)"""
+    with read() as cur:
+        cur.execute("SELECT to_regclass('citizens') IS NOT NULL;")
+        return cur.fetchone()[0]
+
+
+def _apply_in_transaction(migration, start):
+    """Run a whole migration file and record it, in one transaction"""
+    try:
+        with transaction() as cur:
+            cur.execute(_LOCK_QUERY)
+            cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s;", (migration['version'],))
+            if cur.fetchone():
+                return  # Another process applied it while we waited
+            
+            cur.execute("SET LOCAL lock_timeout = %s;", (LOCK_TIMEOUT,))
+            cur.execute(migration['sql'])
+            cur.execute(_RECORD_QUERY, (migration['version'], migration['name'], migration['checksum'],
+                                        round((time.perf_counter() - start) * 1000, 1)))
+    
+    except Exception as e:
+        raise RuntimeError(f"{migration['file']} failed, nothing of it was applied: {e}") from e
+
+
+def _apply_without_transaction(migration, start):
+    """Run a migration statement by statement, each committed on its own, then record it"""
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("no database connection")
+    
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        cur.execute(_SESSION_LOCK_QUERY)
+        try:
+            cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s;", (migration['version'],))
+            if cur.fetchone():
+                return  # Another process applied it while we waited
+            
+            for statement in split_statements(migration['sql']):
+                for step in _expand_concurrent_index(cur, statement):
+                    cur.execute(step)
+            
+            cur.execute(_RECORD_QUERY, (migration['version'], migration['name'], migration['checksum'],
+                                        round((time.perf_counter() - start) * 1000, 1)))
+        
+        except Exception as e:
+            # A failed CREATE INDEX CONCURRENTLY leaves an invalid index behind
+            cur.execute("SELECT indexrelid::regclass::text FROM pg_index WHERE NOT indisvalid;")
+            invalid = [row[0] for row in cur.fetchall()]
+            hint = f" (invalid indexes left behind: {', '.join(invalid)})" if invalid else ""
+            raise RuntimeError(f"{migration['file']} stopped part way, the statements before the "
+                               f"failing one stay applied{hint}: {e}") from e
+        
+        finally:
+            cur.execute(_SESSION_UNLOCK_QUERY)
+    
+    finally:
+        cur.close()
+        conn.autocommit = False
+        release_connection(conn)
+
+
+# CREATE INDEX CONCURRENTLY ON A PARTITIONED TABLE
+_CONCURRENT_INDEX = re.compile(
+    r'^CREATE\s+(?P<unique>UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<name>\w+)'
+    r'\s+ON\s+(?:ONLY\s+)?(?P<table>[\w."]+)(?P<rest>.*)$',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def _expand_concurrent_index(cur, statement):
+    """
+    PostgreSQL can not build an index CONCURRENTLY on a partitioned table
+    (e.g. cases), so it is built the long way round: an empty index on the
+    table itself, then the index of every partition CONCURRENTLY, each
+    attached to it as it is done (the table's index is valid once all are)
+    
+    Args:
+        cur: Cursor of the autocommit connection
+        statement: Any statement
+    
+    Returns:
+        The statements to run instead (just `statement` for anything else)
+    """
+    match = _CONCURRENT_INDEX.match(statement)
+    if not match:
+        return [statement]
+    
+    partitions = _get_partitions(cur, match.group('table'))
+    if partitions is None:
+        return [statement]
+    
+    unique = match.group('unique') or ''
+    name = match.group('name')
+    rest = match.group('rest')
+    steps = [f"CREATE {unique}INDEX IF NOT EXISTS {name} ON ONLY {match.group('table')}{rest}"]
+    for partition in partitions:
+        # Index names are at most 63 characters
+        partition_index = f"{name}_{partition}"[:63]
+        steps.append(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition}{rest}")
+        steps.append(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+    return steps
+
+
+def _get_partitions(cur, table):
+    """Names of the partitions of `table`, None if it is not partitioned"""
+    cur.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s);", (table,))
+    row = cur.fetchone()
+    if not row or not row[0]:
+        return None
+    cur.execute("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname;
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+# BASELINE
+def baseline(version):
+    """
+    Mark every migration up to `version` as applied without running it, for a
+    database whose tables were created before migrations were tracked (e.g. by
+    the old schema.sql)
+    
+    Args:
+        version: Last version the database already matches
+    
+    Returns:
+        True if successful, False if failed
+    """
+    try:
+        migrations = [migration for migration in get_migrations() if migration['version'] <= version]
+        if not migrations or migrations[-1]['version'] != version:
+            print(f"✗ There is no migration with version {version}")
+            return False
+        
+        with transaction() as cur:
+            cur.execute(_CREATE_TABLE_QUERY)
+            cur.execute(_LOCK_QUERY)
+            for migration in migrations:
+                cur.execute(_RECORD_QUERY, (migration['version'], migration['name'],
+                                            migration['checksum'], None))
+        
+        print(f"✓ Migrations up to {migrations[-1]['file']} marked as applied")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error marking migrations as applied: {e}")
+        return False
+
+
+# RESET (SCRATCH DATABASES ONLY)
+def reset_schema():
+    """
+    Drop EVERYTHING in the current schema (tables, data, functions), then
+    apply every migration: a fresh, empty database
+    Only for test and benchmark databases.
+    
+    Returns:
+        True if successful, False if failed
+    """
+    try:
+        with transaction() as cur:
+            cur.execute("SELECT current_schema();")
+            schema = quote_ident(cur.fetchone()[0], cur)
+            cur.execute(f"DROP SCHEMA {schema} CASCADE; CREATE SCHEMA {schema};")
+        return migrate()
+    
+    except Exception as e:
+        print(f"✗ Error resetting schema: {e}")
+        return False
+
+
+# DRY RUN: LOCK IMPACT
+# What each table lock stops other sessions from doing while it is held
+_LOCK_BLOCKS = {
+    'ACCESS EXCLUSIVE': 'reads and writes',
+    'EXCLUSIVE': 'writes',
+    'SHARE ROW EXCLUSIVE': 'writes',
+    'SHARE': 'writes',
+    'SHARE UPDATE EXCLUSIVE': 'schema changes only',
+    'ROW EXCLUSIVE': 'nothing',
+    'ROW SHARE': 'nothing',
+    'ACCESS SHARE': 'nothing',
+    None: 'nothing',
+    'UNKNOWN': 'check by hand',
+}
+
+_NAME = r'(?:ONLY\s+)?(?P<table>[\w."]+)'
+_NAMES = r'(?:ONLY\s+)?(?P<tables>[\w."]+(?:\s*,\s*[\w."]+)*)'
+# Defaults computed again for every row: adding a column with one of these
+# rewrites the table (a constant default, or now(), is only stored once)
+_VOLATILE_FUNCTIONS = r'(random|clock_timestamp|timeofday|nextval|gen_random_uuid|uuid_generate_v\w+)'
+
+# (pattern, lock, note) tried in order; the first match wins
+# Locks are those PostgreSQL documents for each command ("Explicit Locking")
+_LOCK_RULES = [
+    (r'CREATE\s+(UNIQUE\s+)?INDEX\s+CONCURRENTLY\b.*?\bON\s+' + _NAME,
+     'SHARE UPDATE EXCLUSIVE', 'builds while the table is in use'),
+    (r'CREATE\s+(UNIQUE\s+)?INDEX\b.*?\bON\s+ONLY\s+' + _NAME,
+     'SHARE', 'brief (the partitions are not indexed)'),
+    (r'CREATE\s+(UNIQUE\s+)?INDEX\b.*?\bON\s+' + _NAME,
+     'SHARE', 'until the whole index is built (use CONCURRENTLY)'),
+    (r'(DROP|REINDEX)\s+INDEX\s+CONCURRENTLY\s+(IF\s+EXISTS\s+)?' + _NAMES,
+     'SHARE UPDATE EXCLUSIVE', 'waits for queries using the index'),
+    (r'DROP\s+INDEX\s+(IF\s+EXISTS\s+)?' + _NAMES,
+     'ACCESS EXCLUSIVE', 'brief'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+VALIDATE\s+CONSTRAINT\b',
+     'SHARE UPDATE EXCLUSIVE', 'reads the whole table'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+(ATTACH\s+PARTITION|DETACH\s+PARTITION\b.*\bCONCURRENTLY)\b',
+     'SHARE UPDATE EXCLUSIVE', 'may read the whole partition'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\b(FOREIGN\s+KEY|REFERENCES)\b.*\bNOT\s+VALID\b',
+     'SHARE ROW EXCLUSIVE', 'brief (run VALIDATE CONSTRAINT later)'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\bCHECK\b.*\bNOT\s+VALID\b',
+     'ACCESS EXCLUSIVE', 'brief (run VALIDATE CONSTRAINT later)'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\b(FOREIGN\s+KEY|REFERENCES)\b',
+     'SHARE ROW EXCLUSIVE', 'reads the whole table (add it NOT VALID, then VALIDATE CONSTRAINT)'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\bADD\s+(COLUMN\s+)?.*\bGENERATED\s+ALWAYS\s+AS\b.*\bSTORED\b',
+     'ACCESS EXCLUSIVE', 'rewrites the whole table (computes the column for every row)'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\bADD\s+(COLUMN\s+)?(IF\s+NOT\s+EXISTS\s+)?\w+\s+'
+     r'((SMALL|BIG)?SERIAL\b|.*\bDEFAULT\b.*\b' + _VOLATILE_FUNCTIONS + r'\s*\()',
+     'ACCESS EXCLUSIVE', 'rewrites the whole table (volatile default, computed for every row)'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+(ALTER\s+(COLUMN\s+)?\w+\s+)?(SET|RESET)\s+(STATISTICS\b|\()',
+     'SHARE UPDATE EXCLUSIVE', 'brief'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\bTYPE\b',
+     'ACCESS EXCLUSIVE', 'may rewrite the whole table'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\bSET\s+NOT\s+NULL\b',
+     'ACCESS EXCLUSIVE', 'reads the whole table (unless a validated CHECK (column IS NOT NULL) exists)'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+.*\bADD\s+(CONSTRAINT\s+\w+\s+)?(CHECK|PRIMARY|UNIQUE)\b',
+     'ACCESS EXCLUSIVE', 'reads the whole table'),
+    (r'ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?' + _NAME,
+     'ACCESS EXCLUSIVE', 'brief, unless the table is rewritten'),
+    (r'ALTER\s+INDEX\s+(IF\s+EXISTS\s+)?' + _NAME + r'\s+ATTACH\s+PARTITION\b',
+     'SHARE UPDATE EXCLUSIVE', 'brief'),
+    (r'CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?[\w."]+\s+PARTITION\s+OF\s+' + _NAME,
+     'ACCESS EXCLUSIVE', 'brief (new partition)'),
+    (r'CREATE\s+(CONSTRAINT\s+)?TRIGGER\b.*?\bON\s+' + _NAME,
+     'SHARE ROW EXCLUSIVE', 'brief'),
+    (r'DROP\s+TRIGGER\b.*?\bON\s+' + _NAME,
+     'ACCESS EXCLUSIVE', 'brief'),
+    (r'(DROP\s+TABLE\s+(IF\s+EXISTS\s+)?|TRUNCATE\s+(TABLE\s+)?)' + _NAMES,
+     'ACCESS EXCLUSIVE', 'brief'),
+    (r'(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+' + _NAME,
+     'ROW EXCLUSIVE', 'locks the rows it changes'),
+    (r'(VACUUM|ANALYZE)\b(\s*\([^)]*\))?\s*' + _NAMES,
+     'SHARE UPDATE EXCLUSIVE', 'reads the whole table'),
+]
+_LOCK_RULES = [(re.compile(r'^\s*' + pattern, re.IGNORECASE | re.DOTALL), lock, note)
+               for pattern, lock, note in _LOCK_RULES]
+
+_LOCK_TABLE = re.compile(r'\bLOCK\s+(TABLE\s+)?' + _NAMES + r'(\s+IN\s+(?P<mode>[A-Z ]+?)\s+MODE)?\s*(;|$)',
+                         re.IGNORECASE | re.MULTILINE)
+_REFERENCES = re.compile(r'\bREFERENCES\s+(?P<table>[\w."]+)', re.IGNORECASE)
+_NO_TABLE_LOCKS = re.compile(
+    r'^\s*(CREATE\s+(OR\s+REPLACE\s+)?(FUNCTION|PROCEDURE|VIEW|SEQUENCE|EXTENSION|TYPE|SCHEMA)|COMMENT|SET|RESET)\b',
+    re.IGNORECASE
+)
+
+
+def _table_name(name):
+    """"public"."Cases" -> cases, as stored in the catalog"""
+    return name.strip().split('.')[-1].strip('"').lower()
+
+
+def lock_impact(statement):
+    """
+    Work out which tables a statement locks, and how strongly, without running it
+    
+    Args:
+        statement: One SQL statement
+    
+    Returns:
+        List of (table, lock, note); table is None when no existing table is
+        locked, lock is None when no table is locked and 'UNKNOWN' when it
+        can not be told from the statement
+    """
+    for pattern, lock, note in _LOCK_RULES:
+        match = pattern.match(statement)
+        if match:
+            names = match.groupdict().get('tables') or match.group('table')
+            return [(_table_name(name), lock, note) for name in names.split(',')]
+    
+    if re.match(r'^\s*CREATE\s+(UNLOGGED\s+)?TABLE\b', statement, re.IGNORECASE):
+        # A new table's foreign keys lock the tables they point to
+        referenced = sorted({_table_name(name) for name in _REFERENCES.findall(statement)})
+        if referenced:
+            return [(table, 'SHARE ROW EXCLUSIVE', 'brief (new foreign key)') for table in referenced]
+        return [(None, None, 'new table')]
+    
+    if re.match(r'^\s*DO\b', statement, re.IGNORECASE):
+        # Only explicit LOCK TABLE statements can be read from a DO block
+        impact = []
+        for match in _LOCK_TABLE.finditer(statement):
+            mode = ' '.join((match.group('mode') or 'ACCESS EXCLUSIVE').upper().split())
+            impact += [(_table_name(name), mode, 'held until the migration ends')
+                       for name in match.group('tables').split(',')]
+        return impact + [(None, 'UNKNOWN', 'DO block: check the statements inside by hand')]
+    
+    match = _LOCK_TABLE.match(statement.strip())
+    if match:
+        mode = ' '.join((match.group('mode') or 'ACCESS EXCLUSIVE').upper().split())
+        return [(_table_name(name), mode, 'held until the transaction ends')
+                for name in match.group('tables').split(',')]
+    
+    if _NO_TABLE_LOCKS.match(statement):
+        return [(None, None, 'no table locks')]
+    
+    if re.match(r'^\s*(SELECT|WITH)\b', statement, re.IGNORECASE):
+        return [(None, 'ACCESS SHARE', 'functions it calls may lock more')]
+    
+    return [(None, 'UNKNOWN', 'unknown statement: check it by hand')]
+
+
+def plan_migrations(target=None):
+    """
+    Dry run: list what the pending migrations would do, statement by
+    statement, with the lock each one takes and what that lock blocks,
+    without changing anything
+    
+    Args:
+        target: (Optional) Stop after this version
+    
+    Returns:
+        List of (migration, transactional, statement, table, lock, blocks,
+        estimated_rows, note); estimated_rows is None for tables that do not
+        exist yet. Empty list if nothing is pending or failed
+    """
+    try:
+        applied = get_applied_migrations()
+        pending = [migration for migration in get_migrations()
+                   if migration['version'] not in applied
+                   and (target is None or migration['version'] <= target)]
+        
+        plan = []
+        with read() as cur:
+            for migration in pending:
+                for statement in split_statements(migration['sql']):
+                    summary = ' '.join(statement.split())
+                    for table, lock, note in lock_impact(statement):
+                        rows = _estimated_rows(cur, table) if table else None
+                        if (not migration['transactional'] and lock == 'SHARE UPDATE EXCLUSIVE'
+                                and _CONCURRENT_INDEX.match(statement)):
+                            partitions = _get_partitions(cur, table)
+                            if partitions is not None:
+                                note += f" (built one partition at a time, {len(partitions)} partitions)"
+                        # In one transaction nothing is released before COMMIT,
+                        # however quick the statement itself is
+                        if (migration['transactional'] and lock not in (None, 'UNKNOWN')
+                                and 'until the' not in note):
+                            note += "; lock held until the migration ends"
+                        plan.append((migration['file'], migration['transactional'], summary, table,
+                                     lock, _LOCK_BLOCKS[lock], rows, note))
+        return plan
+    
+    except Exception as e:
+        print(f"✗ Error planning migrations: {e}")
+        return []
+
+
+def _estimated_rows(cur, table):
+    """Rows in `table` (all partitions) as last seen by ANALYZE, None if it does not exist"""
+    cur.execute("""
+        SELECT SUM(GREATEST(c.reltuples, 0))::BIGINT
+        FROM pg_class c
+        WHERE (c.oid = to_regclass(%s) AND c.relkind <> 'p')
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s));
+    """, (table, table))
+    return cur.fetchone()[0]
+
+
+# DISPLAY
+def display_migration_status(rows):
+    """
+    Show every migration and whether it was applied
+    
+    Args:
+        rows: List of (version, name, state, applied_at)
+    """
+    if not rows:
+        print("\nNo migrations found.")
+        return
+    
+    print("\n" + "="*80)
+    print(f"{'Version':<10} {'Name':<40} {'State':<10} {'Applied at':<20}")
+    print("="*80)
+    
+    for version, name, state, applied_at in rows:
+        applied = applied_at.strftime('%Y-%m-%d %H:%M') if applied_at else '-'
+        print(f"{version:04d}{'':<6} {name[:40]:<40} {state:<10} {applied:<20}")
+    
+    print("="*80)
+
+
+def display_migration_plan(plan):
+    """
+    Show the dry run of the pending migrations, grouped by migration file
+    
+    Args:
+        plan: Rows from plan_migrations()
+    """
+    if not plan:
+        print("\nNo pending migrations.")
+        return
+    
+    current = None
+    for file_name, transactional, statement, table, lock, blocks, rows, note in plan:
+        if file_name != current:
+            current = file_name
+            how = ("one transaction: every lock is held until the whole file is done" if transactional
+                   else "no transaction: each statement commits on its own")
+            print(f"\n{file_name} ({how})")
+            print("="*130)
+            print(f"{'Statement':<50} {'Table':<20} {'Lock':<23} {'Blocks':<20} {'Rows (est.)':>12}")
+            print("="*130)
+        
+        rows_text = f"{rows:,}" if rows is not None else '-'
+        short = statement if len(statement) <= 50 else statement[:47] + '...'
+        print(f"{short:<50} {table or '-':<20} {lock or '-':<23} {blocks:<20} {rows_text:>12}")
+        print(f"{'':<50} {note}")
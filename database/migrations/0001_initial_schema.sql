@@ -1,8 +1,10 @@
--- Drop tables if they exist (for clean setup)
-DROP TABLE IF EXISTS case_updates CASCADE;
-DROP TABLE IF EXISTS cases CASCADE;
-DROP TABLE IF EXISTS officers CASCADE;
-DROP TABLE IF EXISTS citizens CASCADE;
+-- The tables as the old database/schema.sql created them, before migrations
+-- were tracked: citizens, officers, cases and case_updates. Every later change
+-- is one of the numbered files after this one.
+-- A database created by that schema.sql is marked as already at this version,
+-- then upgraded by the rest as usual:
+--     > python migrate.py baseline 1
+--     > python migrate.py
 
 -- Citizens Table (NO national_id)
 CREATE TABLE citizens (
@@ -56,4 +58,4 @@ CREATE INDEX idx_cases_citizen ON cases(citizen_id);
 CREATE INDEX idx_cases_officer ON cases(officer_id);
 CREATE INDEX idx_cases_status ON cases(status);
 CREATE INDEX idx_cases_location ON cases(location);
-CREATE INDEX idx_case_updates_case ON case_updates(case_id);
\ No newline at end of file
+CREATE INDEX idx_case_updates_case ON case_updates(case_id);
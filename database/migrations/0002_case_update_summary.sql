@@ -0,0 +1,21 @@
+-- LAST-UPDATE SUMMARY
+-- The newest update of each case and how many there are, changed in the same
+-- transaction as the updates themselves (see case_update_ops), so case lists
+-- can show recent activity without reading case_updates
+ALTER TABLE cases
+    ADD COLUMN last_update_at TIMESTAMP,
+    ADD COLUMN last_update_officer_id INTEGER REFERENCES officers(officer_id) ON DELETE SET NULL,
+    ADD COLUMN update_count INTEGER NOT NULL DEFAULT 0;
+
+-- Fill it in for the cases that already have updates
+UPDATE cases c
+SET last_update_at = s.updated_at,
+    last_update_officer_id = s.officer_id,
+    update_count = s.update_count
+FROM (
+    SELECT DISTINCT ON (case_id)
+        case_id, updated_at, officer_id, COUNT(*) OVER (PARTITION BY case_id) AS update_count
+    FROM case_updates
+    ORDER BY case_id, updated_at DESC NULLS LAST, update_id DESC
+) AS s
+WHERE c.case_id = s.case_id;
@@ -0,0 +1,9 @@
+-- SOFT DELETES
+-- Deleting a citizen, officer or case sets its deleted_at instead of removing
+-- the row (see delete_citizen / delete_officer / delete_case), so its history
+-- is kept; NULL = active. Every list, lookup and search leaves deleted rows out.
+ALTER TABLE citizens ADD COLUMN deleted_at TIMESTAMP;
+ALTER TABLE officers ADD COLUMN deleted_at TIMESTAMP;
+ALTER TABLE cases ADD COLUMN deleted_at TIMESTAMP;
+-- (no default, so the tables are not rewritten; the badge and deleted-case
+-- indexes are built by 0007 without blocking writes)
@@ -0,0 +1,8 @@
+-- EVERY CASE HAS A reported_at (1 of 2)
+-- Case listings are paged by (reported_at, case_id), newest first (see
+-- get_all_cases), so every case needs a reported_at.
+-- Only a case saved with an explicit NULL has none; it gets the time of the
+-- upgrade. The check is added NOT VALID (it only applies to new rows), so
+-- cases is locked just long enough to add it; 0005 checks the existing rows.
+UPDATE cases SET reported_at = CURRENT_TIMESTAMP WHERE reported_at IS NULL;
+ALTER TABLE cases ADD CONSTRAINT cases_reported_at_not_null CHECK (reported_at IS NOT NULL) NOT VALID;
@@ -0,0 +1,7 @@
+-- EVERY CASE HAS A reported_at (2 of 2)
+-- VALIDATE reads every case while only other schema changes wait. SET NOT NULL
+-- then relies on the validated check instead of reading the table again, so
+-- reads and writes of cases only wait for the moment it takes to commit.
+ALTER TABLE cases VALIDATE CONSTRAINT cases_reported_at_not_null;
+ALTER TABLE cases ALTER COLUMN reported_at SET NOT NULL;
+ALTER TABLE cases DROP CONSTRAINT cases_reported_at_not_null;
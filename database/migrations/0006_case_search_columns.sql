@@ -0,0 +1,16 @@
+-- SEARCH
+-- Trigram matching, used to index "contains" / fuzzy searches on text columns
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Words of each case and update note for full-text search, kept up to date by
+-- PostgreSQL. Adding a generated column rewrites the whole table, and both
+-- cases and case_updates stay locked (no reads or writes) until the second
+-- rewrite is done, so on a database with data stop the system while it runs.
+-- Their indexes are built by 0007, without blocking writes.
+ALTER TABLE cases ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', crime_type), 'A') ||
+    setweight(to_tsvector('english', location), 'B') ||
+    setweight(to_tsvector('english', description), 'C')
+) STORED;
+ALTER TABLE case_updates ADD COLUMN note_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', update_note)) STORED;
@@ -0,0 +1,53 @@
+-- migrate: no-transaction
+-- CASE INDEXES
+-- Built CONCURRENTLY, one statement at a time: cases, case_updates and
+-- officers stay readable and writable while each index is built.
+-- The indexes replacing single-column ones of the first schema get new names,
+-- as the old ones stay in use until 0008 drops them.
+-- The case indexes only cover active cases (deleted_at IS NULL), the "hot set"
+-- every listing reads, so they stay small enough to be kept in memory.
+-- Queries must say c.deleted_at IS NULL for the planner to use them.
+
+-- LISTINGS (paged by (reported_at, case_id), newest first)
+-- (citizen_id, case_id) lets "my cases" pages be read straight from the index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_citizen_page ON cases(citizen_id, case_id DESC)
+    WHERE deleted_at IS NULL;
+-- An officer's cases, optionally by status, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_officer_status
+    ON cases(officer_id, status, reported_at DESC, case_id DESC) WHERE deleted_at IS NULL;
+-- Cases by status (and date range), newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_status_reported ON cases(status, reported_at DESC, case_id DESC)
+    WHERE deleted_at IS NULL;
+-- Matches the (reported_at, case_id) order used to page through case listings
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_reported ON cases(reported_at DESC, case_id DESC)
+    WHERE deleted_at IS NULL;
+-- "Cases resolved in period X" (only finished cases have a resolved_at, so the index stays small)
+-- (also how the archive job finds finished cases old enough to move)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_resolved ON cases(resolved_at DESC, case_id DESC)
+    WHERE resolved_at IS NOT NULL AND deleted_at IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_status_resolved ON cases(status, resolved_at DESC)
+    WHERE resolved_at IS NOT NULL AND deleted_at IS NULL;
+-- A case's timeline, newest first, read page by page (see get_case_timeline)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_case_updates_timeline
+    ON case_updates(case_id, updated_at DESC, update_id DESC);
+-- Case updates in date order (exports by date range / month)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_case_updates_updated ON case_updates(updated_at);
+
+-- SEARCH
+-- Trigram (GIN) indexes serve ILIKE '%term%' and fuzzy matches on location /
+-- crime type (the plain location index of the first schema can not)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_location_trgm ON cases USING GIN (location gin_trgm_ops)
+    WHERE deleted_at IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_crime_type_trgm ON cases USING GIN (crime_type gin_trgm_ops)
+    WHERE deleted_at IS NULL;
+-- Full-text search indexes (see search_cases)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_search ON cases USING GIN (search_vector) WHERE deleted_at IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_case_updates_search ON case_updates USING GIN (note_vector);
+
+-- SOFT DELETES
+-- Badge numbers are unique among active officers, so a deleted officer's badge
+-- can be reissued (once 0008 drops the unique constraint of the first schema)
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_officers_badge ON officers(badge_number)
+    WHERE deleted_at IS NULL;
+-- Deleted cases, oldest first, for the archive job (see archive_old_cases)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cases_deleted ON cases(deleted_at) WHERE deleted_at IS NOT NULL;
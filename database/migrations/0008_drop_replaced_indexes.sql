@@ -0,0 +1,14 @@
+-- migrate: no-transaction
+-- REPLACED INDEXES
+-- The indexes of the first schema that 0007 replaced. DROP INDEX CONCURRENTLY
+-- waits for the queries still using an index instead of locking the table
+-- (it drops one index per statement).
+DROP INDEX CONCURRENTLY IF EXISTS idx_cases_citizen;
+DROP INDEX CONCURRENTLY IF EXISTS idx_cases_officer;
+DROP INDEX CONCURRENTLY IF EXISTS idx_cases_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_cases_location;
+DROP INDEX CONCURRENTLY IF EXISTS idx_case_updates_case;
+
+-- idx_officers_badge (0007) keeps active badge numbers unique from now on
+-- (brief: officers is locked only to drop the constraint and its index)
+ALTER TABLE officers DROP CONSTRAINT IF EXISTS officers_badge_number_key;
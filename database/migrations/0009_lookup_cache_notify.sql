@@ -0,0 +1,21 @@
+-- LOOKUP CACHE
+-- Tell other processes to drop cached citizen / officer rows when they change
+-- (payload '<table>:<id>', delivered on commit; see database/cache.py)
+CREATE OR REPLACE FUNCTION notify_lookup_cache() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'citizens' THEN
+        PERFORM pg_notify('lookup_cache', 'citizens:' || OLD.citizen_id);
+    ELSE
+        PERFORM pg_notify('lookup_cache', 'officers:' || OLD.officer_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER citizens_notify_lookup_cache
+    AFTER UPDATE OR DELETE ON citizens
+    FOR EACH ROW EXECUTE FUNCTION notify_lookup_cache();
+
+CREATE TRIGGER officers_notify_lookup_cache
+    AFTER UPDATE OR DELETE ON officers
+    FOR EACH ROW EXECUTE FUNCTION notify_lookup_cache();
@@ -0,0 +1,30 @@
+-- CASE STATUS HISTORY
+-- One row per status change, written in the same transaction as the change
+-- (see update_case_status). There is no foreign key to cases, so the history
+-- of a deleted case is kept.
+-- Cases changed before this migration have no history rows.
+CREATE TABLE case_status_history (
+    history_id BIGSERIAL PRIMARY KEY,
+    case_id INTEGER NOT NULL,
+    old_status VARCHAR(20) NOT NULL,
+    new_status VARCHAR(20) NOT NULL,
+    changed_by INTEGER,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- A case's history in order
+CREATE INDEX idx_case_status_history_case ON case_status_history(case_id, changed_at);
+-- "Cases that became Resolved / Closed in period X", as recorded at the time
+CREATE INDEX idx_case_status_history_status ON case_status_history(new_status, changed_at);
+
+-- The history is append-only: rows can be added, never changed or removed
+CREATE OR REPLACE FUNCTION reject_history_change() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION '% is append-only (% not allowed)', TG_TABLE_NAME, TG_OP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER case_status_history_append_only
+    BEFORE UPDATE OR DELETE OR TRUNCATE ON case_status_history
+    FOR EACH STATEMENT EXECUTE FUNCTION reject_history_change();
+
@@ -0,0 +1,13 @@
+-- ARCHIVE
+-- Finished cases older than a few months, and long-deleted ones, are moved
+-- here with their case updates by archive_old_cases(), so the live tables
+-- (and their indexes) only hold the cases people still work on.
+-- Same columns as the live tables; the search vectors are plain copies.
+CREATE TABLE cases_archive (LIKE cases INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+ALTER TABLE cases_archive ADD PRIMARY KEY (case_id);
+CREATE INDEX idx_cases_archive_citizen ON cases_archive(citizen_id);
+CREATE INDEX idx_cases_archive_resolved ON cases_archive(resolved_at);
+
+CREATE TABLE case_updates_archive (LIKE case_updates INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+ALTER TABLE case_updates_archive ADD PRIMARY KEY (update_id);
+CREATE INDEX idx_case_updates_archive_case ON case_updates_archive(case_id, updated_at DESC, update_id DESC);
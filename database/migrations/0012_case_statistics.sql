@@ -0,0 +1,198 @@
+-- CASE STATISTICS
+-- Pre-aggregated counts kept up to date by the triggers below, so the
+-- Statistics menu never has to GROUP BY the whole cases table
+-- (see operations/stats_ops.py; rebuild_statistics() recomputes them)
+
+-- No case may change between counting the existing cases (at the end) and
+-- the triggers taking over (reads still work)
+LOCK TABLE cases IN SHARE ROW EXCLUSIVE MODE;
+
+-- Number of cases per status / crime_type / location
+CREATE TABLE case_stats (
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(200) NOT NULL,
+    case_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
+
+-- Cases reported and resolved per day
+CREATE TABLE case_daily_stats (
+    day DATE PRIMARY KEY,
+    reported_count BIGINT NOT NULL DEFAULT 0,
+    resolved_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Resolved cases per officer and their total time to resolution
+-- (no foreign key: rows of deleted officers just stop being shown)
+CREATE TABLE officer_resolution_stats (
+    officer_id INTEGER PRIMARY KEY,
+    resolved_count BIGINT NOT NULL DEFAULT 0,
+    total_resolution_seconds NUMERIC NOT NULL DEFAULT 0
+);
+
+-- Open (Pending / Under Investigation) cases assigned to each officer,
+-- used by the assignment engine (see operations/assignment_ops.py)
+CREATE TABLE officer_workload (
+    officer_id INTEGER PRIMARY KEY,
+    open_cases BIGINT NOT NULL DEFAULT 0
+);
+
+-- Apply the changes of one INSERT / UPDATE / DELETE statement on cases
+-- Runs once per statement (not per row), using the rows it changed:
+-- new versions count +1, old versions -1, so an UPDATE that does not
+-- touch a counted column changes nothing
+CREATE OR REPLACE FUNCTION refresh_case_stats() RETURNS trigger AS $$
+DECLARE
+    changes TEXT;
+BEGIN
+    -- Archiving moves cases out of the table without changing the totals
+    -- (archive_old_cases sets this for its own transaction only)
+    IF current_setting('crime_reporting.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    -- Updates that leave every counted column alone (e.g. the last-update
+    -- summary kept by case_update_ops) have nothing to count
+    -- (nested IF: old_rows only exists for UPDATE, so it can not share one expression)
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM new_rows n
+            JOIN old_rows o ON o.case_id = n.case_id
+            WHERE (n.status, n.crime_type, n.location, n.reported_at, n.resolved_at, n.officer_id, n.deleted_at)
+                  IS DISTINCT FROM (o.status, o.crime_type, o.location, o.reported_at, o.resolved_at, o.officer_id,
+                                    o.deleted_at)
+        ) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    -- Deleted cases (deleted_at set) are not counted, so deleting one
+    -- takes it out of the statistics like any other change
+    changes := CASE TG_OP
+        WHEN 'INSERT' THEN
+            'SELECT status, crime_type, location, reported_at, resolved_at, officer_id, 1 AS sign
+             FROM new_rows WHERE deleted_at IS NULL'
+        WHEN 'DELETE' THEN
+            'SELECT status, crime_type, location, reported_at, resolved_at, officer_id, -1 AS sign
+             FROM old_rows WHERE deleted_at IS NULL'
+        ELSE
+            'SELECT status, crime_type, location, reported_at, resolved_at, officer_id, 1 AS sign
+             FROM new_rows WHERE deleted_at IS NULL
+             UNION ALL
+             SELECT status, crime_type, location, reported_at, resolved_at, officer_id, -1 AS sign
+             FROM old_rows WHERE deleted_at IS NULL'
+    END;
+
+    -- Rows are upserted in key order so concurrent statements can not deadlock
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO case_stats (dimension, value, case_count)
+        SELECT d.dimension, d.value, SUM(ch.sign)
+        FROM changes ch
+        CROSS JOIN LATERAL (VALUES
+            ('status', ch.status),
+            ('crime_type', ch.crime_type),
+            ('location', ch.location)
+        ) AS d(dimension, value)
+        GROUP BY d.dimension, d.value
+        HAVING SUM(ch.sign) <> 0
+        ORDER BY d.dimension, d.value
+        ON CONFLICT (dimension, value)
+        DO UPDATE SET case_count = case_stats.case_count + EXCLUDED.case_count
+    $sql$, changes);
+
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO case_daily_stats (day, reported_count, resolved_count)
+        SELECT day, SUM(reported), SUM(resolved)
+        FROM (
+            SELECT reported_at::date AS day, sign AS reported, 0 AS resolved FROM changes
+            UNION ALL
+            SELECT resolved_at::date, 0, sign FROM changes WHERE resolved_at IS NOT NULL
+        ) AS days
+        GROUP BY day
+        HAVING SUM(reported) <> 0 OR SUM(resolved) <> 0
+        ORDER BY day
+        ON CONFLICT (day)
+        DO UPDATE SET reported_count = case_daily_stats.reported_count + EXCLUDED.reported_count,
+                      resolved_count = case_daily_stats.resolved_count + EXCLUDED.resolved_count
+    $sql$, changes);
+
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO officer_resolution_stats (officer_id, resolved_count, total_resolution_seconds)
+        SELECT officer_id, SUM(sign), SUM(sign * EXTRACT(EPOCH FROM resolved_at - reported_at))
+        FROM changes
+        WHERE officer_id IS NOT NULL AND resolved_at IS NOT NULL
+        GROUP BY officer_id
+        HAVING SUM(sign) <> 0 OR SUM(sign * EXTRACT(EPOCH FROM resolved_at - reported_at)) <> 0
+        ORDER BY officer_id
+        ON CONFLICT (officer_id)
+        DO UPDATE SET resolved_count = officer_resolution_stats.resolved_count + EXCLUDED.resolved_count,
+                      total_resolution_seconds = officer_resolution_stats.total_resolution_seconds
+                                                 + EXCLUDED.total_resolution_seconds
+    $sql$, changes);
+
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO officer_workload (officer_id, open_cases)
+        SELECT officer_id, SUM(sign)
+        FROM changes
+        WHERE officer_id IS NOT NULL AND status IN ('Pending', 'Under Investigation')
+        GROUP BY officer_id
+        HAVING SUM(sign) <> 0
+        ORDER BY officer_id
+        ON CONFLICT (officer_id)
+        DO UPDATE SET open_cases = officer_workload.open_cases + EXCLUDED.open_cases
+    $sql$, changes);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A trigger with transition tables can only handle one kind of statement
+CREATE TRIGGER cases_stats_insert
+    AFTER INSERT ON cases
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_case_stats();
+
+CREATE TRIGGER cases_stats_update
+    AFTER UPDATE ON cases
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_case_stats();
+
+CREATE TRIGGER cases_stats_delete
+    AFTER DELETE ON cases
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_case_stats();
+
+-- Count the cases already in the database (the same totals as
+-- rebuild_statistics(); deleted cases are not counted)
+INSERT INTO case_stats (dimension, value, case_count)
+SELECT 'status', status, COUNT(*) FROM cases WHERE deleted_at IS NULL GROUP BY status
+UNION ALL
+SELECT 'crime_type', crime_type, COUNT(*) FROM cases WHERE deleted_at IS NULL GROUP BY crime_type
+UNION ALL
+SELECT 'location', location, COUNT(*) FROM cases WHERE deleted_at IS NULL GROUP BY location;
+
+INSERT INTO case_daily_stats (day, reported_count, resolved_count)
+SELECT day, SUM(reported), SUM(resolved)
+FROM (
+    SELECT reported_at::date AS day, 1 AS reported, 0 AS resolved FROM cases WHERE deleted_at IS NULL
+    UNION ALL
+    SELECT resolved_at::date, 0, 1 FROM cases WHERE resolved_at IS NOT NULL AND deleted_at IS NULL
+) AS days
+GROUP BY day;
+
+INSERT INTO officer_resolution_stats (officer_id, resolved_count, total_resolution_seconds)
+SELECT officer_id, COUNT(*), SUM(EXTRACT(EPOCH FROM resolved_at - reported_at))
+FROM cases
+WHERE officer_id IS NOT NULL AND resolved_at IS NOT NULL AND deleted_at IS NULL
+GROUP BY officer_id;
+
+INSERT INTO officer_workload (officer_id, open_cases)
+SELECT officer_id, COUNT(*)
+FROM cases
+WHERE officer_id IS NOT NULL AND status IN ('Pending', 'Under Investigation') AND deleted_at IS NULL
+GROUP BY officer_id;
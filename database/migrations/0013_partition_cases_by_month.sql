@@ -0,0 +1,175 @@
+-- PARTITIONS
+-- cases is split by the month of reported_at (cases_2025_01, cases_2025_02, ...)
+-- and case_updates by the month of their case (case_updates_2025_01, ...), so
+-- a case and its updates always sit in the same month. Queries bounded by
+-- reported_at only read the months they ask for, and old months, which
+-- hardly change any more, are vacuumed and indexed on their own.
+-- Indexes and triggers created on cases / case_updates apply to every partition.
+
+-- The existing tables are split into the partitions: every row and ID is
+-- kept, and the tables' own indexes, triggers and foreign keys are recreated
+-- from the database itself (so local changes survive).
+-- Both tables are locked and rewritten, so on a database with data stop the
+-- system before running it. It all runs in one transaction: if anything
+-- fails, nothing has changed.
+
+-- Create the monthly partitions from first_month to last_month (both
+-- included) that do not exist yet, and return how many were created
+-- (run ahead of time by partition_ops.create_future_partitions())
+CREATE OR REPLACE FUNCTION create_case_partitions(first_month DATE, last_month DATE) RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := date_trunc('month', first_month);
+    month_end DATE;
+    parent TEXT;
+    key_column TEXT;
+    partition_name TEXT;
+    in_default BOOLEAN;
+    created INTEGER := 0;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        month_end := month_start + INTERVAL '1 month';
+
+        FOREACH parent IN ARRAY ARRAY['cases', 'case_updates'] LOOP
+            partition_name := parent || '_' || to_char(month_start, 'YYYY_MM');
+            CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+
+            -- Rows of this month already in the default partition would have
+            -- to be moved first, so the month stays there (still correct, only
+            -- not split off)
+            key_column := CASE parent WHEN 'cases' THEN 'reported_at' ELSE 'case_reported_at' END;
+            EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE %I >= %L AND %I < %L)',
+                           parent || '_default', key_column, month_start, key_column, month_end)
+                INTO in_default;
+            IF in_default THEN
+                RAISE NOTICE '% has rows in %_default, not creating %', month_start, parent, partition_name;
+                CONTINUE;
+            END IF;
+
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, parent, month_start, month_end);
+            created := created + 1;
+        END LOOP;
+
+        month_start := month_end;
+    END LOOP;
+
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    recreate TEXT[];
+    statement TEXT;
+    case_columns TEXT;
+    update_columns TEXT;
+    old_update_columns TEXT;
+    case_sequence TEXT;
+    update_sequence TEXT;
+    first_month DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'cases'::regclass) THEN
+        RAISE EXCEPTION 'cases is already partitioned';
+    END IF;
+
+    LOCK TABLE cases, case_updates IN ACCESS EXCLUSIVE MODE;
+
+    -- STEP 1: Remember what has to be put back on the new tables: their
+    -- indexes and triggers, and the foreign keys to citizens / officers
+    -- (the primary keys and the case_updates -> cases key change, see STEP 5)
+    SELECT array_agg(pg_get_indexdef(indexrelid)) INTO recreate
+    FROM pg_index
+    WHERE indrelid IN ('cases'::regclass, 'case_updates'::regclass) AND NOT indisprimary;
+
+    SELECT recreate || array_agg(pg_get_triggerdef(oid)) INTO recreate
+    FROM pg_trigger
+    WHERE tgrelid IN ('cases'::regclass, 'case_updates'::regclass) AND NOT tgisinternal;
+
+    SELECT recreate || array_agg(format('ALTER TABLE %s ADD CONSTRAINT %I %s',
+                                        conrelid::regclass, conname, pg_get_constraintdef(oid))) INTO recreate
+    FROM pg_constraint
+    WHERE contype = 'f' AND conrelid IN ('cases'::regclass, 'case_updates'::regclass)
+      AND confrelid <> 'cases'::regclass;
+
+    -- Columns to copy (generated columns are recomputed by the new tables)
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO case_columns
+    FROM pg_attribute
+    WHERE attrelid = 'cases'::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum),
+           string_agg('u.' || quote_ident(attname), ', ' ORDER BY attnum)
+        INTO update_columns, old_update_columns
+    FROM pg_attribute
+    WHERE attrelid = 'case_updates'::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    case_sequence := pg_get_serial_sequence('cases', 'case_id');
+    update_sequence := pg_get_serial_sequence('case_updates', 'update_id');
+
+    -- STEP 2: Move the old tables aside and create the partitioned ones with
+    -- the same columns, defaults (IDs keep coming from the same sequences)
+    -- and checks; case_updates gets the reported_at of its case, copied when
+    -- the update is added (see case_update_ops)
+    ALTER TABLE case_updates RENAME TO case_updates_unpartitioned;
+    ALTER TABLE cases RENAME TO cases_unpartitioned;
+
+    CREATE TABLE cases (
+        LIKE cases_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED
+    ) PARTITION BY RANGE (reported_at);
+
+    CREATE TABLE case_updates (
+        LIKE case_updates_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED,
+        case_reported_at TIMESTAMP NOT NULL
+    ) PARTITION BY RANGE (case_reported_at);
+
+    -- Rows of a month that has no partition of its own land here, so adding a
+    -- case never fails because nobody created its month yet
+    CREATE TABLE cases_default PARTITION OF cases DEFAULT;
+    CREATE TABLE case_updates_default PARTITION OF case_updates DEFAULT;
+
+    -- One partition for every month with cases, up to three months ahead
+    SELECT COALESCE(MIN(reported_at), CURRENT_DATE) INTO first_month FROM cases_unpartitioned;
+    PERFORM create_case_partitions(first_month, (CURRENT_DATE + INTERVAL '3 months')::DATE);
+
+    -- STEP 3: Copy the rows (no indexes or triggers yet, so this is one fast
+    -- pass, and the statistics tables, already right, are left alone)
+    EXECUTE format('INSERT INTO cases (%s) SELECT %s FROM cases_unpartitioned', case_columns, case_columns);
+    EXECUTE format(
+        'INSERT INTO case_updates (%s, case_reported_at)
+         SELECT %s, c.reported_at
+         FROM case_updates_unpartitioned u
+         JOIN cases_unpartitioned c ON c.case_id = u.case_id',
+        update_columns, old_update_columns
+    );
+
+    -- Archived updates get the same column, filled from their archived case
+    IF to_regclass('case_updates_archive') IS NOT NULL THEN
+        ALTER TABLE case_updates_archive ADD COLUMN case_reported_at TIMESTAMP;
+        UPDATE case_updates_archive a
+        SET case_reported_at = c.reported_at
+        FROM cases_archive c
+        WHERE c.case_id = a.case_id;
+    END IF;
+
+    -- STEP 4: Hand the ID sequences to the new tables, then drop the old ones
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY cases.case_id', case_sequence);
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY case_updates.update_id', update_sequence);
+    DROP TABLE case_updates_unpartitioned;
+    DROP TABLE cases_unpartitioned;
+
+    -- STEP 5: Keys, then everything remembered in STEP 1 (now that the old
+    -- index names are free again)
+    -- A partitioned table's primary key must include the partition column
+    -- (case_id alone is still unique: it comes from one sequence)
+    ALTER TABLE cases ADD PRIMARY KEY (case_id, reported_at);
+    ALTER TABLE case_updates ADD PRIMARY KEY (update_id, case_reported_at);
+    ALTER TABLE case_updates ADD FOREIGN KEY (case_id, case_reported_at)
+        REFERENCES cases(case_id, reported_at) ON DELETE CASCADE;
+
+    FOREACH statement IN ARRAY COALESCE(recreate, '{}') LOOP
+        EXECUTE statement;
+    END LOOP;
+END;
+$$;
+
+-- Fresh planner statistics for the new partitions
+ANALYZE cases, case_updates;
@@ -0,0 +1,168 @@
+-- CASE STATISTICS DELTAS
+-- The triggers of 0012 added every change straight onto the summary rows, so
+-- every new case updated the same case_stats ('status', 'Pending') row and
+-- today's case_daily_stats row inside its own transaction, and concurrent
+-- writers queued up behind each other's row locks.
+-- Now each statement only appends its changes to a delta table (inserts never
+-- wait for each other). The *_current views add the deltas to the totals, so
+-- the numbers are always up to date, and fold_statistics() (stats_ops.py)
+-- regularly moves the deltas into the totals so the delta tables stay small.
+
+-- Same columns as the totals, one row per value changed by a statement
+-- (no primary key: many statements add rows for the same value)
+CREATE TABLE case_stats_delta (
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(200) NOT NULL,
+    case_count BIGINT NOT NULL
+);
+
+CREATE TABLE case_daily_stats_delta (
+    day DATE NOT NULL,
+    reported_count BIGINT NOT NULL,
+    resolved_count BIGINT NOT NULL
+);
+
+CREATE TABLE officer_resolution_stats_delta (
+    officer_id INTEGER NOT NULL,
+    resolved_count BIGINT NOT NULL,
+    total_resolution_seconds NUMERIC NOT NULL
+);
+
+CREATE TABLE officer_workload_delta (
+    officer_id INTEGER NOT NULL,
+    open_cases BIGINT NOT NULL
+);
+
+-- Totals plus the changes not folded in yet: read these, not the tables
+CREATE VIEW case_stats_current AS
+SELECT dimension, value, SUM(case_count)::BIGINT AS case_count
+FROM (
+    SELECT dimension, value, case_count FROM case_stats
+    UNION ALL
+    SELECT dimension, value, case_count FROM case_stats_delta
+) AS counts
+GROUP BY dimension, value;
+
+CREATE VIEW case_daily_stats_current AS
+SELECT day, SUM(reported_count)::BIGINT AS reported_count, SUM(resolved_count)::BIGINT AS resolved_count
+FROM (
+    SELECT day, reported_count, resolved_count FROM case_daily_stats
+    UNION ALL
+    SELECT day, reported_count, resolved_count FROM case_daily_stats_delta
+) AS counts
+GROUP BY day;
+
+CREATE VIEW officer_resolution_stats_current AS
+SELECT officer_id, SUM(resolved_count)::BIGINT AS resolved_count,
+       SUM(total_resolution_seconds) AS total_resolution_seconds
+FROM (
+    SELECT officer_id, resolved_count, total_resolution_seconds FROM officer_resolution_stats
+    UNION ALL
+    SELECT officer_id, resolved_count, total_resolution_seconds FROM officer_resolution_stats_delta
+) AS counts
+GROUP BY officer_id;
+
+CREATE VIEW officer_workload_current AS
+SELECT officer_id, SUM(open_cases)::BIGINT AS open_cases
+FROM (
+    SELECT officer_id, open_cases FROM officer_workload
+    UNION ALL
+    SELECT officer_id, open_cases FROM officer_workload_delta
+) AS counts
+GROUP BY officer_id;
+
+-- Same changes as before (see 0012), appended to the delta tables instead
+-- of added onto the summary rows; the triggers stay as they are
+CREATE OR REPLACE FUNCTION refresh_case_stats() RETURNS trigger AS $$
+DECLARE
+    changes TEXT;
+BEGIN
+    -- Archiving moves cases out of the table without changing the totals
+    -- (archive_old_cases sets this for its own transaction only)
+    IF current_setting('crime_reporting.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    -- Updates that leave every counted column alone (e.g. the last-update
+    -- summary kept by case_update_ops) have nothing to count
+    -- (nested IF: old_rows only exists for UPDATE, so it can not share one expression)
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM new_rows n
+            JOIN old_rows o ON o.case_id = n.case_id
+            WHERE (n.status, n.crime_type, n.location, n.reported_at, n.resolved_at, n.officer_id, n.deleted_at)
+                  IS DISTINCT FROM (o.status, o.crime_type, o.location, o.reported_at, o.resolved_at, o.officer_id,
+                                    o.deleted_at)
+        ) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    -- Deleted cases (deleted_at set) are not counted, so deleting one
+    -- takes it out of the statistics like any other change
+    changes := CASE TG_OP
+        WHEN 'INSERT' THEN
+            'SELECT status, crime_type, location, reported_at, resolved_at, officer_id, 1 AS sign
+             FROM new_rows WHERE deleted_at IS NULL'
+        WHEN 'DELETE' THEN
+            'SELECT status, crime_type, location, reported_at, resolved_at, officer_id, -1 AS sign
+             FROM old_rows WHERE deleted_at IS NULL'
+        ELSE
+            'SELECT status, crime_type, location, reported_at, resolved_at, officer_id, 1 AS sign
+             FROM new_rows WHERE deleted_at IS NULL
+             UNION ALL
+             SELECT status, crime_type, location, reported_at, resolved_at, officer_id, -1 AS sign
+             FROM old_rows WHERE deleted_at IS NULL'
+    END;
+
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO case_stats_delta (dimension, value, case_count)
+        SELECT d.dimension, d.value, SUM(ch.sign)
+        FROM changes ch
+        CROSS JOIN LATERAL (VALUES
+            ('status', ch.status),
+            ('crime_type', ch.crime_type),
+            ('location', ch.location)
+        ) AS d(dimension, value)
+        GROUP BY d.dimension, d.value
+        HAVING SUM(ch.sign) <> 0
+    $sql$, changes);
+
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO case_daily_stats_delta (day, reported_count, resolved_count)
+        SELECT day, SUM(reported), SUM(resolved)
+        FROM (
+            SELECT reported_at::date AS day, sign AS reported, 0 AS resolved FROM changes
+            UNION ALL
+            SELECT resolved_at::date, 0, sign FROM changes WHERE resolved_at IS NOT NULL
+        ) AS days
+        GROUP BY day
+        HAVING SUM(reported) <> 0 OR SUM(resolved) <> 0
+    $sql$, changes);
+
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO officer_resolution_stats_delta (officer_id, resolved_count, total_resolution_seconds)
+        SELECT officer_id, SUM(sign), SUM(sign * EXTRACT(EPOCH FROM resolved_at - reported_at))
+        FROM changes
+        WHERE officer_id IS NOT NULL AND resolved_at IS NOT NULL
+        GROUP BY officer_id
+        HAVING SUM(sign) <> 0 OR SUM(sign * EXTRACT(EPOCH FROM resolved_at - reported_at)) <> 0
+    $sql$, changes);
+
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO officer_workload_delta (officer_id, open_cases)
+        SELECT officer_id, SUM(sign)
+        FROM changes
+        WHERE officer_id IS NOT NULL AND status IN ('Pending', 'Under Investigation')
+        GROUP BY officer_id
+        HAVING SUM(sign) <> 0
+    $sql$, changes);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,122 @@
+# Row types returned by the operations, and the cursor that builds them
+#
+# Every row is a named tuple: fields can be read by name (case.status) and,
+# like the plain tuples psycopg2 returns, by position (case[0]) or unpacked.
+# A named tuple stores its values exactly like a tuple (no per-row dict), so
+# a page of rows takes the same memory as before and far less than dict rows
+# (see benchmarks/bench_row_types.py).
+#
+# The operations pick the type of each query's rows:
+#     with read() as cur:
+#         cur.execute(query, values, row_type=CaseSummary)
+#         return cur.fetchall()           # list of CaseSummary
+#
+# Each type's fields are the query's columns, in order, so a query that
+# returns a type must SELECT exactly these columns.
+from collections import namedtuple
+
+from psycopg2 import extensions
+
+# A citizen (citizen_ops.get_citizen_by_id / get_all_citizens)
+Citizen = namedtuple('Citizen', [
+    'citizen_id', 'full_name', 'phone_number', 'email', 'address', 'created_at',
+])
+
+# An officer (officer_ops.get_officer_by_id / get_all_officers)
+Officer = namedtuple('Officer', [
+    'officer_id', 'full_name', 'badge_number', 'rank', 'phone_number', 'station', 'created_at',
+])
+
+# One case with its citizen, officer and last-update summary
+# (case_ops.get_case_by_id)
+Case = namedtuple('Case', [
+    'case_id', 'citizen_id', 'officer_id', 'crime_type', 'description', 'location',
+    'status', 'reported_at', 'resolved_at', 'citizen_name', 'citizen_phone',
+    'officer_name', 'officer_badge', 'last_update_at', 'last_update_officer_id',
+    'update_count',
+])
+
+# A case in a listing (get_all_cases, iter_cases, get_cases_by_citizen, find_cases)
+CaseSummary = namedtuple('CaseSummary', [
+    'case_id', 'crime_type', 'description', 'location', 'status', 'reported_at',
+    'citizen_name', 'officer_name', 'last_update_at',
+])
+
+# A case found by a filter or search (get_cases_by_status / _location /
+# _crime_type, search_cases_by_location / _crime_type): the columns of a
+# listing that display_cases shows, without description and officer
+CaseMatch = namedtuple('CaseMatch', [
+    'case_id', 'crime_type', 'location', 'status', 'reported_at',
+    'citizen_name', 'last_update_at',
+])
+
+# One update in a case's timeline (case_update_ops.get_case_timeline / get_updates_by_case)
+CaseUpdate = namedtuple('CaseUpdate', [
+    'update_id', 'update_note', 'updated_at', 'officer_name', 'badge_number',
+])
+
+# One full-text search result (case_ops.search_cases); the snippet is the
+# best matching text with the matches in [[ ]]
+SearchResult = namedtuple('SearchResult', [
+    'case_id', 'crime_type', 'location', 'status', 'reported_at', 'rank', 'snippet',
+])
+
+# One status change of a case (case_ops.get_status_history)
+StatusChange = namedtuple('StatusChange', [
+    'history_id', 'old_status', 'new_status', 'changed_by', 'changed_at',
+])
+
+
+class RowCursor(extensions.cursor):
+    """
+    A cursor that returns the rows of a statement as the row type given to
+    execute(); rows of statements run without one stay plain tuples
+
+    The type only applies to the statement it was given with, so nested
+    blocks sharing one cursor (see transaction()) never mix them up.
+    """
+
+    row_type = None
+
+    def execute(self, query, vars=None, row_type=None):
+        self.row_type = row_type
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        self.row_type = None
+        return super().executemany(query, vars_list)
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is None or self.row_type is None:
+            return row
+        return self.row_type._make(row)
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self.row_type is None:
+            return rows
+        return list(map(self.row_type._make, rows))
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if self.row_type is None:
+            return rows
+        return list(map(self.row_type._make, rows))
+
+    def __iter__(self):
+        # Looping over the cursor (e.g. a named cursor, `itersize` rows per
+        # round trip) builds each row as it arrives
+        if self.row_type is None:
+            return super().__iter__()
+        return self._iter_rows(self.row_type)
+
+    def _iter_rows(self, row_type):
+        # Rows come from the plain cursor's __next__ (iterating self would
+        # come back to __iter__ above)
+        while True:
+            try:
+                row = super().__next__()
+            except StopIteration:
+                return
+            yield row_type._make(row)
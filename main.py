@@ -1,8 +1,17 @@
+# Import system module to read command-line arguments
+import sys
+
 # Import database connection management functions
-from database.connection import init_pool, test_connection, close_all_connections
+from database.connection import init_pool, test_connection, close_all_connections, PROFILE_CONFIG, write_query_stats
+
+# Import the lookup cache settings and its cross-process listener
+from database.cache import CACHE_CONFIG, start_cache_listener
+
+# Import the non-interactive command-line interface
+from ui.cli import run_cli
 
 # Import all menu functions from the UI
-from ui.menu import main_menu, citizen_menu, officer_menu, view_all_cases_public
+from ui.menu import main_menu, citizen_menu, officer_menu, view_all_cases_public, statistics_menu
 
 
 def main():
@@ -20,6 +29,10 @@ def main():
         print("\n Failed to connect to database. Please check your configuration.")
         return  # Exit if database is unreachable
     
+    # Keep cached citizens/officers in sync with other running copies
+    if CACHE_CONFIG['listen']:
+        start_cache_listener()
+    
     print("\n System ready!\n")
     
     # STEP 3: Main application loop - keeps running until user exits
@@ -35,21 +48,30 @@ def main():
         elif choice == '3':
             view_all_cases_public()  # Show all cases
         elif choice == '4':
+            statistics_menu()  # Case counts and resolution times
+        elif choice == '5':
             # User wants to exit
             print("\n👋 Thank you for using Crime Reporting System. Goodbye!")
             break  # Exit the loop
         else:
             # Invalid choice - show error and continue
-            print("\n Invalid choice! Please enter a number between 1 and 4.")
+            print("\n Invalid choice! Please enter a number between 1 and 5.")
             input("\nPress Enter to continue...")
     
-    # STEP 4: Clean up - close all database connections before exiting
+    # STEP 4: Clean up - save the query statistics (if asked to) and
+    # close all database connections before exiting
+    if PROFILE_CONFIG['metrics_file']:
+        write_query_stats(PROFILE_CONFIG['metrics_file'])
     close_all_connections()
 
 
 # This ensures main() only runs when the script is executed directly
 # (not when imported as a module)
 if __name__ == "__main__":
+    # Arguments given: run that command and exit
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    
     try:
         # Run the main application
         main()
@@ -0,0 +1,75 @@
+# Create or upgrade the database schema from the numbered files in
+# database/migrations/ (see database/migrate.py)
+#
+# > python migrate.py                  # apply every pending migration
+# > python migrate.py up --to 3        # apply the pending ones up to version 3
+# > python migrate.py up --dry-run     # show what would run and the locks it takes
+# > python migrate.py status           # list the migrations and which are applied
+# > python migrate.py baseline 1       # database made by the old schema.sql: mark 1 as applied
+#
+# Exits with status 1 if anything failed
+import argparse
+import sys
+
+from database.connection import init_pool, test_connection, close_all_connections, PROFILE_CONFIG
+from database.migrate import (
+    migrate, plan_migrations, get_migration_status, baseline,
+    display_migration_plan, display_migration_status
+)
+
+
+def build_parser():
+    """Command line arguments of migrate.py"""
+    parser = argparse.ArgumentParser(description="Apply the database migrations")
+    parser.add_argument("command", nargs="?", default="up", choices=["up", "status", "baseline"],
+                        help="up: apply pending migrations (default), status: list them, "
+                             "baseline: mark migrations as applied without running them")
+    parser.add_argument("version", nargs="?", type=int,
+                        help="baseline: the last version the database already matches")
+    parser.add_argument("--to", type=int, dest="target",
+                        help="up: stop after this version")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="up: only show the statements and the table locks they would take")
+    return parser
+
+
+def run(args):
+    """
+    Run one migrate.py command
+    
+    Returns:
+        Exit status (0 = success)
+    """
+    if args.command == "status":
+        rows = get_migration_status()
+        display_migration_status(rows)
+        return 0 if rows else 1
+    
+    if args.command == "baseline":
+        if args.version is None:
+            print("✗ baseline needs the version the database already matches")
+            return 1
+        return 0 if baseline(args.version) else 1
+    
+    if args.dry_run:
+        display_migration_plan(plan_migrations(args.target))
+        return 0
+    
+    return 0 if migrate(args.target) else 1
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    
+    # Migrations are expected to be slow: do not log each one as a slow query
+    PROFILE_CONFIG['slow_query_ms'] = float('inf')
+    
+    init_pool()
+    if not test_connection():
+        sys.exit(1)
+    
+    try:
+        status = run(args)
+    finally:
+        close_all_connections()
+    sys.exit(status)
@@ -0,0 +1,122 @@
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import transaction, profiled
+
+# Finished cases older than this many months are archived by default
+DEFAULT_ARCHIVE_MONTHS = 12
+
+# Cases moved (with their updates) per transaction
+DEFAULT_BATCH_SIZE = 5_000
+
+# The two kinds of cases that leave the live table, each found through its own
+# small index, oldest first:
+#   finished - Resolved / Closed before the cut-off (idx_cases_resolved)
+#   deleted  - deleted before the cut-off (idx_cases_deleted)
+# SKIP LOCKED leaves cases someone is changing right now for the next run
+_ARCHIVE_CANDIDATES = {
+    'finished': """
+        SELECT case_id, reported_at FROM cases
+        WHERE resolved_at < LOCALTIMESTAMP - make_interval(months => %s) AND deleted_at IS NULL
+        ORDER BY resolved_at, case_id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED;
+    """,
+    'deleted': """
+        SELECT case_id, reported_at FROM cases
+        WHERE deleted_at < LOCALTIMESTAMP - make_interval(months => %s)
+        ORDER BY deleted_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED;
+    """,
+}
+
+# Columns copied to the archive tables, named so a column added to the live
+# tables later can not end up in the wrong archive column (the search
+# vectors are generated on the live tables and plain copies in the archive)
+_CASE_COLUMNS = """case_id, citizen_id, officer_id, crime_type, description, location, status,
+    reported_at, resolved_at, last_update_at, last_update_officer_id, update_count, deleted_at,
+    search_vector"""
+_UPDATE_COLUMNS = "update_id, case_id, officer_id, update_note, updated_at, note_vector, case_reported_at"
+
+# Move the updates first: deleting the cases would otherwise cascade to them
+# The batch's (case_id, reported_at) pairs pick the rows; the list of
+# reported_at values alone names the month partitions to look in, so only
+# those are searched
+_MOVE_UPDATES_QUERY = f"""
+    WITH moved AS (
+        DELETE FROM case_updates cu
+        USING unnest(%s::int[], %s::timestamp[]) AS k(case_id, reported_at)
+        WHERE cu.case_id = k.case_id AND cu.case_reported_at = k.reported_at
+          AND cu.case_reported_at = ANY(%s::timestamp[])
+        RETURNING cu.*
+    )
+    INSERT INTO case_updates_archive ({_UPDATE_COLUMNS})
+    SELECT {_UPDATE_COLUMNS} FROM moved;
+"""
+_MOVE_CASES_QUERY = f"""
+    WITH moved AS (
+        DELETE FROM cases c
+        USING unnest(%s::int[], %s::timestamp[]) AS k(case_id, reported_at)
+        WHERE c.case_id = k.case_id AND c.reported_at = k.reported_at
+          AND c.reported_at = ANY(%s::timestamp[])
+        RETURNING c.*
+    )
+    INSERT INTO cases_archive ({_CASE_COLUMNS})
+    SELECT {_CASE_COLUMNS} FROM moved;
+"""
+
+
+# ARCHIVE OLD CASES
+@profiled
+def archive_old_cases(months=DEFAULT_ARCHIVE_MONTHS, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move Resolved / Closed cases finished more than `months` months ago, and
+    cases deleted more than `months` months ago, with their case updates,
+    into cases_archive and case_updates_archive
+    This keeps the live tables and their indexes small; the statistics
+    still count archived cases, and get_case_by_id(..., include_archived=True)
+    still finds them. Safe to run while the system is in use (e.g. nightly).
+    
+    Args:
+        months: How old (in months) a finished or deleted case must be
+        batch_size: Cases moved (and committed) per transaction
+    
+    Returns:
+        Number of cases archived, None if failed (the batches already
+        committed stay archived)
+    """
+    try:
+        archived = 0
+        for kind in _ARCHIVE_CANDIDATES:
+            while True:
+                moved = _archive_batch(kind, months, batch_size)
+                archived += moved
+                if moved < batch_size:
+                    break
+        
+        print(f"✓ {archived} cases archived")
+        return archived
+    
+    except Exception as e:
+        print(f"✗ Error archiving cases: {e}")
+        return None
+
+
+def _archive_batch(kind, months, batch_size):
+    """Move one batch of cases of this kind, return how many were moved"""
+    with transaction() as cur:
+        # The statistics triggers leave the totals alone for this transaction only
+        cur.execute("SET LOCAL crime_reporting.archiving = 'on';")
+        
+        cur.execute(_ARCHIVE_CANDIDATES[kind], (months, batch_size))
+        rows = cur.fetchall()
+        if rows:
+            case_ids = [row[0] for row in rows]
+            reported_at = [row[1] for row in rows]
+            partitions = sorted(set(reported_at))
+            cur.execute(_MOVE_UPDATES_QUERY, (case_ids, reported_at, partitions))
+            cur.execute(_MOVE_CASES_QUERY, (case_ids, reported_at, partitions))
+        
+        # SET LOCAL ends with the transaction, but this may be part of a bigger one
+        cur.execute("RESET crime_reporting.archiving;")
+        return len(rows)
+
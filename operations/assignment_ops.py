@@ -0,0 +1,288 @@
+# Import helpers for the in-memory workload index
+import heapq
+import re
+
+# Import execute_values to update many rows in one statement
+from psycopg2.extras import execute_values
+
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import transaction, read, stream, profiled
+
+# How much each factor counts when choosing an officer (lowest score wins):
+#   score = workload * open cases + rank * rank priority - proximity * shared words
+ASSIGNMENT_WEIGHTS = {
+    'workload': 1.0,
+    'rank': 0.5,
+    'proximity': 3.0,
+}
+
+# Lower priority = assigned first, so senior officers are kept for what
+# only they can handle (ranks not listed count as DEFAULT_RANK_PRIORITY)
+RANK_PRIORITY = {
+    'constable': 0,
+    'corporal': 1,
+    'sergeant': 2,
+    'inspector': 3,
+    'chief inspector': 4,
+    'superintendent': 5,
+}
+DEFAULT_RANK_PRIORITY = 2
+
+# Words shorter than this, and words that say nothing about the place,
+# are ignored when comparing station and location
+MIN_WORD_LENGTH = 3
+IGNORED_WORDS = {'the', 'and', 'police', 'station', 'post', 'base'}
+
+# Cases assigned per UPDATE statement when clearing the backlog
+DEFAULT_BATCH_SIZE = 5_000
+
+
+def location_words(text):
+    """
+    The words used to compare a case location with an officer's station
+    e.g. "Nairobi CBD, Moi Avenue" -> {"nairobi", "cbd", "moi", "avenue"}
+    """
+    if not text:
+        return set()
+    return {
+        word for word in re.findall(r"[a-z0-9]+", text.lower())
+        if len(word) >= MIN_WORD_LENGTH and word not in IGNORED_WORDS
+    }
+
+
+class AssignmentEngine:
+    """
+    Picks the best officer for a case without reading the cases table
+    
+    The engine loads every officer once, with their open case count from the
+    officer_workload summary table, and keeps:
+      - a word index: station word -> officers at stations with that word
+      - a heap of officers ordered by their score without proximity
+    Each decision only scores the officers near the case plus the top of
+    the heap, and the chosen officer's workload is increased in memory.
+    """
+    
+    def __init__(self, officers, weights=None):
+        """
+        Args:
+            officers: List of (officer_id, rank, station, open_cases)
+            weights: (Optional) Dictionary overriding ASSIGNMENT_WEIGHTS
+        """
+        self.weights = dict(ASSIGNMENT_WEIGHTS, **(weights or {}))
+        self.workload = {}       # officer_id -> open cases
+        self.rank_priority = {}  # officer_id -> rank priority
+        self.station_words = {}  # officer_id -> words of their station
+        self.by_word = {}        # word -> set of officer IDs
+        self._heap = []          # (score without proximity, officer_id, workload when pushed)
+        
+        for officer_id, rank, station, open_cases in officers:
+            self.workload[officer_id] = open_cases
+            self.rank_priority[officer_id] = RANK_PRIORITY.get((rank or '').strip().lower(), DEFAULT_RANK_PRIORITY)
+            self.station_words[officer_id] = location_words(station)
+            for word in self.station_words[officer_id]:
+                self.by_word.setdefault(word, set()).add(officer_id)
+            self._push(officer_id)
+    
+    @classmethod
+    def load(cls, weights=None):
+        """
+        Build an engine from the officers table and the workload summary table
+        
+        Returns:
+            An AssignmentEngine
+        """
+        with read() as cur:
+            cur.execute("""
+                SELECT o.officer_id, o.rank, o.station, COALESCE(w.open_cases, 0)
+                FROM officers o
+                LEFT JOIN officer_workload_current w ON w.officer_id = o.officer_id
+                WHERE o.deleted_at IS NULL;
+            """)
+            return cls(cur.fetchall(), weights)
+    
+    def choose(self, location):
+        """
+        Pick the officer for a case at this location and count the case
+        against their workload
+        
+        Returns:
+            officer_id, None if there are no officers
+        """
+        if not self._heap:
+            return None
+        
+        # Best officer overall, ignoring location
+        # (entries pushed before an officer's workload last changed are outdated;
+        # workloads only grow, so those reach the top first and are dropped there)
+        while self._heap[0][2] != self.workload[self._heap[0][1]]:
+            heapq.heappop(self._heap)
+        best_score, best_id, _ = self._heap[0]
+        
+        # Officers at a station sharing a word with the location may beat them
+        words = location_words(location)
+        nearby = set()
+        for word in words:
+            nearby |= self.by_word.get(word, set())
+        for officer_id in nearby:
+            shared = len(words & self.station_words[officer_id])
+            score = self._base_score(officer_id) - self.weights['proximity'] * shared
+            if (score, officer_id) < (best_score, best_id):
+                best_score, best_id = score, officer_id
+        
+        self.workload[best_id] += 1
+        self._push(best_id)
+        return best_id
+    
+    def _base_score(self, officer_id):
+        return (self.weights['workload'] * self.workload[officer_id]
+                + self.weights['rank'] * self.rank_priority[officer_id])
+    
+    def _entry(self, officer_id):
+        return (self._base_score(officer_id), officer_id, self.workload[officer_id])
+    
+    def _push(self, officer_id):
+        heapq.heappush(self._heap, self._entry(officer_id))
+
+
+# SUGGEST / ASSIGN ONE CASE
+@profiled
+def suggest_officer(location):
+    """
+    Suggest the officer who should take a new case at this location
+    
+    Args:
+        location: Where the crime occurred
+    
+    Returns:
+        officer_id, None if there are no officers (or failed)
+    """
+    try:
+        return AssignmentEngine.load().choose(location)
+    
+    except Exception as e:
+        print(f"✗ Error suggesting officer: {e}")
+        return None
+
+
+@profiled
+def auto_assign_case(case_id):
+    """
+    Assign the best available officer to an unassigned case
+    
+    Args:
+        case_id: The case to assign
+    
+    Returns:
+        officer_id that was assigned, None if failed
+    """
+    try:
+        with transaction() as cur:
+            # Lock the case so two dispatchers can not assign it at once
+            cur.execute("SELECT location, officer_id FROM cases WHERE case_id = %s AND deleted_at IS NULL FOR UPDATE;",
+                        (case_id,))
+            case = cur.fetchone()
+            if case is None:
+                print(f"✗ Case {case_id} not found")
+                return None
+            if case[1] is not None:
+                print(f"✗ Case {case_id} already has officer {case[1]}")
+                return None
+            
+            officer_id = AssignmentEngine.load().choose(case[0])
+            if officer_id is None:
+                print("✗ No officers available")
+                return None
+            
+            cur.execute("UPDATE cases SET officer_id = %s WHERE case_id = %s;", (officer_id, case_id))
+        
+        print(f"✓ Officer {officer_id} assigned to case {case_id}")
+        return officer_id
+    
+    except Exception as e:
+        print(f"✗ Error assigning officer: {e}")
+        return None
+
+
+# ASSIGN THE WHOLE BACKLOG
+@profiled
+def assign_pending_backlog(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Assign an officer to every Pending case that has none, oldest first
+    Decisions are made in memory by one AssignmentEngine, and the cases are
+    updated `batch_size` at a time with one UPDATE statement per batch
+    
+    Args:
+        batch_size: Cases updated (and committed) per statement
+    
+    Returns:
+        Number of cases assigned, None if failed
+    """
+    try:
+        engine = AssignmentEngine.load()
+        if not engine.workload:
+            print("✗ No officers available")
+            return 0
+        
+        assigned = 0
+        batch = []
+        with stream("pending_backlog", batch_size) as cur:
+            cur.execute("""
+                SELECT case_id, location
+                FROM cases
+                WHERE status = 'Pending' AND officer_id IS NULL AND deleted_at IS NULL
+                ORDER BY reported_at, case_id;
+            """)
+            for case_id, location in cur:
+                batch.append((case_id, engine.choose(location)))
+                if len(batch) >= batch_size:
+                    assigned += _save_assignments(batch)
+                    batch = []
+        
+        if batch:
+            assigned += _save_assignments(batch)
+        
+        print(f"✓ {assigned} pending cases assigned")
+        return assigned
+    
+    except Exception as e:
+        print(f"✗ Error assigning pending cases: {e}")
+        return None
+
+
+def _save_assignments(batch):
+    """Save many (case_id, officer_id) choices with one UPDATE, return rows changed"""
+    with transaction() as cur:
+        # Cases assigned by someone else in the meantime are left alone
+        query = """
+            UPDATE cases c
+            SET officer_id = v.officer_id
+            FROM (VALUES %s) AS v(case_id, officer_id)
+            WHERE c.case_id = v.case_id AND c.officer_id IS NULL AND c.deleted_at IS NULL;
+        """
+        execute_values(cur, query, batch, page_size=len(batch))
+        return cur.rowcount
+
+
+@profiled
+def get_officer_workloads():
+    """
+    Open cases of every officer, busiest first
+    
+    Returns:
+        List of (officer_id, full_name, rank, station, open_cases)
+    """
+    try:
+        with read() as cur:
+            query = """
+                SELECT o.officer_id, o.full_name, o.rank, o.station, COALESCE(w.open_cases, 0) AS open_cases
+                FROM officers o
+                LEFT JOIN officer_workload_current w ON w.officer_id = o.officer_id
+                WHERE o.deleted_at IS NULL
+                ORDER BY open_cases DESC, o.officer_id;
+            """
+            cur.execute(query)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching officer workloads: {e}")
+        return []
@@ -0,0 +1,616 @@
+# Async (asyncio) versions of the citizen, officer, case and case update operations
+# Every function takes the same arguments and returns the same rows (the row
+# types of database/rows.py) as its sync twin in citizen_ops / officer_ops /
+# case_ops / case_update_ops, so results can be passed to the same display_*
+# functions.
+#
+# Use these from asyncio code (e.g. a web server) after init_async_pool():
+#   case_id = await add_case(citizen_id, "Theft", "Phone stolen", "Nairobi CBD")
+#   case, updates = await get_case_details(case_id)
+
+# Import the async database helpers to talk to PostgreSQL
+from database.async_connection import transaction, read, in_async_transaction, on_async_commit, run_pipeline
+
+# Import the in-memory caches shared with the sync operations
+from database.cache import citizen_cache, officer_cache, cache_key
+
+# Import the row types the sync operations return
+from database.rows import Citizen, Officer, Case, CaseSummary, CaseMatch, CaseUpdate, SearchResult, StatusChange
+
+# The query builders are shared with the sync case operations
+from operations.citizen_ops import _CITIZEN_COLUMNS, _DELETE_CITIZEN_QUERY, _DELETE_CITIZEN_CASES_QUERY
+from operations.officer_ops import _OFFICER_COLUMNS, _DELETE_OFFICER_QUERY, _UNASSIGN_OFFICER_QUERY
+from operations.case_ops import (
+    _page_filter, _find_cases_query, _search_cases_query, _search_cases_sql, _CASE_DETAILS_QUERY,
+    _LOCK_CASE_STATUS_QUERY, _CHANGE_STATUS_QUERY, _STATUS_HISTORY_QUERY, transition_error
+)
+from operations.case_update_ops import (
+    _ADD_UPDATE_QUERY, _LOCK_CASES_QUERY, _REFRESH_SUMMARIES_QUERY, _timeline_query, TIMELINE_PAGE_SIZE
+)
+
+
+# CITIZENS
+async def add_citizen(full_name, phone_number, email=None, address=None):
+    """Async version of citizen_ops.add_citizen: returns citizen_id, None if failed"""
+    try:
+        async with transaction() as cur:
+            query = """
+                INSERT INTO citizens (full_name, phone_number, email, address)
+                VALUES (%s, %s, %s, %s)
+                RETURNING citizen_id;
+            """
+            await cur.execute(query, (full_name, phone_number, email, address))
+            citizen_id = (await cur.fetchone())[0]
+        
+        print(f"✓ Citizen added successfully! ID: {citizen_id}")
+        return citizen_id
+    
+    except Exception as e:
+        print(f"✗ Error adding citizen: {e}")
+        return None
+
+
+async def get_all_citizens():
+    """Async version of citizen_ops.get_all_citizens"""
+    try:
+        async with read() as cur:
+            await cur.execute(f"SELECT {_CITIZEN_COLUMNS} FROM citizens WHERE deleted_at IS NULL ORDER BY citizen_id;")
+            return _rows(Citizen, await cur.fetchall())
+    
+    except Exception as e:
+        print(f"✗ Error fetching citizens: {e}")
+        return None
+
+
+async def get_citizen_by_id(citizen_id):
+    """Async version of citizen_ops.get_citizen_by_id (uses the same cache)"""
+    key = cache_key(citizen_id)
+    if key is not None:
+        found, citizen = citizen_cache.get(key)
+        if found:
+            return citizen
+    
+    try:
+        async with read() as cur:
+            await cur.execute(f"SELECT {_CITIZEN_COLUMNS} FROM citizens WHERE citizen_id = %s AND deleted_at IS NULL;",
+                              (citizen_id,))
+            citizen = _row(Citizen, await cur.fetchone())
+        
+        # Never cache a row read inside a transaction that may still roll back
+        if citizen is not None and key is not None and not in_async_transaction():
+            citizen_cache.put(key, citizen)
+        
+        return citizen
+    
+    except Exception as e:
+        print(f"✗ Error fetching citizen: {e}")
+        return None
+
+
+async def update_citizen(citizen_id, full_name=None, phone_number=None, email=None, address=None):
+    """Async version of citizen_ops.update_citizen: True if successful"""
+    return await _update_row(
+        "citizens", "citizen_id", citizen_id, citizen_cache, "Citizen",
+        {'full_name': full_name, 'phone_number': phone_number, 'email': email, 'address': address}
+    )
+
+
+async def delete_citizen(citizen_id):
+    """Async version of citizen_ops.delete_citizen (soft delete, with their cases): True if successful"""
+    return await _soft_delete(citizen_id, citizen_cache, "Citizen",
+                              [_DELETE_CITIZEN_QUERY, _DELETE_CITIZEN_CASES_QUERY])
+
+
+# OFFICERS
+async def add_officer(full_name, badge_number, rank, phone_number, station=None):
+    """Async version of officer_ops.add_officer: returns officer_id, None if failed"""
+    try:
+        async with transaction() as cur:
+            query = """
+                INSERT INTO officers (full_name, badge_number, rank, phone_number, station)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING officer_id;
+            """
+            await cur.execute(query, (full_name, badge_number, rank, phone_number, station))
+            officer_id = (await cur.fetchone())[0]
+        
+        print(f"✓ Officer added successfully! ID: {officer_id}")
+        return officer_id
+    
+    except Exception as e:
+        print(f"✗ Error adding officer: {e}")
+        return None
+
+
+async def get_all_officers():
+    """Async version of officer_ops.get_all_officers"""
+    try:
+        async with read() as cur:
+            await cur.execute(f"SELECT {_OFFICER_COLUMNS} FROM officers WHERE deleted_at IS NULL ORDER BY officer_id;")
+            return _rows(Officer, await cur.fetchall())
+    
+    except Exception as e:
+        print(f"✗ Error fetching officers: {e}")
+        return None
+
+
+async def get_officer_by_id(officer_id):
+    """Async version of officer_ops.get_officer_by_id (uses the same cache)"""
+    key = cache_key(officer_id)
+    if key is not None:
+        found, officer = officer_cache.get(key)
+        if found:
+            return officer
+    
+    try:
+        async with read() as cur:
+            await cur.execute(f"SELECT {_OFFICER_COLUMNS} FROM officers WHERE officer_id = %s AND deleted_at IS NULL;",
+                              (officer_id,))
+            officer = _row(Officer, await cur.fetchone())
+        
+        if officer is not None and key is not None and not in_async_transaction():
+            officer_cache.put(key, officer)
+        
+        return officer
+    
+    except Exception as e:
+        print(f"✗ Error fetching officer: {e}")
+        return None
+
+
+async def update_officer(officer_id, full_name=None, rank=None, phone_number=None, station=None):
+    """Async version of officer_ops.update_officer: True if successful"""
+    return await _update_row(
+        "officers", "officer_id", officer_id, officer_cache, "Officer",
+        {'full_name': full_name, 'rank': rank, 'phone_number': phone_number, 'station': station}
+    )
+
+
+async def delete_officer(officer_id):
+    """Async version of officer_ops.delete_officer (soft delete, open cases unassigned): True if successful"""
+    return await _soft_delete(officer_id, officer_cache, "Officer",
+                              [_DELETE_OFFICER_QUERY, _UNASSIGN_OFFICER_QUERY])
+
+
+async def _update_row(table, id_column, record_id, cache, label, fields):
+    """Update the given (not None) fields of one citizen or officer"""
+    # Only fields that were provided are updated, like the sync versions
+    updates = [f"{column} = %s" for column, value in fields.items() if value]
+    values = [value for value in fields.values() if value]
+    
+    if not updates:
+        print("✗ No fields to update")
+        return False
+    
+    try:
+        async with transaction() as cur:
+            query = f"UPDATE {table} SET {', '.join(updates)} WHERE {id_column} = %s AND deleted_at IS NULL;"
+            await cur.execute(query, values + [record_id])
+            
+            # The cached copy is out of date once this is committed
+            on_async_commit(cache.invalidate, cache_key(record_id))
+        
+        print(f"✓ {label} {record_id} updated successfully!")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error updating {label.lower()}: {e}")
+        return False
+
+
+async def _soft_delete(record_id, cache, label, queries):
+    """Mark one citizen or officer deleted; the first query marks the row, the rest follow it"""
+    try:
+        async with transaction() as cur:
+            await cur.execute(queries[0], (record_id,))
+            if cur.rowcount == 0:
+                print(f"✗ {label} {record_id} not found")
+                return False
+            for query in queries[1:]:
+                await cur.execute(query, (record_id,))
+            
+            on_async_commit(cache.invalidate, cache_key(record_id))
+        
+        print(f"✓ {label} {record_id} deleted successfully!")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error deleting {label.lower()}: {e}")
+        return False
+
+
+# CASES
+# Columns of a CaseSummary row (same as case_ops.get_all_cases)
+_CASE_COLUMNS = """
+    c.case_id,
+    c.crime_type,
+    c.description,
+    c.location,
+    c.status,
+    c.reported_at,
+    cit.full_name AS citizen_name,
+    o.full_name AS officer_name,
+    c.last_update_at
+"""
+
+# Columns of a CaseMatch row (same as case_ops.get_cases_by_status)
+_CASE_MATCH_COLUMNS = """
+    c.case_id,
+    c.crime_type,
+    c.location,
+    c.status,
+    c.reported_at,
+    cit.full_name AS citizen_name,
+    c.last_update_at
+"""
+
+# Full case details (same as case_ops.get_case_by_id), live or archived
+_LIVE_CASE_DETAILS_QUERY = _CASE_DETAILS_QUERY.format(table="cases", condition="AND c.deleted_at IS NULL")
+_ARCHIVED_CASE_DETAILS_QUERY = _CASE_DETAILS_QUERY.format(table="cases_archive",
+                                                          condition="AND c.deleted_at IS NULL")
+
+
+async def add_case(citizen_id, crime_type, description, location, officer_id=None):
+    """Async version of case_ops.add_case: returns case_id, None if failed"""
+    try:
+        async with transaction() as cur:
+            query = """
+                INSERT INTO cases (citizen_id, officer_id, crime_type, description, location)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING case_id;
+            """
+            await cur.execute(query, (citizen_id, officer_id, crime_type, description, location))
+            case_id = (await cur.fetchone())[0]
+        
+        print(f"✓ Case reported successfully! Case ID: {case_id}")
+        return case_id
+    
+    except Exception as e:
+        print(f"✗ Error adding case: {e}")
+        return None
+
+
+async def add_cases_bulk(cases):
+    """
+    Async version of case_ops.add_cases_bulk
+    The INSERTs are pipelined: all rows are sent before any reply is awaited
+    
+    Returns:
+        List of new case IDs in the same order, empty list if failed
+    """
+    if not cases:
+        return []
+    
+    rows = [
+        (case[0], case[4] if len(case) > 4 else None, case[1], case[2], case[3])
+        for case in cases
+    ]
+    
+    try:
+        async with transaction() as cur:
+            query = """
+                INSERT INTO cases (citizen_id, officer_id, crime_type, description, location)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING case_id;
+            """
+            await cur.executemany(query, rows, returning=True)
+            case_ids = await _fetch_returned_ids(cur)
+        
+        print(f"✓ {len(case_ids)} cases reported successfully!")
+        return case_ids
+    
+    except Exception as e:
+        print(f"✗ Error adding cases: {e}")
+        return []
+
+
+async def get_all_cases(limit=None, after=None):
+    """Async version of case_ops.get_all_cases (keyset paging with `after`)"""
+    page_filter, page_values = _page_filter(after, limit)
+    query = f"""
+        SELECT {_CASE_COLUMNS}
+        FROM cases c
+        JOIN citizens cit ON c.citizen_id = cit.citizen_id
+        LEFT JOIN officers o ON c.officer_id = o.officer_id
+        WHERE c.deleted_at IS NULL {page_filter};
+    """
+    return await _fetch_all(query, page_values, "fetching cases", CaseSummary, failed=[])
+
+
+async def get_case_by_id(case_id, include_archived=False):
+    """Async version of case_ops.get_case_by_id"""
+    try:
+        async with read() as cur:
+            await cur.execute(_LIVE_CASE_DETAILS_QUERY, (case_id,))
+            case = _row(Case, await cur.fetchone())
+            if case is None and include_archived:
+                await cur.execute(_ARCHIVED_CASE_DETAILS_QUERY, (case_id,))
+                case = _row(Case, await cur.fetchone())
+            return case
+    
+    except Exception as e:
+        print(f"✗ Error fetching case: {e}")
+        return None
+
+
+async def get_case_details(case_id, limit=TIMELINE_PAGE_SIZE):
+    """
+    Get a case and the first page of its timeline in one round trip (pipelined)
+    
+    Args:
+        case_id: The case to look up
+        limit: Updates to return (the rest come from get_case_timeline)
+    
+    Returns:
+        (case, updates) like get_case_by_id and get_case_timeline,
+        (None, None) if failed
+    """
+    try:
+        case_rows, updates = await run_pipeline([
+            (_LIVE_CASE_DETAILS_QUERY, (case_id,)),
+            _timeline_query(case_id, limit),
+        ])
+        return (_row(Case, case_rows[0]) if case_rows else None), _rows(CaseUpdate, updates)
+    
+    except Exception as e:
+        print(f"✗ Error fetching case details: {e}")
+        return None, None
+
+
+async def get_cases_by_citizen(citizen_id, limit=20, after_case_id=None):
+    """Async version of case_ops.get_cases_by_citizen"""
+    page_filter = ""
+    values = [citizen_id]
+    if after_case_id is not None:
+        page_filter = "AND c.case_id < %s"
+        values.append(after_case_id)
+    values.append(limit)
+    
+    query = f"""
+        SELECT {_CASE_COLUMNS}
+        FROM cases c
+        JOIN citizens cit ON c.citizen_id = cit.citizen_id
+        LEFT JOIN officers o ON c.officer_id = o.officer_id
+        WHERE c.citizen_id = %s AND c.deleted_at IS NULL {page_filter}
+        ORDER BY c.case_id DESC
+        LIMIT %s;
+    """
+    return await _fetch_all(query, values, "fetching citizen cases", CaseSummary, failed=[])
+
+
+async def get_cases_by_status(status, limit=None, after=None):
+    """Async version of case_ops.get_cases_by_status"""
+    return await _get_cases_where("c.status = %s", status, limit, after, "filtering cases by status")
+
+
+async def get_cases_by_location(location, limit=None, after=None):
+    """Async version of case_ops.get_cases_by_location"""
+    return await _get_cases_where("c.location ILIKE %s", f"%{location}%", limit, after,
+                                  "filtering cases by location")
+
+
+async def get_cases_by_crime_type(crime_type, limit=None, after=None):
+    """Async version of case_ops.get_cases_by_crime_type"""
+    return await _get_cases_where("c.crime_type ILIKE %s", f"%{crime_type}%", limit, after,
+                                  "filtering cases by crime type")
+
+
+async def _get_cases_where(condition, value, limit, after, action):
+    """One page of filtered case rows (CaseMatch)"""
+    page_filter, page_values = _page_filter(after, limit)
+    query = f"""
+        SELECT {_CASE_MATCH_COLUMNS}
+        FROM cases c
+        JOIN citizens cit ON c.citizen_id = cit.citizen_id
+        WHERE {condition} AND c.deleted_at IS NULL {page_filter};
+    """
+    return await _fetch_all(query, [value] + page_values, action, CaseMatch, failed=[])
+
+
+async def find_cases(status=None, location=None, crime_type=None, officer_id=None,
+                     reported_from=None, reported_to=None, order_by="newest",
+                     limit=None, after=None, resolved_from=None, resolved_to=None):
+    """Async version of case_ops.find_cases (same query)"""
+    try:
+        query, values = _find_cases_query(status, location, crime_type, officer_id,
+                                          reported_from, reported_to, order_by, limit, after,
+                                          resolved_from, resolved_to)
+    except ValueError as e:
+        print(f"✗ Error finding cases: {e}")
+        return []
+    return await _fetch_all(query, values, "finding cases", CaseSummary, failed=[])
+
+
+async def search_cases_by_location(term, limit=50):
+    """Async version of case_ops.search_cases_by_location"""
+    query, values = _search_cases_query("location", term, limit)
+    return await _fetch_all(query, values, "searching cases by location", CaseMatch, failed=[])
+
+
+async def search_cases_by_crime_type(term, limit=50):
+    """Async version of case_ops.search_cases_by_crime_type"""
+    query, values = _search_cases_query("crime_type", term, limit)
+    return await _fetch_all(query, values, "searching cases by crime type", CaseMatch, failed=[])
+
+
+async def search_cases(query, filters=None, limit=20):
+    """Async version of case_ops.search_cases (full-text search)"""
+    sql, values = _search_cases_sql(query, filters, limit)
+    return await _fetch_all(sql, values, "searching cases", SearchResult)
+
+
+async def assign_officer_to_case(case_id, officer_id):
+    """Async version of case_ops.assign_officer_to_case: True if successful"""
+    try:
+        async with transaction() as cur:
+            await cur.execute("UPDATE cases SET officer_id = %s WHERE case_id = %s AND deleted_at IS NULL;",
+                              (officer_id, case_id))
+            if cur.rowcount == 0:
+                print(f"✗ Case {case_id} not found")
+                return False
+        
+        print(f"✓ Officer {officer_id} assigned to case {case_id}")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error assigning officer: {e}")
+        return False
+
+
+async def update_case_status(case_id, status, changed_by=None):
+    """Async version of case_ops.update_case_status: True if successful (and allowed)"""
+    try:
+        async with transaction() as cur:
+            await cur.execute(_LOCK_CASE_STATUS_QUERY, (case_id,))
+            row = await cur.fetchone()
+            current_status = row[0] if row else None
+            
+            error = transition_error(case_id, current_status, status)
+            if error:
+                print(f"✗ {error}")
+                return False
+            
+            await cur.execute(_CHANGE_STATUS_QUERY, {'case_id': case_id, 'old_status': current_status,
+                                                     'new_status': status, 'changed_by': changed_by})
+        
+        print(f"✓ Case {case_id} status updated to '{status}'")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error updating case status: {e}")
+        return False
+
+
+async def get_status_history(case_id):
+    """Async version of case_ops.get_status_history"""
+    return await _fetch_all(_STATUS_HISTORY_QUERY, (case_id,), "fetching status history", StatusChange)
+
+
+async def delete_case(case_id):
+    """Async version of case_ops.delete_case (soft delete): True if successful"""
+    try:
+        async with transaction() as cur:
+            await cur.execute("UPDATE cases SET deleted_at = CURRENT_TIMESTAMP "
+                              "WHERE case_id = %s AND deleted_at IS NULL;", (case_id,))
+            if cur.rowcount == 0:
+                print(f"✗ Case {case_id} not found")
+                return False
+        
+        print(f"✓ Case {case_id} deleted successfully!")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error deleting case: {e}")
+        return False
+
+
+# CASE UPDATES
+async def add_case_update(case_id, officer_id, update_note):
+    """Async version of case_update_ops.add_case_update: returns update_id, None if failed"""
+    try:
+        async with transaction() as cur:
+            # Inserts the update and counts it in the case's summary
+            await cur.execute(_ADD_UPDATE_QUERY, (case_id, officer_id, update_note))
+            update_id = (await cur.fetchone())[0]
+        
+        print(f"✓ Case update added successfully! Update ID: {update_id}")
+        return update_id
+    
+    except Exception as e:
+        print(f"✗ Error adding case update: {e}")
+        return None
+
+
+async def add_case_updates_bulk(updates):
+    """Async version of case_update_ops.add_case_updates_bulk (pipelined INSERTs)"""
+    if not updates:
+        return []
+    
+    try:
+        async with transaction() as cur:
+            # Each statement also counts its update in the case's summary
+            await cur.executemany(_ADD_UPDATE_QUERY, updates, returning=True)
+            update_ids = await _fetch_returned_ids(cur)
+        
+        print(f"✓ {len(update_ids)} case updates added successfully!")
+        return update_ids
+    
+    except Exception as e:
+        print(f"✗ Error adding case updates: {e}")
+        return []
+
+
+async def get_updates_by_case(case_id, include_archived=False):
+    """Async version of case_update_ops.get_updates_by_case"""
+    query, values = _timeline_query(case_id)
+    updates = await _fetch_all(query, values, "fetching case updates", CaseUpdate, failed=[])
+    if not updates and include_archived:
+        query, values = _timeline_query(case_id, table="case_updates_archive")
+        updates = await _fetch_all(query, values, "fetching archived case updates", CaseUpdate, failed=[])
+    return updates
+
+
+async def get_case_timeline(case_id, limit=TIMELINE_PAGE_SIZE, before=None):
+    """Async version of case_update_ops.get_case_timeline (see next_timeline_key)"""
+    query, values = _timeline_query(case_id, limit, before)
+    return await _fetch_all(query, values, "fetching case timeline", CaseUpdate)
+
+
+async def delete_case_update(update_id):
+    """Async version of case_update_ops.delete_case_update: True if successful"""
+    try:
+        async with transaction() as cur:
+            await cur.execute("DELETE FROM case_updates WHERE update_id = %s RETURNING case_id;", (update_id,))
+            await _refresh_update_summaries(cur, [row[0] for row in await cur.fetchall()])
+        
+        print(f"✓ Case update {update_id} deleted successfully!")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error deleting case update: {e}")
+        return False
+
+
+# HELPERS
+async def _fetch_all(query, values, action, row_type, failed=None):
+    """
+    Run a read query, return all rows as row_type
+    If it fails, print a ✗ message and return `failed`: None like most sync
+    reads, or [] for the ones whose sync twin returns an empty list
+    """
+    try:
+        async with read() as cur:
+            await cur.execute(query, values)
+            return _rows(row_type, await cur.fetchall())
+    
+    except Exception as e:
+        print(f"✗ Error {action}: {e}")
+        return failed
+
+
+def _row(row_type, row):
+    """A fetched row as row_type (None stays None)"""
+    return row_type._make(row) if row is not None else None
+
+
+def _rows(row_type, rows):
+    """Fetched rows as row_type"""
+    return list(map(row_type._make, rows))
+
+
+async def _refresh_update_summaries(cur, case_ids):
+    """Async version of case_update_ops.refresh_update_summaries"""
+    case_ids = sorted(set(case_ids))
+    if not case_ids:
+        return
+    await cur.execute(_LOCK_CASES_QUERY, (case_ids,))
+    await cur.execute(_REFRESH_SUMMARIES_QUERY, (case_ids,))
+
+
+async def _fetch_returned_ids(cur):
+    """Collect the RETURNING id of every statement run by executemany()"""
+    ids = []
+    while True:
+        ids.append((await cur.fetchone())[0])
+        if not cur.nextset():
+            return ids
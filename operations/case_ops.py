@@ -1,8 +1,35 @@
-# Import database connection functions to talk to PostgreSQL
-from database.connection import get_connection, release_connection
+# Import execute_values to insert many rows in one statement
+from psycopg2.extras import execute_values
+
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import transaction, read, stream, profiled, prepare_statement, execute_prepared
+
+# Case rows have named fields (case.status, see database/rows.py)
+from database.rows import Case, CaseSummary, CaseMatch, SearchResult, StatusChange
+
+# Rows fetched per round trip when streaming cases with iter_cases()
+DEFAULT_ITERSIZE = 2000
+
+# The statuses a case can move to from each status (see update_case_status)
+#   Pending -> Under Investigation -> Resolved or Closed, and Resolved -> Closed
+STATUS_TRANSITIONS = {
+    'Pending': ('Under Investigation',),
+    'Under Investigation': ('Resolved', 'Closed'),
+    'Resolved': ('Closed',),
+    'Closed': (),
+}
+
+# Report a new case (prepared once per connection, see _ADD_CASE below)
+_ADD_CASE_QUERY = """
+    INSERT INTO cases (citizen_id, officer_id, crime_type, description, location)
+    VALUES (%s, %s, %s, %s, %s)
+    RETURNING case_id;
+"""
+_ADD_CASE = prepare_statement("add_case", _ADD_CASE_QUERY)
 
 
 #ADD NEW CASE 
+@profiled
 def add_case(citizen_id, crime_type, description, location, officer_id=None):
     """
     Report a new crime case to the database
@@ -17,68 +44,97 @@ def add_case(citizen_id, crime_type, description, location, officer_id=None):
     Returns:
         case_id if successful, None if failed
     """
-    # Get a database connection from the pool
-    conn = get_connection()
-    
-    if conn:
-        try:
-            # Create a cursor to execute SQL commands
-            cur = conn.cursor()
-            
-            # SQL query to insert a new case into the database
+    try:
+        # Open a transaction (committed when the block ends)
+        with transaction() as cur:
+            # Insert the new case (_ADD_CASE_QUERY, prepared on this connection)
             # RETURNING case_id gives us back the auto-generated ID
+            execute_prepared(cur, _ADD_CASE, (citizen_id, officer_id, crime_type, description, location))
+            
+            # Get the newly created case ID
+            case_id = cur.fetchone()[0]
+        
+        # Show success message
+        print(f"✓ Case reported successfully! Case ID: {case_id}")
+        return case_id
+    
+    except Exception as e:
+        # If something goes wrong, the transaction is rolled back for us
+        print(f"✗ Error adding case: {e}")
+        return None
+
+
+#ADD MANY CASES AT ONCE
+@profiled
+def add_cases_bulk(cases):
+    """
+    Report many crime cases with a single INSERT statement
+    All cases are saved together, or none are if one of them is invalid
+    
+    Args:
+        cases: List of (citizen_id, crime_type, description, location) or
+               (citizen_id, crime_type, description, location, officer_id)
+    
+    Returns:
+        List of new case IDs in the same order, empty list if failed
+    """
+    if not cases:
+        return []
+    
+    # Fill in the optional officer_id so every row has 5 values
+    rows = [
+        (case[0], case[4] if len(case) > 4 else None, case[1], case[2], case[3])
+        for case in cases
+    ]
+    
+    try:
+        with transaction() as cur:
+            # execute_values expands the single %s into one VALUES list for all rows
             query = """
                 INSERT INTO cases (citizen_id, officer_id, crime_type, description, location)
-                VALUES (%s, %s, %s, %s, %s)
+                VALUES %s
                 RETURNING case_id;
             """
             
-            # Execute the query with the provided data
-            cur.execute(query, (citizen_id, officer_id, crime_type, description, location))
-            
-            # Get the newly created case ID
-            case_id = cur.fetchone()[0]
-            
-            # Save changes to the database
-            conn.commit()
-            
-            # Clean up
-            cur.close()
-            release_connection(conn)
-            
-            # Show success message
-            print(f"✓ Case reported successfully! Case ID: {case_id}")
-            return case_id
-            
-        except Exception as e:
-            # If something goes wrong, undo changes and show error
-            print(f"✗ Error adding case: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return None
+            # page_size = all rows, so this is one statement / one round trip
+            results = execute_values(cur, query, rows, page_size=len(rows), fetch=True)
+            case_ids = [row[0] for row in results]
+        
+        print(f"✓ {len(case_ids)} cases reported successfully!")
+        return case_ids
     
-    return None
+    except Exception as e:
+        print(f"✗ Error adding cases: {e}")
+        return []
 
 
 #GET ALL CASES
-def get_all_cases():
+@profiled
+def get_all_cases(limit=None, after=None):
     """
-    Retrieve all crime cases from the database with citizen and officer names
+    Retrieve crime cases from the database with citizen and officer names
+    Newest cases come first, ordered by (reported_at, case_id)
+    
+    Args:
+        limit: (Optional) Maximum number of cases to return (one page)
+        after: (Optional) Page key of the last case already shown,
+               see next_page_key()
     
     Returns:
-        List of all cases with their details, empty list if none found
+        List of CaseSummary rows, empty list if none found
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
+    try:
+        # Listings may be a moment behind other sessions' changes, so they
+        # are read from a replica when one is configured (see READ REPLICAS
+        # in database/connection.py); this session's own changes are included
+        with read(replica=True) as cur:
+            # Keyset paging: continue after the last (reported_at, case_id) seen
+            page_filter, page_values = _page_filter(after, limit)
             
             # SQL query to get all cases with related citizen and officer information
             # JOIN combines data from multiple tables
             # LEFT JOIN includes cases even if no officer is assigned yet
-            query = """
+            query = f"""
                 SELECT 
                     c.case_id,
                     c.crime_type,
@@ -87,232 +143,720 @@ def get_all_cases():
                     c.status,
                     c.reported_at,
                     cit.full_name AS citizen_name,
-                    o.full_name AS officer_name
+                    o.full_name AS officer_name,
+                    c.last_update_at
                 FROM cases c
                 JOIN citizens cit ON c.citizen_id = cit.citizen_id
                 LEFT JOIN officers o ON c.officer_id = o.officer_id
-                ORDER BY c.case_id DESC;
+                WHERE c.deleted_at IS NULL {page_filter};
             """
             
-            cur.execute(query)
+            cur.execute(query, page_values, row_type=CaseSummary)
             
-            # Fetch all results
-            cases = cur.fetchall()
-            
-            # Clean up
-            cur.close()
-            release_connection(conn)
-            
-            return cases
+            # Fetch the page (or everything when no limit is given)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching cases: {e}")
+        return []
+
+
+#STREAM CASES
+@profiled
+def iter_cases(status=None, location=None, crime_type=None, itersize=DEFAULT_ITERSIZE):
+    """
+    Stream cases one at a time instead of loading them all into memory
+    Uses a named (server-side) cursor, so PostgreSQL sends the rows in
+    batches of `itersize` while we loop over them
+    
+    Args:
+        status: (Optional) Only cases with this status
+        location: (Optional) Only cases whose location contains this text
+        crime_type: (Optional) Only cases whose crime type contains this text
+        itersize: Number of rows fetched from the server per round trip
+    
+    Yields:
+        CaseSummary rows (like get_all_cases), newest first
+    
+    Raises:
+        The database error if the cases could not be read (after printing it)
+    """
+    # Build the WHERE clause from the filters that were given
+    # (deleted cases are never listed)
+    conditions = ["c.deleted_at IS NULL"]
+    values = []
+    if status:
+        conditions.append("c.status = %s")
+        values.append(status)
+    if location:
+        conditions.append("c.location ILIKE %s")
+        values.append(f"%{location}%")
+    if crime_type:
+        conditions.append("c.crime_type ILIKE %s")
+        values.append(f"%{crime_type}%")
+    where = "WHERE " + " AND ".join(conditions)
+    
+    query = f"""
+        SELECT 
+            c.case_id,
+            c.crime_type,
+            c.description,
+            c.location,
+            c.status,
+            c.reported_at,
+            cit.full_name AS citizen_name,
+            o.full_name AS officer_name,
+            c.last_update_at
+        FROM cases c
+        JOIN citizens cit ON c.citizen_id = cit.citizen_id
+        LEFT JOIN officers o ON c.officer_id = o.officer_id
+        {where}
+        ORDER BY c.reported_at DESC, c.case_id DESC;
+    """
+    
+    try:
+        # The cursor is closed and the connection released even if the
+        # caller stops looping early
+        with stream("iter_cases", itersize, replica=True) as cur:
+            cur.execute(query, values, row_type=CaseSummary)
             
-        except Exception as e:
-            print(f"✗ Error fetching cases: {e}")
-            if conn:
-                release_connection(conn)
-            return []
+            # Rows arrive from the server `itersize` at a time
+            for case in cur:
+                yield case
     
-    return []
+    except Exception as e:
+        # Re-raised: an empty listing must not look like a failed one
+        print(f"✗ Error streaming cases: {e}")
+        raise
 
 
 #SPECIFIC CASE 
-def get_case_by_id(case_id):
+# Full case details (shared with the async version and the archive lookup)
+_CASE_DETAILS_QUERY = """
+    SELECT 
+        c.case_id,
+        c.citizen_id,
+        c.officer_id,
+        c.crime_type,
+        c.description,
+        c.location,
+        c.status,
+        c.reported_at,
+        c.resolved_at,
+        cit.full_name AS citizen_name,
+        cit.phone_number AS citizen_phone,
+        o.full_name AS officer_name,
+        o.badge_number AS officer_badge,
+        c.last_update_at,
+        c.last_update_officer_id,
+        c.update_count
+    FROM {table} c
+    JOIN citizens cit ON c.citizen_id = cit.citizen_id
+    LEFT JOIN officers o ON c.officer_id = o.officer_id
+    WHERE c.case_id = %s {condition};
+"""
+
+# The live case lookup is the most frequent query of all; by case_id alone
+# it can not skip any month partition, so planning it costs more than
+# running it. It is prepared once per connection (see prepare_statement)
+_GET_CASE = prepare_statement(
+    "get_case_by_id",
+    _CASE_DETAILS_QUERY.format(table="cases", condition="AND c.deleted_at IS NULL")
+)
+
+
+@profiled
+def get_case_by_id(case_id, include_archived=False):
     """
     Get detailed information about a specific case
     
     Args:
         case_id: The ID of the case to retrieve
+        include_archived: Also look in the archive (see archive_ops) if the
+                          case is no longer in the live table
     
     Returns:
-        Case details including citizen and officer info, None if not found
+        Case row (with citizen and officer info), None if not found
+        (deleted cases are not found)
+    """
+    try:
+        with read() as cur:
+            # Get all case details plus citizen and officer information
+            # (columns are listed so the search_vector column is not sent back)
+            execute_prepared(cur, _GET_CASE, (case_id,), row_type=Case)
+            case = cur.fetchone()
+            
+            # Archived cases keep their columns, so they come back the same way
+            if case is None and include_archived:
+                query = _CASE_DETAILS_QUERY.format(table="cases_archive", condition="AND c.deleted_at IS NULL")
+                cur.execute(query, (case_id,), row_type=Case)
+                case = cur.fetchone()
+            
+            return case
+    
+    except Exception as e:
+        print(f"✗ Error fetching case: {e}")
+        return None
+
+
+#CASES REPORTED BY ONE CITIZEN
+@profiled
+def get_cases_by_citizen(citizen_id, limit=20, after_case_id=None):
     """
-    conn = get_connection()
+    Get one page of the cases reported by a specific citizen
+    Uses idx_cases_citizen_page so only this citizen's rows are read
+    
+    Args:
+        citizen_id: The citizen whose cases you want to see
+        limit: Maximum number of cases to return (one page)
+        after_case_id: (Optional) Last case ID of the previous page,
+                       only older cases are returned
     
-    if conn:
-        try:
-            cur = conn.cursor()
+    Returns:
+        List of CaseSummary rows, newest first
+    """
+    try:
+        with read() as cur:
+            # Only start after the previous page if we were given one
+            # (case_id < last seen ID keeps paging on the index, no OFFSET)
+            page_filter = ""
+            values = [citizen_id]
+            if after_case_id is not None:
+                page_filter = "AND c.case_id < %s"
+                values.append(after_case_id)
+            values.append(limit)
             
-            # Get all case details plus citizen and officer information
-            query = """
-                SELECT 
-                    c.*,
+            # One query for the whole page, joined with the names we display
+            query = f"""
+                SELECT
+                    c.case_id,
+                    c.crime_type,
+                    c.description,
+                    c.location,
+                    c.status,
+                    c.reported_at,
                     cit.full_name AS citizen_name,
-                    cit.phone_number AS citizen_phone,
                     o.full_name AS officer_name,
-                    o.badge_number AS officer_badge
+                    c.last_update_at
                 FROM cases c
                 JOIN citizens cit ON c.citizen_id = cit.citizen_id
                 LEFT JOIN officers o ON c.officer_id = o.officer_id
-                WHERE c.case_id = %s;
+                WHERE c.citizen_id = %s AND c.deleted_at IS NULL {page_filter}
+                ORDER BY c.case_id DESC
+                LIMIT %s;
             """
             
-            cur.execute(query, (case_id,))
-            
-            # Fetch single result
-            case = cur.fetchone()
-            
-            cur.close()
-            release_connection(conn)
-            
-            return case
-            
-        except Exception as e:
-            print(f"✗ Error fetching case: {e}")
-            if conn:
-                release_connection(conn)
-            return None
+            cur.execute(query, values, row_type=CaseSummary)
+            return cur.fetchall()
     
-    return None
+    except Exception as e:
+        print(f"✗ Error fetching citizen cases: {e}")
+        return []
 
 
 #BY STATUS 
-def get_cases_by_status(status):
+@profiled
+def get_cases_by_status(status, limit=None, after=None):
     """
-    Find all cases with a specific status
+    Find cases with a specific status
     
     Args:
         status: The status to filter by (e.g., "Pending", "Resolved")
+        limit: (Optional) Maximum number of cases to return (one page)
+        after: (Optional) Page key of the last case already shown
     
     Returns:
-        List of cases matching the status
+        List of CaseMatch rows with that status
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
+    try:
+        with read(replica=True) as cur:
+            page_filter, page_values = _page_filter(after, limit)
             
             # Get cases that match the specified status
-            query = """
+            query = f"""
                 SELECT 
                     c.case_id,
                     c.crime_type,
                     c.location,
                     c.status,
                     c.reported_at,
-                    cit.full_name AS citizen_name
+                    cit.full_name AS citizen_name,
+                    c.last_update_at
                 FROM cases c
                 JOIN citizens cit ON c.citizen_id = cit.citizen_id
-                WHERE c.status = %s
-                ORDER BY c.reported_at DESC;
+                WHERE c.status = %s AND c.deleted_at IS NULL {page_filter};
             """
             
-            cur.execute(query, (status,))
-            cases = cur.fetchall()
-            
-            cur.close()
-            release_connection(conn)
-            
-            return cases
-            
-        except Exception as e:
-            print(f"✗ Error filtering cases by status: {e}")
-            if conn:
-                release_connection(conn)
-            return []
+            cur.execute(query, [status] + page_values, row_type=CaseMatch)
+            return cur.fetchall()
     
-    return []
+    except Exception as e:
+        print(f"✗ Error filtering cases by status: {e}")
+        return []
 
 
 #FILTER BY LOCATION 
-def get_cases_by_location(location):
+@profiled
+def get_cases_by_location(location, limit=None, after=None):
     """
-    Find all cases reported in a specific location
+    Find cases reported in a specific location
     
     Args:
         location: The location to search for (partial match)
+        limit: (Optional) Maximum number of cases to return (one page)
+        after: (Optional) Page key of the last case already shown
     
     Returns:
-        List of cases from that location
+        List of CaseMatch rows from that location
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
+    try:
+        with read(replica=True) as cur:
+            page_filter, page_values = _page_filter(after, limit)
             
             # ILIKE allows case-insensitive search
             # %location% means "contains this word anywhere"
-            query = """
+            query = f"""
                 SELECT 
                     c.case_id,
                     c.crime_type,
                     c.location,
                     c.status,
                     c.reported_at,
-                    cit.full_name AS citizen_name
+                    cit.full_name AS citizen_name,
+                    c.last_update_at
                 FROM cases c
                 JOIN citizens cit ON c.citizen_id = cit.citizen_id
-                WHERE c.location ILIKE %s
-                ORDER BY c.reported_at DESC;
+                WHERE c.location ILIKE %s AND c.deleted_at IS NULL {page_filter};
             """
             
-            cur.execute(query, (f"%{location}%",))
-            cases = cur.fetchall()
-            
-            cur.close()
-            release_connection(conn)
-            
-            return cases
-            
-        except Exception as e:
-            print(f"✗ Error filtering cases by location: {e}")
-            if conn:
-                release_connection(conn)
-            return []
+            cur.execute(query, [f"%{location}%"] + page_values, row_type=CaseMatch)
+            return cur.fetchall()
     
-    return []
+    except Exception as e:
+        print(f"✗ Error filtering cases by location: {e}")
+        return []
 
 
 #FILTER BY CRIME TYPE
-def get_cases_by_crime_type(crime_type):
+@profiled
+def get_cases_by_crime_type(crime_type, limit=None, after=None):
     """
-    Find all cases of a specific crime type
+    Find cases of a specific crime type
     
     Args:
         crime_type: The type of crime to search for (e.g., "Theft")
+        limit: (Optional) Maximum number of cases to return (one page)
+        after: (Optional) Page key of the last case already shown
     
     Returns:
-        List of cases of that crime type
+        List of CaseMatch rows of that crime type
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
+    try:
+        with read(replica=True) as cur:
+            page_filter, page_values = _page_filter(after, limit)
             
             # Search for cases with matching crime type
-            query = """
+            query = f"""
                 SELECT 
                     c.case_id,
                     c.crime_type,
                     c.location,
                     c.status,
                     c.reported_at,
-                    cit.full_name AS citizen_name
+                    cit.full_name AS citizen_name,
+                    c.last_update_at
                 FROM cases c
                 JOIN citizens cit ON c.citizen_id = cit.citizen_id
-                WHERE c.crime_type ILIKE %s
-                ORDER BY c.reported_at DESC;
+                WHERE c.crime_type ILIKE %s AND c.deleted_at IS NULL {page_filter};
             """
             
-            cur.execute(query, (f"%{crime_type}%",))
-            cases = cur.fetchall()
-            
-            cur.close()
-            release_connection(conn)
-            
-            return cases
-            
-        except Exception as e:
-            print(f"✗ Error filtering cases by crime type: {e}")
-            if conn:
-                release_connection(conn)
-            return []
+            cur.execute(query, [f"%{crime_type}%"] + page_values, row_type=CaseMatch)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error filtering cases by crime type: {e}")
+        return []
+
+
+#FIND CASES (COMBINED FILTERS)
+@profiled
+def find_cases(status=None, location=None, crime_type=None, officer_id=None,
+               reported_from=None, reported_to=None, order_by="newest",
+               limit=None, after=None, resolved_from=None, resolved_to=None):
+    """
+    Find cases matching any combination of filters with one query
+    Every filter is optional; the ones given must all match
+    
+    Args:
+        status: Only cases with this status
+        location: Only cases whose location contains this text
+        crime_type: Only cases whose crime type contains this text
+        officer_id: Only cases assigned to this officer
+        reported_from: Only cases reported at or after this date/time
+        reported_to: Only cases reported before this date/time
+        order_by: "newest" (default) or "oldest" first
+        limit: (Optional) Maximum number of cases to return (one page)
+        after: (Optional) Page key of the last case already shown,
+               see next_page_key()
+        resolved_from: Only cases resolved (or closed) at or after this date/time
+        resolved_to: Only cases resolved (or closed) before this date/time
+    
+    Returns:
+        List of CaseSummary rows (like get_all_cases)
+    """
+    try:
+        query, values = _find_cases_query(status, location, crime_type, officer_id,
+                                          reported_from, reported_to, order_by, limit, after,
+                                          resolved_from, resolved_to)
+        with read(replica=True) as cur:
+            cur.execute(query, values, row_type=CaseSummary)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error finding cases: {e}")
+        return []
+
+
+@profiled
+def explain_find_cases(**filters):
+    """
+    Ask PostgreSQL how it would run find_cases() for these filters
+    Sequential scans are switched off while planning, so a "Seq Scan" in
+    the plan means no index can serve this combination of filters
+    
+    Args:
+        filters: Same keyword arguments as find_cases()
+    
+    Returns:
+        The plan as a list of lines (EXPLAIN text output)
+    """
+    query, values = _find_cases_query(**filters)
+    with transaction() as cur:
+        # SET LOCAL only lasts until this transaction ends
+        cur.execute("SET LOCAL enable_seqscan = off;")
+        cur.execute("EXPLAIN " + query, values)
+        plan = [row[0] for row in cur.fetchall()]
+        # Put the setting back in case we are inside a bigger transaction
+        cur.execute("RESET enable_seqscan;")
+    return plan
+
+
+def _find_cases_query(status=None, location=None, crime_type=None, officer_id=None,
+                      reported_from=None, reported_to=None, order_by="newest",
+                      limit=None, after=None, resolved_from=None, resolved_to=None):
+    """Build the SQL and values for find_cases()"""
+    if order_by not in ("newest", "oldest"):
+        raise ValueError(f"order_by must be 'newest' or 'oldest', not {order_by!r}")
+    
+    # Only filters that were given become conditions, so each combination
+    # produces a plain query the planner can match to an index:
+    #   status (+ dates)      -> idx_cases_status_reported (status, reported_at, case_id)
+    #   officer (+ status)    -> idx_cases_officer_status (officer_id, status, reported_at, case_id)
+    #   location / crime type -> trigram indexes
+    #   dates only            -> idx_cases_reported
+    #   resolved dates        -> idx_cases_resolved / idx_cases_status_resolved
+    # Every index only covers active cases, so that condition is always there
+    conditions = ["c.deleted_at IS NULL"]
+    values = []
+    if status:
+        conditions.append("c.status = %s")
+        values.append(status)
+    if officer_id:
+        conditions.append("c.officer_id = %s")
+        values.append(officer_id)
+    if location:
+        conditions.append("c.location ILIKE %s")
+        values.append(f"%{location}%")
+    if crime_type:
+        conditions.append("c.crime_type ILIKE %s")
+        values.append(f"%{crime_type}%")
+    if reported_from:
+        conditions.append("c.reported_at >= %s")
+        values.append(reported_from)
+    if reported_to:
+        conditions.append("c.reported_at < %s")
+        values.append(reported_to)
+    if resolved_from:
+        conditions.append("c.resolved_at >= %s")
+        values.append(resolved_from)
+    if resolved_to:
+        conditions.append("c.resolved_at < %s")
+        values.append(resolved_to)
+    
+    # Keyset paging in the chosen direction
+    direction = "DESC" if order_by == "newest" else "ASC"
+    # (the plain reported_at bound lets PostgreSQL skip whole month partitions)
+    if after is not None:
+        comparison = "<" if order_by == "newest" else ">"
+        conditions.append(f"c.reported_at {comparison}= %s")
+        conditions.append(f"(c.reported_at, c.case_id) {comparison} (%s, %s)")
+        values.extend([after[0], *after])
+    
+    where = "WHERE " + " AND ".join(conditions)
     
-    return []
+    query = f"""
+        SELECT 
+            c.case_id,
+            c.crime_type,
+            c.description,
+            c.location,
+            c.status,
+            c.reported_at,
+            cit.full_name AS citizen_name,
+            o.full_name AS officer_name,
+            c.last_update_at
+        FROM cases c
+        JOIN citizens cit ON c.citizen_id = cit.citizen_id
+        LEFT JOIN officers o ON c.officer_id = o.officer_id
+        {where}
+        ORDER BY c.reported_at {direction}, c.case_id {direction}
+    """
+    if limit is not None:
+        query += " LIMIT %s"
+        values.append(limit)
+    
+    return query, values
+
+
+#SEARCH BY LOCATION / CRIME TYPE
+@profiled
+def search_cases_by_location(term, limit=50):
+    """
+    Find the cases whose location best matches a search term
+    Matches text anywhere in the location and tolerates small typos
+    (e.g. "Nairobi" or "Nariobi" will both find "Nairobi CBD")
+    
+    Args:
+        term: Text to search for
+        limit: Maximum number of cases to return
+    
+    Returns:
+        List of CaseMatch rows (like get_cases_by_location), best match first
+    """
+    return _search_cases("location", term, limit)
+
+
+@profiled
+def search_cases_by_crime_type(term, limit=50):
+    """
+    Find the cases whose crime type best matches a search term
+    (e.g. "Theft" will find "Grand Theft", "Thef" will find "Theft")
+    
+    Args:
+        term: Text to search for
+        limit: Maximum number of cases to return
+    
+    Returns:
+        List of CaseMatch rows (like get_cases_by_crime_type), best match first
+    """
+    return _search_cases("crime_type", term, limit)
+
+
+def _search_cases(column, term, limit):
+    """Ranked trigram search on one text column of cases"""
+    query, values = _search_cases_query(column, term, limit)
+    
+    try:
+        with read(replica=True) as cur:
+            cur.execute(query, values, row_type=CaseMatch)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error searching cases by {column.replace('_', ' ')}: {e}")
+        return []
+
+
+def _search_cases_query(column, term, limit):
+    """Build the SQL and values for _search_cases()"""
+    # Only these columns have trigram indexes (and the name goes into the SQL)
+    if column not in ("location", "crime_type"):
+        raise ValueError(f"Can not search cases by {column}")
+    
+    # Both conditions are answered by the column's trigram (GIN) index:
+    #   ILIKE  - the term appears anywhere in the text
+    #   <%     - a word in the text is similar to the term (typos)
+    # word_similarity() then ranks the matches, best first
+    query = f"""
+        SELECT 
+            c.case_id,
+            c.crime_type,
+            c.location,
+            c.status,
+            c.reported_at,
+            cit.full_name AS citizen_name,
+            c.last_update_at
+        FROM cases c
+        JOIN citizens cit ON c.citizen_id = cit.citizen_id
+        WHERE (c.{column} ILIKE %s OR %s <%% c.{column}) AND c.deleted_at IS NULL
+        ORDER BY word_similarity(%s, c.{column}) DESC, c.reported_at DESC, c.case_id DESC
+        LIMIT %s;
+    """
+    
+    return query, (f"%{term}%", term, term, limit)
+
+
+#FULL-TEXT SEARCH
+@profiled
+def search_cases(query, filters=None, limit=20):
+    """
+    Search the text of cases (crime type, location, description) and of
+    their case update notes, best matches first
+    Uses the GIN full-text indexes, so the tables are never scanned
+    
+    Args:
+        query: Words to search for, web-search style
+               (e.g. "stolen phone", "knife -kitchen", "\"red car\"")
+        filters: (Optional) Dictionary narrowing the results, any of:
+                 status, crime_type, location, officer_id,
+                 reported_from, reported_to
+        limit: Maximum number of cases to return
+    
+    Returns:
+        List of SearchResult rows (case_id, crime_type, location, status,
+        reported_at, rank, snippet) where snippet is the best matching text
+        with the matches in [[ ]]; None if failed
+    """
+    sql, values = _search_cases_sql(query, filters, limit)
+    
+    try:
+        with read(replica=True) as cur:
+            cur.execute(sql, values, row_type=SearchResult)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error searching cases: {e}")
+        return None
+
+
+def _search_cases_sql(query, filters=None, limit=20):
+    """Build the SQL and values for search_cases()"""
+    filters = filters or {}
+    
+    # Turn the filters into extra conditions on the matching cases
+    # (notes of deleted cases can match, so their cases are dropped here)
+    conditions = ["c.deleted_at IS NULL"]
+    values = {'query': query, 'limit': limit}
+    if filters.get('status'):
+        conditions.append("c.status = %(status)s")
+        values['status'] = filters['status']
+    if filters.get('crime_type'):
+        conditions.append("c.crime_type ILIKE %(crime_type)s")
+        values['crime_type'] = f"%{filters['crime_type']}%"
+    if filters.get('location'):
+        conditions.append("c.location ILIKE %(location)s")
+        values['location'] = f"%{filters['location']}%"
+    if filters.get('officer_id'):
+        conditions.append("c.officer_id = %(officer_id)s")
+        values['officer_id'] = filters['officer_id']
+    if filters.get('reported_from'):
+        conditions.append("c.reported_at >= %(reported_from)s")
+        values['reported_from'] = filters['reported_from']
+    if filters.get('reported_to'):
+        conditions.append("c.reported_at < %(reported_to)s")
+        values['reported_to'] = filters['reported_to']
+    where = "WHERE " + " AND ".join(conditions)
+    
+    # 1. hits: matching cases and matching notes, each found through its GIN index
+    # 2. best: the best scoring hit for every case
+    # 3. top:  apply the filters and keep the `limit` best cases
+    # 4. only those few rows get a highlighted snippet (ts_headline is slow)
+    sql = f"""
+        WITH q AS (
+            SELECT websearch_to_tsquery('english', %(query)s) AS query
+        ),
+        hits AS (
+            SELECT c.case_id, ts_rank(c.search_vector, q.query) AS rank, NULL::INTEGER AS update_id
+            FROM cases c, q
+            WHERE c.search_vector @@ q.query AND c.deleted_at IS NULL
+            UNION ALL
+            SELECT cu.case_id, ts_rank(cu.note_vector, q.query), cu.update_id
+            FROM case_updates cu, q
+            WHERE cu.note_vector @@ q.query
+        ),
+        best AS (
+            SELECT DISTINCT ON (case_id) case_id, rank, update_id
+            FROM hits
+            ORDER BY case_id, rank DESC
+        ),
+        top AS (
+            SELECT b.case_id, b.rank, b.update_id
+            FROM best b
+            JOIN cases c ON c.case_id = b.case_id
+            {where}
+            ORDER BY b.rank DESC, b.case_id DESC
+            LIMIT %(limit)s
+        )
+        SELECT 
+            c.case_id,
+            c.crime_type,
+            c.location,
+            c.status,
+            c.reported_at,
+            t.rank,
+            ts_headline(
+                'english',
+                COALESCE(cu.update_note, c.description),
+                q.query,
+                'StartSel=[[, StopSel=]], MaxWords=20, MinWords=8, MaxFragments=2'
+            ) AS snippet
+        FROM top t
+        JOIN cases c ON c.case_id = t.case_id
+        LEFT JOIN case_updates cu ON cu.update_id = t.update_id
+        CROSS JOIN q
+        ORDER BY t.rank DESC, t.case_id DESC;
+    """
+    
+    return sql, values
+
+
+#PAGING HELPERS
+def next_page_key(cases):
+    """
+    Get the key to pass as `after` to fetch the page after these cases
+    
+    Args:
+        cases: The page of cases that was just shown
+    
+    Returns:
+        (reported_at, case_id) of the last case, None if the page was empty
+    """
+    if not cases:
+        return None
+    
+    # CaseSummary and CaseMatch rows both have these fields
+    last = cases[-1]
+    return (last.reported_at, last.case_id)
+
+
+def _page_filter(after, limit):
+    """
+    Build the keyset paging part of a case listing query
+    
+    Returns:
+        (SQL to append after the WHERE conditions, list of its values)
+    """
+    sql = ""
+    values = []
+    
+    # Row comparison matches the ORDER BY, so the index can jump straight
+    # to the first row of the next page instead of counting an OFFSET
+    # (the plain reported_at bound says the same thing in a form PostgreSQL
+    # can use to skip the newer month partitions altogether)
+    if after is not None:
+        sql += " AND c.reported_at <= %s AND (c.reported_at, c.case_id) < (%s, %s)"
+        values.extend([after[0], *after])
+    
+    sql += " ORDER BY c.reported_at DESC, c.case_id DESC"
+    
+    if limit is not None:
+        sql += " LIMIT %s"
+        values.append(limit)
+    
+    return sql, values
 
 
 #OFFICER 
+@profiled
 def assign_officer_to_case(case_id, officer_id):
     """
     Assign a police officer to handle a specific case
@@ -324,79 +868,139 @@ def assign_officer_to_case(case_id, officer_id):
     Returns:
         True if successful, False if failed
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
+    try:
+        with transaction() as cur:
             # Update the case with the officer's ID
-            query = "UPDATE cases SET officer_id = %s WHERE case_id = %s;"
+            query = "UPDATE cases SET officer_id = %s WHERE case_id = %s AND deleted_at IS NULL;"
             cur.execute(query, (officer_id, case_id))
-            
-            # Save changes
-            conn.commit()
-            
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Officer {officer_id} assigned to case {case_id}")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error assigning officer: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            if cur.rowcount == 0:
+                print(f"✗ Case {case_id} not found")
+                return False
+        
+        print(f"✓ Officer {officer_id} assigned to case {case_id}")
+        return True
     
-    return False
+    except Exception as e:
+        print(f"✗ Error assigning officer: {e}")
+        return False
 
 
 #UPDATE CASE STATUS
-def update_case_status(case_id, status):
+# Locks the case, so two officers changing it at once are checked one after the other
+_LOCK_CASE_STATUS_QUERY = "SELECT status FROM cases WHERE case_id = %s AND deleted_at IS NULL FOR UPDATE;"
+
+# Changes the status and records the change in the history with one statement
+# resolved_at records when the case was first Resolved or Closed
+# (it is used for the time to resolution statistics)
+_CHANGE_STATUS_QUERY = """
+    WITH changed AS (
+        UPDATE cases
+        SET status = %(new_status)s,
+            resolved_at = CASE WHEN %(new_status)s::VARCHAR IN ('Resolved', 'Closed')
+                               THEN COALESCE(resolved_at, CURRENT_TIMESTAMP) END
+        WHERE case_id = %(case_id)s
+        RETURNING case_id
+    )
+    INSERT INTO case_status_history (case_id, old_status, new_status, changed_by)
+    SELECT case_id, %(old_status)s, %(new_status)s, %(changed_by)s
+    FROM changed;
+"""
+
+# A case's status changes, oldest first (idx_case_status_history_case)
+_STATUS_HISTORY_QUERY = """
+    SELECT history_id, old_status, new_status, changed_by, changed_at
+    FROM case_status_history
+    WHERE case_id = %s
+    ORDER BY changed_at, history_id;
+"""
+
+
+def transition_error(case_id, current_status, new_status):
+    """
+    Check a status change against STATUS_TRANSITIONS
+    
+    Returns:
+        Why the change is not allowed, None if it is
+    """
+    if current_status is None:
+        return f"Case {case_id} not found"
+    if new_status not in STATUS_TRANSITIONS:
+        return f"Unknown status '{new_status}'"
+    allowed = STATUS_TRANSITIONS.get(current_status, ())
+    if new_status not in allowed:
+        next_steps = ", ".join(allowed) if allowed else "none, the case is finished"
+        return (f"Case {case_id} can not go from '{current_status}' to '{new_status}' "
+                f"(allowed: {next_steps})")
+    return None
+
+
+@profiled
+def update_case_status(case_id, status, changed_by=None):
     """
-    Change the status of a case (e.g., from Pending to Under Investigation)
+    Move a case to its next status (e.g., from Pending to Under Investigation)
+    Only the moves in STATUS_TRANSITIONS are allowed; every move is recorded
+    in case_status_history in the same transaction
     
     Args:
         case_id: The case to update
         status: The new status
+        changed_by: (Optional) ID of the officer making the change
     
     Returns:
-        True if successful, False if failed
+        True if successful, False if failed (or the move is not allowed)
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Update the case status
-            query = "UPDATE cases SET status = %s WHERE case_id = %s;"
-            cur.execute(query, (status, case_id))
+    try:
+        with transaction() as cur:
+            cur.execute(_LOCK_CASE_STATUS_QUERY, (case_id,))
+            row = cur.fetchone()
+            current_status = row[0] if row else None
             
-            conn.commit()
+            error = transition_error(case_id, current_status, status)
+            if error:
+                print(f"✗ {error}")
+                return False
             
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Case {case_id} status updated to '{status}'")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error updating case status: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            cur.execute(_CHANGE_STATUS_QUERY, {'case_id': case_id, 'old_status': current_status,
+                                               'new_status': status, 'changed_by': changed_by})
+        
+        print(f"✓ Case {case_id} status updated to '{status}'")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error updating case status: {e}")
+        return False
+
+
+@profiled
+def get_status_history(case_id):
+    """
+    Get every status change of a case, oldest first
+    (still available after the case itself is deleted)
+    
+    Args:
+        case_id: The case whose history you want to see
+    
+    Returns:
+        List of StatusChange rows (history_id, old_status, new_status,
+        changed_by, changed_at), empty if none found, None if failed
+    """
+    try:
+        with read() as cur:
+            cur.execute(_STATUS_HISTORY_QUERY, (case_id,), row_type=StatusChange)
+            return cur.fetchall()
     
-    return False
+    except Exception as e:
+        print(f"✗ Error fetching status history: {e}")
+        return None
 
 
 # CASE 
+@profiled
 def delete_case(case_id):
     """
-    Permanently remove a case from the database
+    Delete a case (soft delete: it is marked deleted and hidden everywhere,
+    its updates and status history are kept, and archive_old_cases() later
+    moves it out of the live table)
     
     Args:
         case_id: The case to delete
@@ -404,32 +1008,21 @@ def delete_case(case_id):
     Returns:
         True if successful, False if failed
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Delete the case
-            query = "DELETE FROM cases WHERE case_id = %s;"
+    try:
+        with transaction() as cur:
+            # Mark the case deleted (the statistics triggers stop counting it)
+            query = "UPDATE cases SET deleted_at = CURRENT_TIMESTAMP WHERE case_id = %s AND deleted_at IS NULL;"
             cur.execute(query, (case_id,))
-            
-            conn.commit()
-            
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Case {case_id} deleted successfully!")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error deleting case: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            if cur.rowcount == 0:
+                print(f"✗ Case {case_id} not found")
+                return False
+        
+        print(f"✓ Case {case_id} deleted successfully!")
+        return True
     
-    return False
+    except Exception as e:
+        print(f"✗ Error deleting case: {e}")
+        return False
 
 
 # DISPLAY CASES
@@ -438,7 +1031,7 @@ def display_cases(cases):
     Show cases in a nice, formatted table
     
     Args:
-        cases: List of cases to display
+        cases: List of CaseSummary or CaseMatch rows to display
     """
     # If no cases found, show message and exit
     if not cases:
@@ -447,36 +1040,80 @@ def display_cases(cases):
     
     # Print table header
     print("\n" + "="*120)
-    print(f"{'ID':<5} {'Crime Type':<20} {'Location':<20} {'Status':<15} {'Reported':<20} {'Citizen':<20}")
+    print(f"{'ID':<5} {'Crime Type':<20} {'Location':<20} {'Status':<15} {'Reported':<17} {'Citizen':<20} {'Last Update':<17}")
     print("="*120)
     
-    # Print each case
+    # Print each case (both kinds of rows have every field shown here)
     for case in cases:
-        # Get case ID and crime type (always in same position)
-        case_id = case[0]
-        crime_type = case[1]
-        
-        # Different queries return different numbers of columns
-        # So we check and extract data accordingly
-        if len(case) >= 8:  # Full case details (8 columns)
-            location = case[3]
-            status = case[4]
-            reported = case[5]
-            citizen_name = case[6]
-        else:  # Filtered results (6 columns)
-            location = case[2]
-            status = case[3]
-            reported = case[4]
-            citizen_name = case[5]
-        
-        # Format the date nicely (if it exists)
+        # Format the dates nicely (if they exist)
+        reported = case.reported_at
         if hasattr(reported, 'strftime'):
             reported_date = reported.strftime("%Y-%m-%d %H:%M")
         else:
             reported_date = str(reported) if reported else "N/A"
+        last_update = case.last_update_at
+        last_update_date = last_update.strftime("%Y-%m-%d %H:%M") if last_update else "None yet"
         
         # Print the row
-        print(f"{case_id:<5} {crime_type:<20} {location:<20} {status:<15} {reported_date:<20} {citizen_name:<20}")
+        print(f"{case.case_id:<5} {case.crime_type:<20} {case.location:<20} {case.status:<15} "
+              f"{reported_date:<17} {case.citizen_name:<20} {last_update_date:<17}")
+    
+    # Print table footer
+    print("="*120)
+
+
+# DISPLAY STATUS HISTORY
+def display_status_history(history):
+    """
+    Show the status changes of a case in a formatted table
+    
+    Args:
+        history: List of StatusChange rows from get_status_history
+    """
+    # If the status never changed, show message and exit
+    if not history:
+        print("\nNo status changes recorded for this case.")
+        return
+    
+    # Print table header
+    print("\n" + "="*80)
+    print(f"{'Changed At':<20} {'From':<22} {'To':<22} {'Officer':<10}")
+    print("="*80)
+    
+    # Print each change
+    for change in history:
+        changed_date = change.changed_at.strftime("%Y-%m-%d %H:%M") if change.changed_at else "N/A"
+        officer = change.changed_by if change.changed_by is not None else "-"
+        print(f"{changed_date:<20} {change.old_status:<22} {change.new_status:<22} {officer:<10}")
+    
+    # Print table footer
+    print("="*80)
+
+
+# DISPLAY SEARCH RESULTS
+def display_search_results(results):
+    """
+    Show full-text search results with their matching text
+    
+    Args:
+        results: List of SearchResult rows from search_cases
+    """
+    # If nothing matched, show message and exit
+    if not results:
+        print("\nNo matching cases found.")
+        return
+    
+    # Print table header
+    print("\n" + "="*120)
+    print(f"{'ID':<5} {'Crime Type':<20} {'Location':<20} {'Status':<15} {'Reported':<20} {'Score':<8}")
+    print("="*120)
+    
+    # Print each case with its snippet underneath
+    for result in results:
+        reported_date = result.reported_at.strftime("%Y-%m-%d %H:%M") if result.reported_at else "N/A"
+        print(f"{result.case_id:<5} {result.crime_type:<20} {result.location:<20} {result.status:<15} "
+              f"{reported_date:<20} {result.rank:<8.3f}")
+        print(f"      ...{result.snippet}...")
     
     # Print table footer
     print("="*120)
\ No newline at end of file
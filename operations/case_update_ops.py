@@ -1,8 +1,122 @@
-# Import database connection functions to talk to PostgreSQL
-from database.connection import get_connection, release_connection
+# Import execute_values to insert many rows in one statement
+from psycopg2.extras import execute_values
+
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import transaction, read, profiled, prepare_statement, execute_prepared
+
+# Update rows have named fields (update.update_note, see database/rows.py)
+from database.rows import CaseUpdate
+
+# Updates loaded per page of a case timeline
+TIMELINE_PAGE_SIZE = 50
+
+
+# LAST-UPDATE SUMMARY
+# cases.last_update_at, last_update_officer_id and update_count describe each
+# case's newest update and how many it has. Every function here that adds or
+# removes updates changes them in the same transaction, so they are never out
+# of step with case_updates.
+
+def _add_updates_query(values):
+    """
+    INSERT updates and add them to their cases' summaries, in one statement
+    
+    Args:
+        values: The VALUES list of (case_id, officer_id, update_note) rows
+                (one "(%s, %s, %s)" row, or "%s" for execute_values)
+    """
+    # Each update is stored in its case's month, so the case's reported_at is
+    # looked up and copied into case_reported_at (an unknown or deleted case
+    # leaves it NULL, which is refused just like the foreign key used to refuse it)
+    # The newest update of each case wins (a tie goes to the higher update_id,
+    # the same order as the timeline)
+    return f"""
+        WITH new_updates AS (
+            INSERT INTO case_updates (case_id, case_reported_at, officer_id, update_note)
+            SELECT
+                v.case_id,
+                (SELECT c.reported_at FROM cases c WHERE c.case_id = v.case_id AND c.deleted_at IS NULL),
+                v.officer_id,
+                v.update_note
+            FROM (VALUES {values}) AS v(case_id, officer_id, update_note)
+            RETURNING update_id, case_id, officer_id, updated_at
+        ), newest AS (
+            SELECT DISTINCT ON (case_id)
+                case_id, officer_id, updated_at,
+                COUNT(*) OVER (PARTITION BY case_id) AS added
+            FROM new_updates
+            ORDER BY case_id, updated_at DESC, update_id DESC
+        ), summaries AS (
+            UPDATE cases c
+            SET update_count = c.update_count + n.added,
+                last_update_officer_id = CASE
+                    WHEN c.last_update_at IS NULL OR n.updated_at >= c.last_update_at THEN n.officer_id
+                    ELSE c.last_update_officer_id
+                END,
+                last_update_at = GREATEST(c.last_update_at, n.updated_at)
+            FROM newest n
+            WHERE c.case_id = n.case_id
+        )
+        SELECT update_id FROM new_updates;
+    """
+
+
+# The casts give the VALUES columns their types when the driver sends the
+# values separately (as psycopg 3 in async_ops does)
+_ADD_UPDATE_QUERY = _add_updates_query("(%s::INTEGER, %s::INTEGER, %s::TEXT)")
+_ADD_UPDATES_BULK_QUERY = _add_updates_query("%s")
+
+# Its plan covers every partition of cases and case_updates, so planning it
+# costs more than running it: it is prepared once per connection
+_ADD_UPDATE = prepare_statement("add_case_update", _ADD_UPDATE_QUERY)
+
+# Lock the cases first, so an update added meanwhile waits and is then
+# counted on top of the recomputed summary instead of being lost
+_LOCK_CASES_QUERY = "SELECT case_id FROM cases WHERE case_id = ANY(%s) ORDER BY case_id FOR UPDATE;"
+
+# Recompute the summaries of some cases from their updates
+_REFRESH_SUMMARIES_QUERY = """
+    UPDATE cases c
+    SET update_count = s.update_count,
+        last_update_at = s.updated_at,
+        last_update_officer_id = s.officer_id
+    FROM (
+        SELECT
+            k.case_id,
+            (SELECT COUNT(*) FROM case_updates cu WHERE cu.case_id = k.case_id) AS update_count,
+            newest.updated_at,
+            newest.officer_id
+        FROM unnest(%s::int[]) AS k(case_id)
+        LEFT JOIN LATERAL (
+            SELECT cu.updated_at, cu.officer_id
+            FROM case_updates cu
+            WHERE cu.case_id = k.case_id
+            ORDER BY cu.updated_at DESC, cu.update_id DESC
+            LIMIT 1
+        ) AS newest ON TRUE
+    ) AS s
+    WHERE c.case_id = s.case_id;
+"""
+
+
+def refresh_update_summaries(cur, case_ids):
+    """
+    Recompute the last-update summary of these cases
+    Call it inside the transaction that removed their updates
+    
+    Args:
+        cur: Cursor of the open transaction
+        case_ids: The cases whose updates changed
+    """
+    case_ids = sorted(set(case_ids))
+    if not case_ids:
+        return
+    cur.execute(_LOCK_CASES_QUERY, (case_ids,))
+    cur.execute(_REFRESH_SUMMARIES_QUERY, (case_ids,))
 
 
 # ADD NEW CASE UPDATE
+@profiled
 def add_case_update(case_id, officer_id, update_note):
     """
     Add a progress note or update to an existing case
@@ -16,103 +130,193 @@ def add_case_update(case_id, officer_id, update_note):
     Returns:
         update_id if successful, None if failed
     """
-    # Get a database connection
-    conn = get_connection()
-    
-    if conn:
-        try:
-            # Create cursor to execute SQL
-            cur = conn.cursor()
-            
-            # Insert the update into the database
+    try:
+        # Open a transaction (committed when the block ends)
+        with transaction() as cur:
+            # Insert the update and count it in the case's summary
             # RETURNING gives us back the auto-generated update ID
-            query = """
-                INSERT INTO case_updates (case_id, officer_id, update_note)
-                VALUES (%s, %s, %s)
-                RETURNING update_id;
-            """
-            
-            cur.execute(query, (case_id, officer_id, update_note))
+            execute_prepared(cur, _ADD_UPDATE, (case_id, officer_id, update_note))
             
             # Get the new update ID
             update_id = cur.fetchone()[0]
-            
-            # Save changes to database
-            conn.commit()
-            
-            # Clean up
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Case update added successfully! Update ID: {update_id}")
-            return update_id
-            
-        except Exception as e:
-            # If something goes wrong, undo changes
-            print(f"✗ Error adding case update: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return None
+        
+        print(f"✓ Case update added successfully! Update ID: {update_id}")
+        return update_id
+    
+    except Exception as e:
+        # If something goes wrong, the transaction is rolled back for us
+        print(f"✗ Error adding case update: {e}")
+        return None
+
+
+# ADD MANY CASE UPDATES AT ONCE
+@profiled
+def add_case_updates_bulk(updates):
+    """
+    Add many progress notes with a single INSERT statement
+    All notes are saved together, or none are if one of them is invalid
+    
+    Args:
+        updates: List of (case_id, officer_id, update_note)
     
-    return None
+    Returns:
+        List of new update IDs in the same order, empty list if failed
+    """
+    if not updates:
+        return []
+    
+    try:
+        with transaction() as cur:
+            # execute_values expands the single %s into one VALUES list for all rows,
+            # and the summaries of every case involved are updated by the same statement
+            # page_size = all rows, so this is one statement / one round trip
+            results = execute_values(cur, _ADD_UPDATES_BULK_QUERY, updates, page_size=len(updates), fetch=True)
+            update_ids = [row[0] for row in results]
+        
+        print(f"✓ {len(update_ids)} case updates added successfully!")
+        return update_ids
+    
+    except Exception as e:
+        print(f"✗ Error adding case updates: {e}")
+        return []
 
 
 # GET ALL UPDATES FOR A CASE
-def get_updates_by_case(case_id):
+@profiled
+def get_updates_by_case(case_id, include_archived=False):
     """
     Retrieve all progress updates for a specific case
     Shows the investigation timeline
     
     Args:
         case_id: The case whose updates you want to see
+        include_archived: Also look in the archive (see archive_ops) if the
+                          case has no updates in the live table
     
     Returns:
-        List of all updates for that case (newest first)
+        List of CaseUpdate rows for that case (newest first)
+        (use get_case_timeline for cases with many updates)
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
+    try:
+        with read() as cur:
             # Get all updates with officer information
-            # JOIN combines update data with officer details
-            # ORDER BY DESC shows newest updates first
-            query = """
-                SELECT 
-                    cu.update_id,
-                    cu.update_note,
-                    cu.updated_at,
-                    o.full_name AS officer_name,
-                    o.badge_number
-                FROM case_updates cu
-                JOIN officers o ON cu.officer_id = o.officer_id
-                WHERE cu.case_id = %s
-                ORDER BY cu.updated_at DESC;
-            """
-            
-            cur.execute(query, (case_id,))
-            
-            # Fetch all updates
+            query, values = _timeline_query(case_id)
+            cur.execute(query, values, row_type=CaseUpdate)
             updates = cur.fetchall()
             
-            # Clean up
-            cur.close()
-            release_connection(conn)
+            # An archived case's updates were all moved with it
+            if not updates and include_archived:
+                query, values = _timeline_query(case_id, table="case_updates_archive")
+                cur.execute(query, values, row_type=CaseUpdate)
+                updates = cur.fetchall()
             
             return updates
-            
-        except Exception as e:
-            print(f"✗ Error fetching case updates: {e}")
-            if conn:
-                release_connection(conn)
-            return []
     
-    return []
+    except Exception as e:
+        print(f"✗ Error fetching case updates: {e}")
+        return []
+
+
+# CASE TIMELINE (ONE PAGE AT A TIME)
+@profiled
+def get_case_timeline(case_id, limit=TIMELINE_PAGE_SIZE, before=None):
+    """
+    Get one page of a case's updates, newest first
+    Each page is read straight from idx_case_updates_timeline, so a case with
+    thousands of updates loads as fast as one with ten
+    
+    Args:
+        case_id: The case whose updates you want to see
+        limit: Maximum number of updates to return (one page)
+        before: (Optional) Page key of the last update already shown,
+                see next_timeline_key()
+    
+    Returns:
+        List of CaseUpdate rows (like get_updates_by_case), empty if none found,
+        None if failed
+    """
+    try:
+        with read() as cur:
+            query, values = _timeline_query(case_id, limit, before)
+            cur.execute(query, values, row_type=CaseUpdate)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching case timeline: {e}")
+        return None
+
+
+def next_timeline_key(updates):
+    """
+    Get the key to pass as `before` to fetch the page after these updates
+    
+    Returns:
+        (updated_at, update_id) of the last update, None if the page was empty
+    """
+    if not updates:
+        return None
+    return (updates[-1].updated_at, updates[-1].update_id)
+
+
+def iter_case_timeline(case_id, page_size=TIMELINE_PAGE_SIZE):
+    """
+    Yield every update of a case, newest first, loading one page at a time
+    (for long timelines that should not be held in memory all at once)
+    
+    Args:
+        case_id: The case whose updates you want to see
+        page_size: Updates read per query
+    
+    Yields:
+        CaseUpdate rows (like get_updates_by_case)
+    
+    Raises:
+        RuntimeError if a page could not be read (the error is printed first)
+    """
+    before = None
+    while True:
+        page = get_case_timeline(case_id, page_size, before)
+        if page is None:
+            raise RuntimeError(f"Timeline of case {case_id} could not be read")
+        yield from page
+        if len(page) < page_size:
+            return
+        before = next_timeline_key(page)
+
+
+def _timeline_query(case_id, limit=None, before=None, table="case_updates"):
+    """Build the SQL and values for a case's updates, newest first (live or archived table)"""
+    values = [case_id]
+    page_filter = ""
+    
+    # Row comparison matches the index order, so each page starts
+    # right where the previous one ended (no OFFSET)
+    if before is not None:
+        page_filter = "AND (cu.updated_at, cu.update_id) < (%s, %s)"
+        values.extend(before)
+    
+    # JOIN combines update data with officer details
+    query = f"""
+        SELECT 
+            cu.update_id,
+            cu.update_note,
+            cu.updated_at,
+            o.full_name AS officer_name,
+            o.badge_number
+        FROM {table} cu
+        JOIN officers o ON cu.officer_id = o.officer_id
+        WHERE cu.case_id = %s {page_filter}
+        ORDER BY cu.updated_at DESC, cu.update_id DESC
+    """
+    
+    # LIMIT NULL means no limit
+    query += " LIMIT %s;"
+    values.append(limit)
+    return query, values
 
 
 # DELETE A CASE UPDATE
+@profiled
 def delete_case_update(update_id):
     """
     Remove a specific update from the database
@@ -123,33 +327,19 @@ def delete_case_update(update_id):
     Returns:
         True if successful, False if failed
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Delete the update
-            query = "DELETE FROM case_updates WHERE update_id = %s;"
+    try:
+        with transaction() as cur:
+            # Delete the update, then fix its case's summary
+            query = "DELETE FROM case_updates WHERE update_id = %s RETURNING case_id;"
             cur.execute(query, (update_id,))
-            
-            # Save changes
-            conn.commit()
-            
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Case update {update_id} deleted successfully!")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error deleting case update: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            refresh_update_summaries(cur, [row[0] for row in cur.fetchall()])
+        
+        print(f"✓ Case update {update_id} deleted successfully!")
+        return True
     
-    return False
+    except Exception as e:
+        print(f"✗ Error deleting case update: {e}")
+        return False
 
 
 # DISPLAY UPDATES IN A TABLE
@@ -159,7 +349,7 @@ def display_case_updates(updates):
     Makes it easy to read the investigation timeline
     
     Args:
-        updates: List of updates to display
+        updates: List of CaseUpdate rows to display
     """
     # If no updates found, show message and exit
     if not updates:
@@ -174,14 +364,16 @@ def display_case_updates(updates):
     # Print each update
     for update in updates:
         # Format the date nicely
-        updated_date = update[2].strftime("%Y-%m-%d %H:%M") if update[2] else "N/A"
+        updated_date = update.updated_at.strftime("%Y-%m-%d %H:%M") if update.updated_at else "N/A"
         
         # If note is too long, show preview with "..."
         # This keeps the table neat and readable
-        note_preview = update[1][:37] + "..." if len(update[1]) > 40 else update[1]
+        note = update.update_note
+        note_preview = note[:37] + "..." if len(note) > 40 else note
         
         # Print the update row
-        print(f"{update[0]:<12} {update[3]:<25} {update[4]:<15} {updated_date:<20} {note_preview:<40}")
+        print(f"{update.update_id:<12} {update.officer_name:<25} {update.badge_number:<15} "
+              f"{updated_date:<20} {note_preview:<40}")
     
     # Print table footer
     print("="*120)
\ No newline at end of file
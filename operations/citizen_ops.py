@@ -1,8 +1,38 @@
-# Import database connection functions to talk to PostgreSQL
-from database.connection import get_connection, release_connection
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import (
+    transaction, read, in_transaction, on_commit, profiled, prepare_statement, execute_prepared
+)
+
+# Import the in-memory cache used for citizen lookups
+from database.cache import citizen_cache, cache_key
+
+# Citizen rows have named fields (citizen.full_name, see database/rows.py)
+from database.rows import Citizen
+
+# Columns of a citizen row, the fields of Citizen
+# (deleted_at only hides deleted citizens, it is not returned)
+_CITIZEN_COLUMNS = "citizen_id, full_name, phone_number, email, address, created_at"
+
+# Deleting a citizen marks them and the cases they reported as deleted
+# (shared with the async version in async_ops)
+_DELETE_CITIZEN_QUERY = """
+    UPDATE citizens SET deleted_at = CURRENT_TIMESTAMP
+    WHERE citizen_id = %s AND deleted_at IS NULL;
+"""
+_DELETE_CITIZEN_CASES_QUERY = """
+    UPDATE cases SET deleted_at = CURRENT_TIMESTAMP
+    WHERE citizen_id = %s AND deleted_at IS NULL;
+"""
+
+# Looked up on every case view, so it is prepared once per connection
+_GET_CITIZEN = prepare_statement(
+    "get_citizen_by_id",
+    f"SELECT {_CITIZEN_COLUMNS} FROM citizens WHERE citizen_id = %s AND deleted_at IS NULL;"
+)
 
 
 # ADD NEW CITIZEN
+@profiled
 def add_citizen(full_name, phone_number, email=None, address=None):
     """
     Register a new citizen in the system
@@ -16,14 +46,9 @@ def add_citizen(full_name, phone_number, email=None, address=None):
     Returns:
         citizen_id if successful, None if failed
     """
-    # Get a database connection
-    conn = get_connection()
-    
-    if conn:
-        try:
-            # Create cursor to execute SQL commands
-            cur = conn.cursor()
-            
+    try:
+        # Open a transaction (committed when the block ends)
+        with transaction() as cur:
             # Insert new citizen into database
             # RETURNING gives us back the auto-generated citizen ID
             query = """
@@ -36,103 +61,81 @@ def add_citizen(full_name, phone_number, email=None, address=None):
             
             # Get the newly created citizen ID
             citizen_id = cur.fetchone()[0]
-            
-            # Save changes to database
-            conn.commit()
-            
-            # Clean up
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Citizen added successfully! ID: {citizen_id}")
-            return citizen_id
-            
-        except Exception as e:
-            # If something goes wrong, undo changes
-            print(f"✗ Error adding citizen: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return None
+        
+        print(f"✓ Citizen added successfully! ID: {citizen_id}")
+        return citizen_id
     
-    return None
+    except Exception as e:
+        # If something goes wrong, the transaction is rolled back for us
+        print(f"✗ Error adding citizen: {e}")
+        return None
 
 
 # GET ALL CITIZENS
+@profiled
 def get_all_citizens():
     """
     Retrieve all registered citizens from the database
     
     Returns:
-        List of all citizens, empty list if none found
+        List of Citizen rows (empty if none found), None if failed
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Get all citizens ordered by their ID
-            query = "SELECT * FROM citizens ORDER BY citizen_id;"
-            cur.execute(query)
+    try:
+        with read() as cur:
+            # Get all (not deleted) citizens ordered by their ID
+            query = f"SELECT {_CITIZEN_COLUMNS} FROM citizens WHERE deleted_at IS NULL ORDER BY citizen_id;"
+            cur.execute(query, row_type=Citizen)
             
             # Fetch all results
-            citizens = cur.fetchall()
-            
-            # Clean up
-            cur.close()
-            release_connection(conn)
-            
-            return citizens
-            
-        except Exception as e:
-            print(f"✗ Error fetching citizens: {e}")
-            if conn:
-                release_connection(conn)
-            return []
+            return cur.fetchall()
     
-    return []
+    except Exception as e:
+        print(f"✗ Error fetching citizens: {e}")
+        return None
 
 
 # GET SPECIFIC CITIZEN
+@profiled
 def get_citizen_by_id(citizen_id):
     """
     Find a specific citizen by their ID
+    Recently looked up citizens are answered from an in-memory cache
     
     Args:
         citizen_id: The ID of the citizen to find
     
     Returns:
-        Citizen details if found, None if not found
+        Citizen row if found, None if not found
     """
-    conn = get_connection()
+    # Answer from the cache when we can (no database round trip)
+    key = cache_key(citizen_id)
+    if key is not None:
+        found, citizen = citizen_cache.get(key)
+        if found:
+            return citizen
     
-    if conn:
-        try:
-            cur = conn.cursor()
-            
+    try:
+        with read() as cur:
             # Search for citizen with matching ID
-            query = "SELECT * FROM citizens WHERE citizen_id = %s;"
-            cur.execute(query, (citizen_id,))
+            execute_prepared(cur, _GET_CITIZEN, (citizen_id,), row_type=Citizen)
             
             # Fetch single result
             citizen = cur.fetchone()
-            
-            cur.close()
-            release_connection(conn)
-            
-            return citizen
-            
-        except Exception as e:
-            print(f"✗ Error fetching citizen: {e}")
-            if conn:
-                release_connection(conn)
-            return None
+        
+        # Remember it for next time, unless it was read inside a transaction
+        # that has not committed yet (it could still be rolled back)
+        if citizen is not None and key is not None and not in_transaction():
+            citizen_cache.put(key, citizen)
+        
+        return citizen
     
-    return None
+    except Exception as e:
+        print(f"✗ Error fetching citizen: {e}")
+        return None
 
 
 # UPDATE CITIZEN INFORMATION
+@profiled
 def update_citizen(citizen_id, full_name=None, phone_number=None, email=None, address=None):
     """
     Update a citizen's information
@@ -148,66 +151,57 @@ def update_citizen(citizen_id, full_name=None, phone_number=None, email=None, ad
     Returns:
         True if successful, False if failed
     """
-    conn = get_connection()
+    # Build update query dynamically based on what fields are provided
+    updates = []  # Will hold SQL parts like "full_name = %s"
+    values = []   # Will hold the actual values to update
     
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Build update query dynamically based on what fields are provided
-            updates = []  # Will hold SQL parts like "full_name = %s"
-            values = []   # Will hold the actual values to update
-            
-            # Only add fields that were provided
-            if full_name:
-                updates.append("full_name = %s")
-                values.append(full_name)
-            if phone_number:
-                updates.append("phone_number = %s")
-                values.append(phone_number)
-            if email:
-                updates.append("email = %s")
-                values.append(email)
-            if address:
-                updates.append("address = %s")
-                values.append(address)
-            
-            # If no fields provided, nothing to update
-            if not updates:
-                print("✗ No fields to update")
-                release_connection(conn)
-                return False
-            
-            # Add citizen_id to the end of values list
-            values.append(citizen_id)
-            
+    # Only add fields that were provided
+    if full_name:
+        updates.append("full_name = %s")
+        values.append(full_name)
+    if phone_number:
+        updates.append("phone_number = %s")
+        values.append(phone_number)
+    if email:
+        updates.append("email = %s")
+        values.append(email)
+    if address:
+        updates.append("address = %s")
+        values.append(address)
+    
+    # If no fields provided, nothing to update (no connection needed)
+    if not updates:
+        print("✗ No fields to update")
+        return False
+    
+    # Add citizen_id to the end of values list
+    values.append(citizen_id)
+    
+    try:
+        with transaction() as cur:
             # Build and execute the update query
-            query = f"UPDATE citizens SET {', '.join(updates)} WHERE citizen_id = %s;"
+            query = f"UPDATE citizens SET {', '.join(updates)} WHERE citizen_id = %s AND deleted_at IS NULL;"
             cur.execute(query, values)
             
-            # Save changes
-            conn.commit()
-            
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Citizen {citizen_id} updated successfully!")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error updating citizen: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            # The cached copy is out of date once this is committed (by the
+            # caller's transaction, if this runs inside one)
+            on_commit(citizen_cache.invalidate, cache_key(citizen_id))
+        
+        print(f"✓ Citizen {citizen_id} updated successfully!")
+        return True
     
-    return False
+    except Exception as e:
+        print(f"✗ Error updating citizen: {e}")
+        return False
 
 
 # DELETE CITIZEN
+@profiled
 def delete_citizen(citizen_id):
     """
-    Permanently remove a citizen from the database
+    Delete a citizen and the cases they reported
+    (soft delete: the rows are marked deleted and hidden everywhere,
+    so their history is kept)
     
     Args:
         citizen_id: The citizen to delete
@@ -215,33 +209,26 @@ def delete_citizen(citizen_id):
     Returns:
         True if successful, False if failed
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Delete the citizen
-            query = "DELETE FROM citizens WHERE citizen_id = %s;"
-            cur.execute(query, (citizen_id,))
-            
-            # Save changes
-            conn.commit()
-            
-            cur.close()
-            release_connection(conn)
+    try:
+        with transaction() as cur:
+            # Mark the citizen deleted
+            cur.execute(_DELETE_CITIZEN_QUERY, (citizen_id,))
+            if cur.rowcount == 0:
+                print(f"✗ Citizen {citizen_id} not found")
+                return False
             
-            print(f"✓ Citizen {citizen_id} deleted successfully!")
-            return True
+            # Their cases go with them, like they used to (ON DELETE CASCADE)
+            cur.execute(_DELETE_CITIZEN_CASES_QUERY, (citizen_id,))
             
-        except Exception as e:
-            print(f"✗ Error deleting citizen: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            # The cached copy is out of date once this is committed
+            on_commit(citizen_cache.invalidate, cache_key(citizen_id))
+        
+        print(f"✓ Citizen {citizen_id} deleted successfully!")
+        return True
     
-    return False
+    except Exception as e:
+        print(f"✗ Error deleting citizen: {e}")
+        return False
 
 
 # DISPLAY CITIZENS IN A TABLE
@@ -250,7 +237,7 @@ def display_citizens(citizens):
     Show citizens in a formatted table for easy reading
     
     Args:
-        citizens: List of citizens to display
+        citizens: List of Citizen rows to display
     """
     # If no citizens found, show message and exit
     if not citizens:
@@ -265,7 +252,8 @@ def display_citizens(citizens):
     # Print each citizen
     for citizen in citizens:
         # Show "N/A" if email is not provided
-        print(f"{citizen[0]:<5} {citizen[1]:<25} {citizen[2]:<15} {citizen[3] or 'N/A':<25}")
+        print(f"{citizen.citizen_id:<5} {citizen.full_name:<25} {citizen.phone_number:<15} "
+              f"{citizen.email or 'N/A':<25}")
     
     # Print table footer
     print("="*80)
\ No newline at end of file
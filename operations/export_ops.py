@@ -0,0 +1,333 @@
+# Export helpers for writing CSV / JSON Lines / Parquet files
+import datetime
+import decimal
+import json
+import os
+import sys
+
+# Import database helpers to talk to PostgreSQL
+from database.connection import read, stream, profiled
+
+# Parquet (columnar) output needs pyarrow, which is optional:
+#   pip install pyarrow
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Rows fetched from the server (and written as one Parquet row group) at a time
+# Memory use depends on this, never on the size of the table
+DEFAULT_BATCH_SIZE = 50_000
+
+# File formats and their file extensions
+EXPORT_FORMATS = {
+    'csv': 'csv',
+    'jsonl': 'jsonl',
+    'parquet': 'parquet',
+}
+
+# What each export contains
+# select: the query (without WHERE / ORDER BY)
+# table: the main table (with the joins `filter` needs), filter: condition every exported row meets,
+# date_column: the main table's date used for the date range and monthly files
+# columns: (name, type) of every column written
+EXPORTS = {
+    'cases': {
+        'select': """
+            SELECT
+                c.case_id,
+                c.crime_type,
+                c.description,
+                c.location,
+                c.status,
+                c.reported_at,
+                c.resolved_at,
+                c.citizen_id,
+                cit.full_name AS citizen_name,
+                c.officer_id,
+                o.full_name AS officer_name,
+                o.badge_number AS officer_badge,
+                c.last_update_at,
+                c.update_count
+            FROM cases c
+            JOIN citizens cit ON c.citizen_id = cit.citizen_id
+            LEFT JOIN officers o ON c.officer_id = o.officer_id
+        """,
+        'table': 'cases c',
+        'filter': 'c.deleted_at IS NULL',
+        'date_column': 'c.reported_at',
+        'order_by': 'c.reported_at, c.case_id',
+        'columns': [
+            ('case_id', 'int'),
+            ('crime_type', 'text'),
+            ('description', 'text'),
+            ('location', 'text'),
+            ('status', 'text'),
+            ('reported_at', 'timestamp'),
+            ('resolved_at', 'timestamp'),
+            ('citizen_id', 'int'),
+            ('citizen_name', 'text'),
+            ('officer_id', 'int'),
+            ('officer_name', 'text'),
+            ('officer_badge', 'text'),
+            ('last_update_at', 'timestamp'),
+            ('update_count', 'int'),
+        ],
+    },
+    'case_updates': {
+        'select': """
+            SELECT
+                cu.update_id,
+                cu.case_id,
+                cu.officer_id,
+                o.full_name AS officer_name,
+                o.badge_number,
+                cu.update_note,
+                cu.updated_at
+            FROM case_updates cu
+            JOIN cases c ON c.case_id = cu.case_id AND c.reported_at = cu.case_reported_at
+            JOIN officers o ON cu.officer_id = o.officer_id
+        """,
+        # Updates of deleted cases are left out like the cases themselves
+        # (both key columns, so each update is joined within its case's month)
+        'table': 'case_updates cu JOIN cases c ON c.case_id = cu.case_id AND c.reported_at = cu.case_reported_at',
+        'filter': 'c.deleted_at IS NULL',
+        'date_column': 'cu.updated_at',
+        'order_by': 'cu.updated_at, cu.update_id',
+        'columns': [
+            ('update_id', 'int'),
+            ('case_id', 'int'),
+            ('officer_id', 'int'),
+            ('officer_name', 'text'),
+            ('badge_number', 'text'),
+            ('update_note', 'text'),
+            ('updated_at', 'timestamp'),
+        ],
+    },
+}
+
+
+class ExportError(Exception):
+    """Raised when an export can not be written"""
+
+
+# EXPORT
+@profiled
+def export_table(table, path, file_format="csv", date_from=None, date_to=None,
+                 partition=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write every row of an export to a file, streaming from the database
+    
+    CSV is produced by PostgreSQL itself (COPY ... TO STDOUT) and written
+    straight to the file; JSON Lines and Parquet are read from a server-side
+    cursor `batch_size` rows at a time. Either way only one batch is ever
+    held in memory, whatever the number of rows.
+    
+    Args:
+        table: "cases" or "case_updates"
+        path: File to write ("-" for stdout, CSV / JSON Lines only), or the
+              folder for the files when partition="month"
+        file_format: "csv", "jsonl" or "parquet"
+        date_from: (Optional) Only rows on or after this date
+        date_to: (Optional) Only rows before this date
+        partition: None for one file, "month" for one file per month
+                   (e.g. cases_2024-01.csv, cases_2024-02.csv, ...)
+        batch_size: Rows fetched per round trip / Parquet row group
+    
+    Returns:
+        Dictionary of {file written: number of rows}
+    
+    Raises:
+        ExportError if the export or format is unknown, or pyarrow is missing
+    """
+    if table not in EXPORTS:
+        raise ExportError(f"Can not export '{table}', choose from: {', '.join(EXPORTS)}")
+    if file_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format: {file_format}")
+    if file_format == "parquet" and pyarrow is None:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+    if partition not in (None, "month"):
+        raise ExportError(f"Unknown partition: {partition}")
+    
+    if partition is None:
+        if path == "-" and file_format == "parquet":
+            raise ExportError("Parquet can not be written to stdout")
+        return {path: _export_range(table, path, file_format, date_from, date_to, batch_size)}
+    
+    # One file per month, each read with its own date range query
+    if path == "-":
+        raise ExportError("Monthly files need a folder, not stdout")
+    os.makedirs(path, exist_ok=True)
+    written = {}
+    for month_start, month_end in _month_ranges(table, date_from, date_to):
+        # Stay inside the requested range at both ends
+        start = max(month_start, _as_datetime(date_from)) if date_from else month_start
+        end = min(month_end, _as_datetime(date_to)) if date_to else month_end
+        file_path = os.path.join(path, f"{table}_{month_start:%Y-%m}.{EXPORT_FORMATS[file_format]}")
+        written[file_path] = _export_range(table, file_path, file_format, start, end, batch_size)
+    return written
+
+
+def export_cases(path, file_format="csv", date_from=None, date_to=None, partition=None):
+    """Export cases with their citizen and officer (see export_table)"""
+    return export_table('cases', path, file_format, date_from, date_to, partition)
+
+
+def export_case_updates(path, file_format="csv", date_from=None, date_to=None, partition=None):
+    """Export case update timelines with their officer (see export_table)"""
+    return export_table('case_updates', path, file_format, date_from, date_to, partition)
+
+
+def _export_range(table, path, file_format, date_from, date_to, batch_size):
+    """Write the rows of one date range to one file, return the row count"""
+    query, values = _export_query(table, date_from, date_to)
+    
+    if file_format == "csv":
+        return _write_csv(query, values, path)
+    if file_format == "jsonl":
+        return _write_jsonl(table, query, values, path, batch_size)
+    return _write_parquet(table, query, values, path, batch_size)
+
+
+def _export_query(table, date_from, date_to):
+    """Build the SQL and values for one export and date range"""
+    spec = EXPORTS[table]
+    where, values = _date_filter(spec, date_from, date_to)
+    query = f"{spec['select']} {where} ORDER BY {spec['order_by']}"
+    return query, values
+
+
+def _date_filter(spec, date_from, date_to):
+    """Build the WHERE clause (and its values) for a date range"""
+    # Tables with a fixed filter (deleted cases are never exported) start with it
+    conditions = [spec['filter']] if spec.get('filter') else []
+    values = []
+    if date_from:
+        conditions.append(f"{spec['date_column']} >= %s")
+        values.append(date_from)
+    if date_to:
+        conditions.append(f"{spec['date_column']} < %s")
+        values.append(date_to)
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, values
+
+
+# WRITERS
+def _write_csv(query, values, path):
+    """COPY the query result as CSV (with a header row) into a file"""
+    with _open_output(path, "w") as f:
+        with read() as cur:
+            # COPY does not take parameters, so the values are quoted into the SQL
+            sql = cur.mogrify(query, values).decode()
+            cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", f)
+            return cur.rowcount
+
+
+def _write_jsonl(table, query, values, path, batch_size):
+    """Stream the query result into a file as one JSON object per line"""
+    names = [name for name, _ in EXPORTS[table]['columns']]
+    count = 0
+    with _open_output(path, "w") as f:
+        with stream(f"export_{table}", batch_size) as cur:
+            cur.execute(query, values)
+            for row in cur:
+                f.write(json.dumps(dict(zip(names, row)), default=json_value) + "\n")
+                count += 1
+    return count
+
+
+def _write_parquet(table, query, values, path, batch_size):
+    """Stream the query result into a Parquet file, one row group per batch"""
+    columns = EXPORTS[table]['columns']
+    schema = pyarrow.schema([(name, _ARROW_TYPES[kind]()) for name, kind in columns])
+    count = 0
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        with stream(f"export_{table}", batch_size) as cur:
+            cur.execute(query, values)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                # Turn the batch of rows into columns and write them
+                arrays = [
+                    pyarrow.array([row[i] for row in rows], type=schema.field(i).type)
+                    for i in range(len(columns))
+                ]
+                writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+                count += len(rows)
+    return count
+
+
+# Arrow column type for each column kind (functions, so pyarrow stays optional)
+_ARROW_TYPES = {
+    'int': lambda: pyarrow.int64(),
+    'text': lambda: pyarrow.string(),
+    'timestamp': lambda: pyarrow.timestamp('us'),
+}
+
+
+# HELPERS
+def json_value(value):
+    """Turn values json can not write (dates, decimals) into text"""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+
+def _open_output(path, mode):
+    """Open the output file ("-" is stdout, which is left open afterwards)"""
+    if path == "-":
+        return _StdoutFile()
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+class _StdoutFile:
+    """stdout as a context manager that does not close it"""
+    
+    def __enter__(self):
+        return sys.stdout
+    
+    def __exit__(self, *exc):
+        sys.stdout.flush()
+
+
+def _month_ranges(table, date_from, date_to):
+    """
+    Find the months that have rows in the date range
+    
+    Returns:
+        List of (first day of month, first day of next month) datetimes
+    """
+    spec = EXPORTS[table]
+    where, values = _date_filter(spec, date_from, date_to)
+    
+    with read() as cur:
+        # MIN / MAX of an indexed column only read the two ends of the index
+        cur.execute(
+            f"SELECT MIN({spec['date_column']}), MAX({spec['date_column']}) FROM {spec['table']} {where};",
+            values
+        )
+        first, last = cur.fetchone()
+    
+    if first is None:
+        return []
+    
+    ranges = []
+    month = datetime.datetime(first.year, first.month, 1)
+    while month <= last:
+        next_month = datetime.datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+        ranges.append((month, next_month))
+        month = next_month
+    return ranges
+
+
+def _as_datetime(value):
+    """A date given as text or date, as a datetime (for comparing with month bounds)"""
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+    return datetime.datetime.fromisoformat(value)
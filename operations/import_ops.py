@@ -0,0 +1,254 @@
+# Import helpers for reading CSV / JSON Lines files
+import csv
+import io
+import json
+import time
+
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import transaction, profiled
+
+# Rows sent to PostgreSQL per COPY (and committed together)
+DEFAULT_BATCH_SIZE = 50_000
+
+# What each table accepts from an import file
+# columns: fields read from the file (extra fields are ignored)
+# required: fields every row must have
+# insert: SQL expression used for each column when moving rows out of staging
+# prepare: (Optional) SQL run on the staging table before the rows are moved
+IMPORT_TABLES = {
+    'citizens': {
+        'id_column': 'citizen_id',
+        'columns': ['full_name', 'phone_number', 'email', 'address'],
+        'required': ['full_name', 'phone_number'],
+        'insert': {
+            'full_name': "s.full_name",
+            'phone_number': "s.phone_number",
+            'email': "s.email",
+            'address': "s.address",
+        },
+    },
+    'officers': {
+        'id_column': 'officer_id',
+        'columns': ['full_name', 'badge_number', 'rank', 'phone_number', 'station'],
+        'required': ['full_name', 'badge_number', 'rank', 'phone_number'],
+        'insert': {
+            'full_name': "s.full_name",
+            'badge_number': "s.badge_number",
+            'rank': "s.rank",
+            'phone_number': "s.phone_number",
+            'station': "s.station",
+        },
+    },
+    'cases': {
+        'id_column': 'case_id',
+        'columns': ['citizen_id', 'officer_id', 'crime_type', 'description',
+                    'location', 'status', 'reported_at'],
+        'required': ['citizen_id', 'crime_type', 'description', 'location'],
+        'insert': {
+            'citizen_id': "s.citizen_id::integer",
+            'officer_id': "s.officer_id::integer",
+            'crime_type': "s.crime_type",
+            'description': "s.description",
+            'location': "s.location",
+            # Legacy records may carry their own status and date
+            'status': "COALESCE(s.status, 'Pending')",
+            'reported_at': "COALESCE(s.reported_at::timestamp, CURRENT_TIMESTAMP)",
+        },
+        # Give every month in the batch its partition first, so old records
+        # are not all left in cases_default (see create_case_partitions)
+        'prepare': """
+            SELECT create_case_partitions(month, month)
+            FROM (
+                SELECT DISTINCT date_trunc('month', COALESCE(s.reported_at::timestamp, CURRENT_TIMESTAMP))::date AS month
+                FROM import_staging s
+            ) AS months;
+        """,
+    },
+}
+
+# Foreign keys checked for a whole batch at once before inserting it
+# (staging column, referenced table, referenced column)
+FOREIGN_KEYS = {
+    'cases': [
+        ('citizen_id', 'citizens', 'citizen_id'),
+        ('officer_id', 'officers', 'officer_id'),
+    ],
+}
+
+
+class BulkImportError(Exception):
+    """Raised when an import file can not be loaded"""
+
+
+# READ IMPORT FILES
+def read_rows(path, file_format=None):
+    """
+    Read records from a CSV (with header row) or JSON Lines file, one at a time
+    
+    Args:
+        path: File to read
+        file_format: "csv" or "jsonl" (guessed from the file extension if None)
+    
+    Yields:
+        (line number, dictionary of field values)
+    """
+    if file_format is None:
+        file_format = "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+    
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == "csv":
+            # Line 1 is the header, so data starts on line 2
+            for line_no, record in enumerate(csv.DictReader(f), start=2):
+                # Empty CSV cells mean "no value"
+                yield line_no, {key: (value if value != '' else None) for key, value in record.items()}
+        elif file_format == "jsonl":
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+        else:
+            raise BulkImportError(f"Unknown file format: {file_format}")
+
+
+# IMPORT RECORDS
+@profiled
+def bulk_import(table, records, batch_size=DEFAULT_BATCH_SIZE, show_progress=True):
+    """
+    Load many records into a table using COPY instead of one INSERT per row
+    
+    Each batch is copied into a temporary staging table, its foreign keys are
+    checked with one query, then it is moved into the real table in one
+    INSERT ... SELECT. Every batch is its own transaction.
+    
+    Args:
+        table: "citizens", "officers" or "cases"
+        records: Iterable of (line number, dictionary) pairs, see read_rows()
+        batch_size: Rows per COPY / commit
+        show_progress: Print rows per second after every batch
+    
+    Returns:
+        List of generated IDs, in the same order as the records
+    
+    Raises:
+        BulkImportError if a row is invalid (earlier batches stay committed)
+    """
+    if table not in IMPORT_TABLES:
+        raise BulkImportError(f"Can not import into '{table}'")
+    
+    spec = IMPORT_TABLES[table]
+    ids = []
+    batch = []
+    start = time.perf_counter()
+    
+    for line_no, record in records:
+        # Catch missing required fields before anything reaches the database
+        missing = [column for column in spec['required'] if record.get(column) in (None, '')]
+        if missing:
+            raise BulkImportError(f"Line {line_no}: missing {', '.join(missing)}")
+        
+        batch.append([line_no] + [record.get(column) for column in spec['columns']])
+        
+        if len(batch) >= batch_size:
+            ids.extend(_import_batch(table, batch))
+            batch = []
+            if show_progress:
+                _print_progress(table, len(ids), start)
+    
+    if batch:
+        ids.extend(_import_batch(table, batch))
+        if show_progress:
+            _print_progress(table, len(ids), start)
+    
+    return ids
+
+
+def import_file(table, path, file_format=None, batch_size=DEFAULT_BATCH_SIZE, show_progress=True):
+    """
+    Load a CSV or JSON Lines file into a table (see bulk_import)
+    
+    Returns:
+        List of generated IDs, in file order
+    """
+    return bulk_import(table, read_rows(path, file_format), batch_size, show_progress)
+
+
+def import_citizens(path, file_format=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Load citizens from a file, returns their new citizen IDs"""
+    return import_file('citizens', path, file_format, batch_size)
+
+
+def import_officers(path, file_format=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Load officers from a file, returns their new officer IDs"""
+    return import_file('officers', path, file_format, batch_size)
+
+
+def import_cases(path, file_format=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Load cases from a file, returns their new case IDs"""
+    return import_file('cases', path, file_format, batch_size)
+
+
+def _import_batch(table, batch):
+    """COPY one batch into staging, check it, and move it into the table"""
+    try:
+        return _copy_batch(table, batch)
+    except BulkImportError:
+        raise
+    except Exception as e:
+        # e.g. a badly formatted date or a duplicate badge number
+        raise BulkImportError(f"Lines {batch[0][0]}-{batch[-1][0]}: {e}") from e
+
+
+def _copy_batch(table, batch):
+    spec = IMPORT_TABLES[table]
+    columns = spec['columns']
+    
+    # Write the batch as CSV in memory for COPY
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        # An unquoted empty field is NULL in COPY's CSV format
+        writer.writerow(['' if value is None else value for value in row])
+    buffer.seek(0)
+    
+    with transaction() as cur:
+        # Staging table lives only until this batch commits
+        staging_columns = ", ".join(f"{column} TEXT" for column in columns)
+        cur.execute(f"CREATE TEMP TABLE import_staging (line_no INTEGER, {staging_columns}) ON COMMIT DROP;")
+        cur.copy_expert(
+            f"COPY import_staging (line_no, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv);",
+            buffer
+        )
+        
+        # Check every foreign key of the batch in one query each
+        for column, ref_table, ref_column in FOREIGN_KEYS.get(table, []):
+            cur.execute(f"""
+                SELECT s.line_no, s.{column}
+                FROM import_staging s
+                LEFT JOIN {ref_table} r ON r.{ref_column} = s.{column}::integer
+                WHERE s.{column} IS NOT NULL AND r.{ref_column} IS NULL
+                ORDER BY s.line_no
+                LIMIT 10;
+            """)
+            bad_rows = cur.fetchall()
+            if bad_rows:
+                details = ", ".join(f"line {line_no} ({value})" for line_no, value in bad_rows)
+                raise BulkImportError(f"Unknown {column} in {details}")
+        
+        if 'prepare' in spec:
+            cur.execute(spec['prepare'])
+        
+        # Move the batch into the real table, keeping file order for the IDs
+        cur.execute(f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(spec['insert'][column] for column in columns)}
+            FROM import_staging s
+            ORDER BY s.line_no
+            RETURNING {spec['id_column']};
+        """)
+        return [row[0] for row in cur.fetchall()]
+
+
+def _print_progress(table, done, start):
+    """Show how many rows are loaded and how fast"""
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0
+    print(f"✓ {table}: {done:,} rows imported ({rate:,.0f} rows/s)")
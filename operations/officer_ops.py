@@ -1,8 +1,38 @@
-# Import database connection functions to talk to PostgreSQL
-from database.connection import get_connection, release_connection
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import (
+    transaction, read, in_transaction, on_commit, profiled, prepare_statement, execute_prepared
+)
+
+# Import the in-memory cache used for officer lookups
+from database.cache import officer_cache, cache_key
+
+# Officer rows have named fields (officer.badge_number, see database/rows.py)
+from database.rows import Officer
+
+# Columns of an officer row, the fields of Officer
+# (deleted_at only hides deleted officers, it is not returned)
+_OFFICER_COLUMNS = "officer_id, full_name, badge_number, rank, phone_number, station, created_at"
+
+# Deleting an officer marks them deleted and hands their open cases back
+# for assignment (shared with the async version in async_ops)
+_DELETE_OFFICER_QUERY = """
+    UPDATE officers SET deleted_at = CURRENT_TIMESTAMP
+    WHERE officer_id = %s AND deleted_at IS NULL;
+"""
+_UNASSIGN_OFFICER_QUERY = """
+    UPDATE cases SET officer_id = NULL
+    WHERE officer_id = %s AND status IN ('Pending', 'Under Investigation') AND deleted_at IS NULL;
+"""
+
+# Looked up on every case view, so it is prepared once per connection
+_GET_OFFICER = prepare_statement(
+    "get_officer_by_id",
+    f"SELECT {_OFFICER_COLUMNS} FROM officers WHERE officer_id = %s AND deleted_at IS NULL;"
+)
 
 
 # ADD NEW OFFICER
+@profiled
 def add_officer(full_name, badge_number, rank, phone_number, station=None):
     """
     Register a new police officer in the system
@@ -17,14 +47,9 @@ def add_officer(full_name, badge_number, rank, phone_number, station=None):
     Returns:
         officer_id if successful, None if failed
     """
-    # Get a database connection
-    conn = get_connection()
-    
-    if conn:
-        try:
-            # Create cursor to execute SQL commands
-            cur = conn.cursor()
-            
+    try:
+        # Open a transaction (committed when the block ends)
+        with transaction() as cur:
             # Insert new officer into database
             # RETURNING gives us back the auto-generated officer ID
             query = """
@@ -37,103 +62,81 @@ def add_officer(full_name, badge_number, rank, phone_number, station=None):
             
             # Get the newly created officer ID
             officer_id = cur.fetchone()[0]
-            
-            # Save changes to database
-            conn.commit()
-            
-            # Clean up
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Officer added successfully! ID: {officer_id}")
-            return officer_id
-            
-        except Exception as e:
-            # If something goes wrong, undo changes
-            print(f"✗ Error adding officer: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return None
+        
+        print(f"✓ Officer added successfully! ID: {officer_id}")
+        return officer_id
     
-    return None
+    except Exception as e:
+        # If something goes wrong, the transaction is rolled back for us
+        print(f"✗ Error adding officer: {e}")
+        return None
 
 
 # GET ALL OFFICERS
+@profiled
 def get_all_officers():
     """
     Retrieve all registered officers from the database
     
     Returns:
-        List of all officers, empty list if none found
+        List of Officer rows (empty if none found), None if failed
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Get all officers ordered by their ID
-            query = "SELECT * FROM officers ORDER BY officer_id;"
-            cur.execute(query)
+    try:
+        with read() as cur:
+            # Get all (not deleted) officers ordered by their ID
+            query = f"SELECT {_OFFICER_COLUMNS} FROM officers WHERE deleted_at IS NULL ORDER BY officer_id;"
+            cur.execute(query, row_type=Officer)
             
             # Fetch all results
-            officers = cur.fetchall()
-            
-            # Clean up
-            cur.close()
-            release_connection(conn)
-            
-            return officers
-            
-        except Exception as e:
-            print(f"✗ Error fetching officers: {e}")
-            if conn:
-                release_connection(conn)
-            return []
+            return cur.fetchall()
     
-    return []
+    except Exception as e:
+        print(f"✗ Error fetching officers: {e}")
+        return None
 
 
 # GET SPECIFIC OFFICER
+@profiled
 def get_officer_by_id(officer_id):
     """
     Find a specific officer by their ID
+    Recently looked up officers are answered from an in-memory cache
     
     Args:
         officer_id: The ID of the officer to find
     
     Returns:
-        Officer details if found, None if not found
+        Officer row if found, None if not found
     """
-    conn = get_connection()
+    # Answer from the cache when we can (no database round trip)
+    key = cache_key(officer_id)
+    if key is not None:
+        found, officer = officer_cache.get(key)
+        if found:
+            return officer
     
-    if conn:
-        try:
-            cur = conn.cursor()
-            
+    try:
+        with read() as cur:
             # Search for officer with matching ID
-            query = "SELECT * FROM officers WHERE officer_id = %s;"
-            cur.execute(query, (officer_id,))
+            execute_prepared(cur, _GET_OFFICER, (officer_id,), row_type=Officer)
             
             # Fetch single result
             officer = cur.fetchone()
-            
-            cur.close()
-            release_connection(conn)
-            
-            return officer
-            
-        except Exception as e:
-            print(f"✗ Error fetching officer: {e}")
-            if conn:
-                release_connection(conn)
-            return None
+        
+        # Remember it for next time, unless it was read inside a transaction
+        # that has not committed yet (it could still be rolled back)
+        if officer is not None and key is not None and not in_transaction():
+            officer_cache.put(key, officer)
+        
+        return officer
     
-    return None
+    except Exception as e:
+        print(f"✗ Error fetching officer: {e}")
+        return None
 
 
 # UPDATE OFFICER INFORMATION
+@profiled
 def update_officer(officer_id, full_name=None, rank=None, phone_number=None, station=None):
     """
     Update an officer's information
@@ -149,66 +152,57 @@ def update_officer(officer_id, full_name=None, rank=None, phone_number=None, sta
     Returns:
         True if successful, False if failed
     """
-    conn = get_connection()
+    # Build update query dynamically based on what fields are provided
+    updates = []  # Will hold SQL parts like "rank = %s"
+    values = []   # Will hold the actual values to update
     
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Build update query dynamically based on what fields are provided
-            updates = []  # Will hold SQL parts like "rank = %s"
-            values = []   # Will hold the actual values to update
-            
-            # Only add fields that were provided
-            if full_name:
-                updates.append("full_name = %s")
-                values.append(full_name)
-            if rank:
-                updates.append("rank = %s")
-                values.append(rank)
-            if phone_number:
-                updates.append("phone_number = %s")
-                values.append(phone_number)
-            if station:
-                updates.append("station = %s")
-                values.append(station)
-            
-            # If no fields provided, nothing to update
-            if not updates:
-                print("✗ No fields to update")
-                release_connection(conn)
-                return False
-            
-            # Add officer_id to the end of values list
-            values.append(officer_id)
-            
+    # Only add fields that were provided
+    if full_name:
+        updates.append("full_name = %s")
+        values.append(full_name)
+    if rank:
+        updates.append("rank = %s")
+        values.append(rank)
+    if phone_number:
+        updates.append("phone_number = %s")
+        values.append(phone_number)
+    if station:
+        updates.append("station = %s")
+        values.append(station)
+    
+    # If no fields provided, nothing to update (no connection needed)
+    if not updates:
+        print("✗ No fields to update")
+        return False
+    
+    # Add officer_id to the end of values list
+    values.append(officer_id)
+    
+    try:
+        with transaction() as cur:
             # Build and execute the update query
-            query = f"UPDATE officers SET {', '.join(updates)} WHERE officer_id = %s;"
+            query = f"UPDATE officers SET {', '.join(updates)} WHERE officer_id = %s AND deleted_at IS NULL;"
             cur.execute(query, values)
             
-            # Save changes
-            conn.commit()
-            
-            cur.close()
-            release_connection(conn)
-            
-            print(f"✓ Officer {officer_id} updated successfully!")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error updating officer: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            # The cached copy is out of date once this is committed (by the
+            # caller's transaction, if this runs inside one)
+            on_commit(officer_cache.invalidate, cache_key(officer_id))
+        
+        print(f"✓ Officer {officer_id} updated successfully!")
+        return True
     
-    return False
+    except Exception as e:
+        print(f"✗ Error updating officer: {e}")
+        return False
 
 
 # DELETE OFFICER
+@profiled
 def delete_officer(officer_id):
     """
-    Permanently remove an officer from the database
+    Delete an officer (soft delete: the row is marked deleted and hidden,
+    their case updates and finished cases keep their name)
+    Their Pending / Under Investigation cases become unassigned
     
     Args:
         officer_id: The officer to delete
@@ -216,33 +210,26 @@ def delete_officer(officer_id):
     Returns:
         True if successful, False if failed
     """
-    conn = get_connection()
-    
-    if conn:
-        try:
-            cur = conn.cursor()
-            
-            # Delete the officer
-            query = "DELETE FROM officers WHERE officer_id = %s;"
-            cur.execute(query, (officer_id,))
-            
-            # Save changes
-            conn.commit()
-            
-            cur.close()
-            release_connection(conn)
+    try:
+        with transaction() as cur:
+            # Mark the officer deleted
+            cur.execute(_DELETE_OFFICER_QUERY, (officer_id,))
+            if cur.rowcount == 0:
+                print(f"✗ Officer {officer_id} not found")
+                return False
             
-            print(f"✓ Officer {officer_id} deleted successfully!")
-            return True
+            # Their open cases need a new officer
+            cur.execute(_UNASSIGN_OFFICER_QUERY, (officer_id,))
             
-        except Exception as e:
-            print(f"✗ Error deleting officer: {e}")
-            conn.rollback()
-            if conn:
-                release_connection(conn)
-            return False
+            # The cached copy is out of date once this is committed
+            on_commit(officer_cache.invalidate, cache_key(officer_id))
+        
+        print(f"✓ Officer {officer_id} deleted successfully!")
+        return True
     
-    return False
+    except Exception as e:
+        print(f"✗ Error deleting officer: {e}")
+        return False
 
 
 # DISPLAY OFFICERS IN A TABLE
@@ -251,7 +238,7 @@ def display_officers(officers):
     Show officers in a formatted table for easy reading
     
     Args:
-        officers: List of officers to display
+        officers: List of Officer rows to display
     """
     # If no officers found, show message and exit
     if not officers:
@@ -266,7 +253,8 @@ def display_officers(officers):
     # Print each officer
     for officer in officers:
         # Show "N/A" if station is not provided
-        print(f"{officer[0]:<5} {officer[1]:<25} {officer[2]:<15} {officer[3]:<15} {officer[4]:<15} {officer[5] or 'N/A':<20}")
+        print(f"{officer.officer_id:<5} {officer.full_name:<25} {officer.badge_number:<15} {officer.rank:<15} "
+              f"{officer.phone_number:<15} {officer.station or 'N/A':<20}")
     
     # Print table footer
     print("="*100)
\ No newline at end of file
@@ -0,0 +1,110 @@
+# Import date helpers to work out which months need a partition
+import datetime
+
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import transaction, read, profiled
+
+# cases and case_updates are stored as one partition per month (see
+# database/migrations/0010_partition_cases_by_month.sql). Months are normally
+# created ahead of time by create_future_partitions() (e.g. from a nightly cron
+# job); a month nobody created still works, its rows just go to the _default
+# partitions.
+
+# Months created ahead of the current one
+DEFAULT_MONTHS_AHEAD = 3
+
+
+# CREATE PARTITIONS
+@profiled
+def create_partitions(first_month, last_month):
+    """
+    Create the monthly partitions of cases and case_updates between two
+    months (both included) that do not exist yet
+    
+    Args:
+        first_month: Any date in the first month
+        last_month: Any date in the last month
+    
+    Returns:
+        Number of partitions created, None if failed
+    """
+    try:
+        with transaction() as cur:
+            cur.execute("SELECT create_case_partitions(%s, %s);", (first_month, last_month))
+            created = cur.fetchone()[0]
+        
+        print(f"✓ {created} partitions created")
+        return created
+    
+    except Exception as e:
+        print(f"✗ Error creating partitions: {e}")
+        return None
+
+
+def create_future_partitions(months_ahead=DEFAULT_MONTHS_AHEAD):
+    """
+    Make sure this month and the next `months_ahead` months have their partitions
+    
+    Returns:
+        Number of partitions created, None if failed
+    """
+    today = datetime.date.today()
+    month = today.month - 1 + months_ahead
+    last_month = datetime.date(today.year + month // 12, month % 12 + 1, 1)
+    return create_partitions(today, last_month)
+
+
+# LIST PARTITIONS
+@profiled
+def get_partitions():
+    """
+    Get every partition of cases and case_updates with its size
+    
+    Returns:
+        List of (table, partition, range, estimated_rows, size), oldest month
+        first, None if failed
+    """
+    try:
+        with read() as cur:
+            # reltuples is the row count ANALYZE last saw (-1 = never analyzed)
+            query = """
+                SELECT
+                    parent.relname,
+                    child.relname,
+                    pg_get_expr(child.relpartbound, child.oid),
+                    GREATEST(child.reltuples, 0)::BIGINT,
+                    pg_size_pretty(pg_total_relation_size(child.oid))
+                FROM pg_inherits i
+                JOIN pg_class parent ON parent.oid = i.inhparent
+                JOIN pg_class child ON child.oid = i.inhrelid
+                WHERE parent.oid IN ('cases'::regclass, 'case_updates'::regclass)
+                ORDER BY parent.relname DESC, child.relname;
+            """
+            cur.execute(query)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching partitions: {e}")
+        return None
+
+
+# DISPLAY PARTITIONS IN A TABLE
+def display_partitions(partitions):
+    """
+    Show the partitions, their month ranges and sizes
+    
+    Args:
+        partitions: List of (table, partition, range, estimated_rows, size)
+    """
+    if not partitions:
+        print("\nNo partitions found.")
+        return
+    
+    print("\n" + "="*120)
+    print(f"{'Table':<15} {'Partition':<25} {'Range':<55} {'Rows (est.)':>12} {'Size':>10}")
+    print("="*120)
+    
+    for table, partition, bounds, rows, size in partitions:
+        print(f"{table:<15} {partition:<25} {bounds:<55} {rows:>12,} {size:>10}")
+    
+    print("="*120)
@@ -0,0 +1,381 @@
+# Import database transaction helpers to talk to PostgreSQL
+from database.connection import transaction, read, profiled
+
+# Every function here reads the summary tables kept up to date by triggers
+# on cases (case_stats, case_daily_stats, officer_resolution_stats and
+# officer_workload in 0009_case_statistics.sql), never the cases table itself, so
+# they stay fast however many cases there are.
+#
+# The triggers only append each statement's changes to the *_delta tables
+# (0011_case_stats_deltas.sql), so writers never wait on a shared summary row.
+# The *_current views add those deltas to the totals, and fold_statistics()
+# moves them into the totals from time to time.
+
+# Dimensions counted in case_stats
+STAT_DIMENSIONS = ['status', 'crime_type', 'location']
+
+
+# CASE COUNTS
+@profiled
+def get_case_counts(dimension, limit=None):
+    """
+    Number of cases for each status, crime type or location
+    
+    Args:
+        dimension: "status", "crime_type" or "location"
+        limit: (Optional) Only the `limit` most common values
+    
+    Returns:
+        List of (value, case_count), most cases first, None if failed
+    """
+    if dimension not in STAT_DIMENSIONS:
+        raise ValueError(f"No statistics kept for {dimension}")
+    
+    try:
+        with read() as cur:
+            query = """
+                SELECT value, case_count
+                FROM case_stats_current
+                WHERE dimension = %s AND case_count > 0
+                ORDER BY case_count DESC, value
+                LIMIT %s;
+            """
+            # LIMIT NULL means no limit
+            cur.execute(query, (dimension, limit))
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching case counts: {e}")
+        return None
+
+
+@profiled
+def get_total_cases():
+    """
+    Total number of cases (the sum of the per-status counts)
+    
+    Returns:
+        Number of cases, 0 if failed
+    """
+    try:
+        with read() as cur:
+            cur.execute("SELECT COALESCE(SUM(case_count), 0) FROM case_stats_current WHERE dimension = 'status';")
+            return cur.fetchone()[0]
+    
+    except Exception as e:
+        print(f"✗ Error fetching case total: {e}")
+        return 0
+
+
+@profiled
+def get_daily_counts(days=30):
+    """
+    Cases reported and resolved on each of the last `days` days
+    
+    Args:
+        days: How many days back to go (today included)
+    
+    Returns:
+        List of (day, reported_count, resolved_count), oldest day first
+        (days without any cases are left out), None if failed
+    """
+    try:
+        with read() as cur:
+            query = """
+                SELECT day, reported_count, resolved_count
+                FROM case_daily_stats_current
+                WHERE day > CURRENT_DATE - %s
+                  AND (reported_count > 0 OR resolved_count > 0)
+                ORDER BY day;
+            """
+            cur.execute(query, (days,))
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching daily counts: {e}")
+        return None
+
+
+# TIME TO RESOLUTION
+@profiled
+def get_officer_resolution_stats(limit=None):
+    """
+    Average time each officer took to resolve their cases (deleted officers
+    are left out)
+    
+    Args:
+        limit: (Optional) Only the `limit` officers with the most resolved cases
+    
+    Returns:
+        List of (officer_id, officer_name, station, resolved_count, average_hours),
+        most resolved cases first, None if failed
+    """
+    try:
+        with read() as cur:
+            query = """
+                SELECT
+                    o.officer_id,
+                    o.full_name,
+                    o.station,
+                    s.resolved_count,
+                    ROUND(s.total_resolution_seconds / s.resolved_count / 3600, 1) AS average_hours
+                FROM officer_resolution_stats_current s
+                JOIN officers o ON o.officer_id = s.officer_id
+                WHERE s.resolved_count > 0 AND o.deleted_at IS NULL
+                ORDER BY s.resolved_count DESC, o.officer_id
+                LIMIT %s;
+            """
+            cur.execute(query, (limit,))
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching officer statistics: {e}")
+        return None
+
+
+@profiled
+def get_station_resolution_stats():
+    """
+    Average time to resolution for each station (of its current officers' cases)
+    
+    Returns:
+        List of (station, resolved_count, average_hours), most resolved cases first,
+        None if failed
+    """
+    try:
+        with read() as cur:
+            # One row per officer is summed here, not one row per case
+            query = """
+                SELECT
+                    COALESCE(o.station, 'No station') AS station,
+                    SUM(s.resolved_count)::BIGINT AS resolved_count,
+                    ROUND(SUM(s.total_resolution_seconds) / SUM(s.resolved_count) / 3600, 1) AS average_hours
+                FROM officer_resolution_stats_current s
+                JOIN officers o ON o.officer_id = s.officer_id
+                WHERE s.resolved_count > 0 AND o.deleted_at IS NULL
+                GROUP BY COALESCE(o.station, 'No station')
+                ORDER BY resolved_count DESC, station;
+            """
+            cur.execute(query)
+            return cur.fetchall()
+    
+    except Exception as e:
+        print(f"✗ Error fetching station statistics: {e}")
+        return None
+
+
+# REBUILD
+@profiled
+def rebuild_statistics():
+    """
+    Recompute every summary table from the cases (live and archived,
+    deleted ones left out)
+    Only needed after loading data with the triggers off, or to repair
+    the counts; the triggers keep them right during normal use.
+    Case changes wait until the rebuild is finished.
+    
+    Returns:
+        True if successful, False if failed
+    """
+    try:
+        with transaction() as cur:
+            # Stop cases changing (or being archived) while they are counted
+            # (reads still work)
+            cur.execute("LOCK TABLE cases, cases_archive IN SHARE MODE;")
+            cur.execute("""
+                TRUNCATE case_stats, case_daily_stats, officer_resolution_stats, officer_workload,
+                         case_stats_delta, case_daily_stats_delta, officer_resolution_stats_delta,
+                         officer_workload_delta;
+            """)
+            
+            # Archived cases still count, like they did before they were moved
+            counted = """
+                SELECT status, crime_type, location, reported_at, resolved_at, officer_id
+                FROM cases WHERE deleted_at IS NULL
+                UNION ALL
+                SELECT status, crime_type, location, reported_at, resolved_at, officer_id
+                FROM cases_archive WHERE deleted_at IS NULL
+            """
+            
+            cur.execute(f"""
+                WITH counted AS ({counted})
+                INSERT INTO case_stats (dimension, value, case_count)
+                SELECT 'status', status, COUNT(*) FROM counted GROUP BY status
+                UNION ALL
+                SELECT 'crime_type', crime_type, COUNT(*) FROM counted GROUP BY crime_type
+                UNION ALL
+                SELECT 'location', location, COUNT(*) FROM counted GROUP BY location;
+            """)
+            
+            cur.execute(f"""
+                WITH counted AS ({counted})
+                INSERT INTO case_daily_stats (day, reported_count, resolved_count)
+                SELECT day, SUM(reported), SUM(resolved)
+                FROM (
+                    SELECT reported_at::date AS day, 1 AS reported, 0 AS resolved FROM counted
+                    UNION ALL
+                    SELECT resolved_at::date, 0, 1 FROM counted WHERE resolved_at IS NOT NULL
+                ) AS days
+                GROUP BY day;
+            """)
+            
+            cur.execute(f"""
+                WITH counted AS ({counted})
+                INSERT INTO officer_resolution_stats (officer_id, resolved_count, total_resolution_seconds)
+                SELECT officer_id, COUNT(*), SUM(EXTRACT(EPOCH FROM resolved_at - reported_at))
+                FROM counted
+                WHERE officer_id IS NOT NULL AND resolved_at IS NOT NULL
+                GROUP BY officer_id;
+            """)
+            
+            # Archived cases are all finished, so only live ones are open
+            cur.execute("""
+                INSERT INTO officer_workload (officer_id, open_cases)
+                SELECT officer_id, COUNT(*)
+                FROM cases
+                WHERE officer_id IS NOT NULL AND status IN ('Pending', 'Under Investigation')
+                  AND deleted_at IS NULL
+                GROUP BY officer_id;
+            """)
+        
+        print("✓ Statistics rebuilt successfully!")
+        return True
+    
+    except Exception as e:
+        print(f"✗ Error rebuilding statistics: {e}")
+        return False
+
+
+# FOLD
+# (delta table, totals table, key columns, counted columns)
+_FOLDS = [
+    ("case_stats_delta", "case_stats", ["dimension", "value"], ["case_count"]),
+    ("case_daily_stats_delta", "case_daily_stats", ["day"], ["reported_count", "resolved_count"]),
+    ("officer_resolution_stats_delta", "officer_resolution_stats", ["officer_id"],
+     ["resolved_count", "total_resolution_seconds"]),
+    ("officer_workload_delta", "officer_workload", ["officer_id"], ["open_cases"]),
+]
+
+
+@profiled
+def fold_statistics():
+    """
+    Move the changes waiting in the delta tables into the summary totals
+    The numbers read do not change (the *_current views already add the
+    deltas); this only keeps the delta tables, and so the reads, small.
+    Run it every few minutes (e.g. from cron); cases can be changed meanwhile.
+    
+    Returns:
+        Number of delta rows folded in, None if failed
+    """
+    try:
+        folded = 0
+        with transaction() as cur:
+            for delta, totals, keys, counts in _FOLDS:
+                # Deltas committed while this runs are not deleted, so they
+                # are folded next time; totals are upserted in key order so
+                # two folds at once can not deadlock
+                key_list = ", ".join(keys)
+                count_list = ", ".join(counts)
+                sums = ", ".join(f"SUM({count}) AS {count}" for count in counts)
+                additions = ", ".join(f"{count} = {totals}.{count} + EXCLUDED.{count}" for count in counts)
+                cur.execute(f"""
+                    WITH moved AS (
+                        DELETE FROM {delta} RETURNING {key_list}, {count_list}
+                    ), summed AS (
+                        SELECT {key_list}, {sums}, COUNT(*) AS row_count
+                        FROM moved
+                        GROUP BY {key_list}
+                    ), upserted AS (
+                        INSERT INTO {totals} ({key_list}, {count_list})
+                        SELECT {key_list}, {count_list} FROM summed
+                        ORDER BY {key_list}
+                        ON CONFLICT ({key_list}) DO UPDATE SET {additions}
+                    )
+                    SELECT COALESCE(SUM(row_count), 0)::BIGINT FROM summed;
+                """)
+                folded += cur.fetchone()[0]
+        
+        print(f"✓ {folded} statistics changes folded into the totals")
+        return folded
+    
+    except Exception as e:
+        print(f"✗ Error folding statistics: {e}")
+        return None
+
+
+# DISPLAY STATISTICS
+def display_case_counts(title, counts, total=None):
+    """
+    Show case counts in a formatted table
+    
+    Args:
+        title: What the values are (e.g. "Status")
+        counts: List of (value, case_count)
+        total: (Optional) Total number of cases, to show percentages
+    """
+    if not counts:
+        print("\nNo cases recorded yet.")
+        return
+    
+    print("\n" + "="*60)
+    print(f"{title:<35} {'Cases':>10} {'Share':>10}")
+    print("="*60)
+    
+    for value, case_count in counts:
+        share = f"{case_count / total:.1%}" if total else ""
+        print(f"{value[:35]:<35} {case_count:>10,} {share:>10}")
+    
+    print("="*60)
+
+
+def display_daily_counts(daily):
+    """
+    Show cases reported / resolved per day
+    
+    Args:
+        daily: List of (day, reported_count, resolved_count)
+    """
+    if not daily:
+        print("\nNo cases in this period.")
+        return
+    
+    print("\n" + "="*45)
+    print(f"{'Day':<15} {'Reported':>12} {'Resolved':>12}")
+    print("="*45)
+    
+    for day, reported_count, resolved_count in daily:
+        print(f"{day.strftime('%Y-%m-%d'):<15} {reported_count:>12,} {resolved_count:>12,}")
+    
+    print("="*45)
+
+
+def display_resolution_stats(stats, by_station=False):
+    """
+    Show the average time to resolution per officer or per station
+    
+    Args:
+        stats: Rows from get_officer_resolution_stats or get_station_resolution_stats
+        by_station: True for station rows
+    """
+    if not stats:
+        print("\nNo resolved cases yet.")
+        return
+    
+    print("\n" + "="*80)
+    if by_station:
+        print(f"{'Station':<40} {'Resolved':>12} {'Avg. hours':>12}")
+    else:
+        print(f"{'ID':<5} {'Officer':<25} {'Station':<20} {'Resolved':>12} {'Avg. hours':>12}")
+    print("="*80)
+    
+    for row in stats:
+        if by_station:
+            station, resolved_count, average_hours = row
+            print(f"{station[:40]:<40} {resolved_count:>12,} {average_hours:>12}")
+        else:
+            officer_id, name, station, resolved_count, average_hours = row
+            print(f"{officer_id:<5} {name[:25]:<25} {(station or 'N/A')[:20]:<20} "
+                  f"{resolved_count:>12,} {average_hours:>12}")
+    
+    print("="*80)
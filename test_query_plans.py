@@ -0,0 +1,98 @@
+# Check that every supported find_cases() filter combination is served by the
+# index meant for it
+#
+# The test recreates the schema of its own database and fills it with the
+# fixed synthetic dataset of benchmarks/data_generator.py (same seed, same
+# rows), so the plans do not depend on whatever data a database happens to
+# hold. Sequential scans are switched off while planning (see
+# explain_find_cases), so each plan shows the index PostgreSQL would use.
+#
+# WARNING: it wipes the database named by DB_TEST_NAME (skipped when unset)
+# > DB_TEST_NAME=crime_reporting_test python -m pytest test_query_plans.py
+import datetime
+import os
+import re
+
+import pytest
+
+# (test_connection renamed, or pytest would collect it as a test)
+from database.connection import (
+    init_pool, test_connection as check_connection, close_all_connections, read, DB_CONFIG, PROFILE_CONFIG
+)
+from operations.case_ops import explain_find_cases
+from benchmarks.data_generator import generate
+
+# Cases in the fixed dataset (enough for every index to be worth using)
+DATASET_CASES = 20_000
+DATASET_SEED = 42
+
+# A recent date window used by the date range combinations
+TODAY = datetime.date.today()
+LAST_MONTH = TODAY - datetime.timedelta(days=30)
+
+# Filter combinations officers use, with the index (or indexes, when either
+# one serves it) that must answer each
+SUPPORTED_FILTER_COMBINATIONS = [
+    ({'status': 'Pending'}, {'idx_cases_status_reported'}),
+    ({'status': 'Pending', 'reported_from': LAST_MONTH, 'reported_to': TODAY}, {'idx_cases_status_reported'}),
+    ({'status': 'Resolved', 'order_by': 'oldest'}, {'idx_cases_status_reported'}),
+    ({'officer_id': 1}, {'idx_cases_officer_status'}),
+    ({'officer_id': 1, 'status': 'Under Investigation'}, {'idx_cases_officer_status'}),
+    ({'officer_id': 1, 'reported_from': LAST_MONTH}, {'idx_cases_officer_status'}),
+    ({'location': 'Nairobi'}, {'idx_cases_location_trgm'}),
+    ({'location': 'Nairobi', 'status': 'Pending'}, {'idx_cases_location_trgm', 'idx_cases_status_reported'}),
+    ({'crime_type': 'Theft'}, {'idx_cases_crime_type_trgm'}),
+    ({'crime_type': 'Theft', 'location': 'Nairobi'}, {'idx_cases_crime_type_trgm', 'idx_cases_location_trgm'}),
+    ({'crime_type': 'Theft', 'reported_from': LAST_MONTH}, {'idx_cases_crime_type_trgm', 'idx_cases_reported'}),
+    ({'reported_from': LAST_MONTH, 'reported_to': TODAY}, {'idx_cases_reported'}),
+    ({'limit': 20}, {'idx_cases_reported'}),
+    ({'status': 'Pending', 'limit': 20, 'after': (datetime.datetime.now(), 1000)}, {'idx_cases_status_reported'}),
+    ({'resolved_from': LAST_MONTH, 'resolved_to': TODAY}, {'idx_cases_resolved', 'idx_cases_status_resolved'}),
+    ({'status': 'Resolved', 'resolved_from': LAST_MONTH}, {'idx_cases_status_resolved'}),
+]
+
+# "Index Scan using x on ...", "Index Only Scan Backward using x ...", "Bitmap Index Scan on x"
+_INDEX_IN_PLAN = re.compile(r'(?:Index(?: Only)? Scan(?: Backward)? using|Bitmap Index Scan on) (\S+)')
+
+
+@pytest.fixture(scope="module")
+def fixed_dataset():
+    """Recreate the test database and load the fixed dataset into it"""
+    name = os.getenv('DB_TEST_NAME')
+    if not name:
+        pytest.skip("set DB_TEST_NAME to a scratch database (the test recreates it)")
+    
+    DB_CONFIG['database'] = name
+    # Every bulk INSERT is "slow"; do not log (and EXPLAIN) each one
+    PROFILE_CONFIG['slow_query_ms'] = float('inf')
+    init_pool()
+    if not check_connection():
+        pytest.fail(f"can not connect to {name}")
+    
+    generate(DATASET_CASES, DATASET_SEED)
+    yield
+    close_all_connections()
+
+
+def used_indexes(plan):
+    """
+    Names of the indexes a plan reads, as created on cases (a partition's
+    own index is reported as the cases index it belongs to)
+    """
+    indexes = set()
+    with read() as cur:
+        for name in _INDEX_IN_PLAN.findall("\n".join(plan)):
+            cur.execute("SELECT COALESCE(pg_partition_root(%s::regclass), %s::regclass)::text;", (name, name))
+            indexes.add(cur.fetchone()[0])
+    return indexes
+
+
+@pytest.mark.parametrize("filters, expected", SUPPORTED_FILTER_COMBINATIONS,
+                         ids=[" ".join(sorted(filters)) for filters, _ in SUPPORTED_FILTER_COMBINATIONS])
+def test_find_cases_uses_index(fixed_dataset, filters, expected):
+    plan = explain_find_cases(**filters)
+    text = "\n".join(plan)
+    
+    # Joined lookups on citizens/officers are fine, only cases must use an index
+    assert "Seq Scan on cases" not in text, f"sequential scan on cases:\n{text}"
+    assert used_indexes(plan) & expected, f"none of {sorted(expected)} used:\n{text}"
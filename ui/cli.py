@@ -0,0 +1,654 @@
+# Command-line (non-interactive) interface
+# Used when main.py is started with arguments, e.g.
+#   python main.py import cases legacy_cases.csv
+#   python main.py cases list --status Pending --format jsonl
+#   python main.py case-update add 12 3 "Suspect identified"
+#
+# Results are written to stdout (as a table, CSV or JSON Lines), while the
+# ✓ / ✗ messages of the operations go to stderr, so output can be piped
+# straight into other programs. The exit code is 0 on success, 1 on failure.
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import sys
+
+from database.connection import init_pool, close_all_connections, PROFILE_CONFIG, write_query_stats
+from database.rows import Citizen, Officer, Case, CaseSummary, CaseUpdate, SearchResult, StatusChange
+from operations.import_ops import import_file, BulkImportError, IMPORT_TABLES, DEFAULT_BATCH_SIZE
+from operations.export_ops import export_table, json_value, EXPORTS, EXPORT_FORMATS
+from operations.citizen_ops import (
+    add_citizen, get_all_citizens, get_citizen_by_id, update_citizen, delete_citizen, display_citizens
+)
+from operations.officer_ops import (
+    add_officer, get_all_officers, get_officer_by_id, update_officer, delete_officer, display_officers
+)
+from operations.case_ops import (
+    add_case, iter_cases, get_case_by_id, search_cases, assign_officer_to_case,
+    update_case_status, delete_case, display_cases, display_search_results,
+    get_status_history, display_status_history
+)
+from operations.case_update_ops import (
+    add_case_update, iter_case_timeline, delete_case_update, display_case_updates
+)
+from operations.archive_ops import (
+    archive_old_cases, DEFAULT_ARCHIVE_MONTHS, DEFAULT_BATCH_SIZE as ARCHIVE_BATCH_SIZE
+)
+from operations.partition_ops import (
+    create_future_partitions, get_partitions, display_partitions, DEFAULT_MONTHS_AHEAD
+)
+from operations.assignment_ops import auto_assign_case, assign_pending_backlog, DEFAULT_BATCH_SIZE as ASSIGN_BATCH_SIZE
+from operations.stats_ops import (
+    get_case_counts, get_daily_counts, get_officer_resolution_stats, get_station_resolution_stats,
+    rebuild_statistics, fold_statistics, display_case_counts, display_daily_counts, display_resolution_stats,
+    STAT_DIMENSIONS
+)
+
+# Output formats for commands that return rows
+OUTPUT_FORMATS = ["table", "csv", "jsonl"]
+
+# Every status a case can have (same as the CHECK on cases in the migrations)
+CASE_STATUSES = ["Pending", "Under Investigation", "Resolved", "Closed"]
+
+# Column names of the rows each operation returns (used for CSV / JSON Lines)
+# Typed rows name their own columns (see database/rows.py)
+CITIZEN_COLUMNS = list(Citizen._fields)
+OFFICER_COLUMNS = list(Officer._fields)
+CASE_COLUMNS = list(CaseSummary._fields)
+CASE_DETAIL_COLUMNS = list(Case._fields)
+SEARCH_COLUMNS = list(SearchResult._fields)
+UPDATE_COLUMNS = list(CaseUpdate._fields)
+HISTORY_COLUMNS = list(StatusChange._fields)
+DAILY_COLUMNS = ["day", "reported_count", "resolved_count"]
+OFFICER_RESOLUTION_COLUMNS = ["officer_id", "officer_name", "station", "resolved_count", "average_hours"]
+STATION_RESOLUTION_COLUMNS = ["station", "resolved_count", "average_hours"]
+PARTITION_COLUMNS = ["table", "partition", "range", "estimated_rows", "size"]
+
+
+def build_parser():
+    """
+    Describe every command and its options
+    
+    Returns:
+        The argparse parser for main.py
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Crime Reporting & Tracking System (run without arguments for the menus)"
+    )
+    parser.add_argument("--metrics-file", default=PROFILE_CONFIG['metrics_file'],
+                        help="Save the query statistics to this file when done "
+                             "(.prom for Prometheus text format, otherwise JSON)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    # IMPORT
+    import_parser = commands.add_parser(
+        "import", help="Bulk load citizens, officers or cases from a CSV or JSON Lines file"
+    )
+    import_parser.add_argument("table", choices=sorted(IMPORT_TABLES))
+    import_parser.add_argument("path", help="File to load (.csv with a header row, or .jsonl)")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"], dest="file_format",
+                               help="File format (default: guessed from the extension)")
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                               help=f"Rows per COPY and commit (default: {DEFAULT_BATCH_SIZE})")
+    import_parser.add_argument("--ids-out", help="Write the generated IDs to this file, one per line")
+    import_parser.set_defaults(handler=run_import)
+    
+    # EXPORT
+    export_parser = commands.add_parser(
+        "export", help="Write cases or case update timelines to CSV, JSON Lines or Parquet files"
+    )
+    export_parser.add_argument("table", choices=sorted(EXPORTS))
+    export_parser.add_argument("path", help="File to write ('-' for stdout), or a folder with --partition month")
+    export_parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv", dest="file_format",
+                               help="File format (default: csv; parquet needs pyarrow)")
+    export_parser.add_argument("--from", dest="date_from", help="Only rows on or after this date (YYYY-MM-DD)")
+    export_parser.add_argument("--to", dest="date_to", help="Only rows before this date (YYYY-MM-DD)")
+    export_parser.add_argument("--partition", choices=["month"], help="Write one file per month into the folder")
+    export_parser.set_defaults(handler=run_export)
+    
+    # ARCHIVE
+    archive_parser = commands.add_parser(
+        "archive", help="Move old Resolved / Closed (and deleted) cases and their notes to the archive tables"
+    )
+    archive_parser.add_argument("--months", type=int, default=DEFAULT_ARCHIVE_MONTHS,
+                                help=f"Only cases finished or deleted this many months ago "
+                                     f"(default: {DEFAULT_ARCHIVE_MONTHS})")
+    archive_parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+                                help=f"Cases moved per transaction (default: {ARCHIVE_BATCH_SIZE})")
+    archive_parser.set_defaults(handler=run_archive)
+    
+    # PARTITIONS
+    partitions = commands.add_parser("partitions", help="Manage the monthly partitions of cases and case updates")
+    actions = partitions.add_subparsers(dest="action", required=True)
+    
+    command = actions.add_parser("create", help="Create the partitions of this month and the next ones "
+                                                "(prints how many were created)")
+    command.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD,
+                         help=f"Months after this one (default: {DEFAULT_MONTHS_AHEAD})")
+    command.set_defaults(handler=run_partitions_create)
+    
+    command = actions.add_parser("list", help="List the partitions with their sizes")
+    _add_format_option(command)
+    command.set_defaults(handler=run_partitions_list)
+    
+    # CITIZENS
+    citizens = commands.add_parser("citizens", help="List, add, update or delete citizens")
+    actions = citizens.add_subparsers(dest="action", required=True)
+    
+    command = actions.add_parser("list", help="List all citizens")
+    _add_format_option(command)
+    command.set_defaults(handler=run_citizens_list)
+    
+    command = actions.add_parser("get", help="Show one citizen")
+    command.add_argument("citizen_id", type=int)
+    _add_format_option(command)
+    command.set_defaults(handler=run_citizens_get)
+    
+    command = actions.add_parser("add", help="Register a citizen (prints the new ID)")
+    command.add_argument("--name", required=True)
+    command.add_argument("--phone", required=True)
+    command.add_argument("--email")
+    command.add_argument("--address")
+    command.set_defaults(handler=run_citizens_add)
+    
+    command = actions.add_parser("update", help="Change a citizen's details")
+    command.add_argument("citizen_id", type=int)
+    command.add_argument("--name")
+    command.add_argument("--phone")
+    command.add_argument("--email")
+    command.add_argument("--address")
+    command.set_defaults(handler=run_citizens_update)
+    
+    command = actions.add_parser("delete", help="Delete a citizen and their cases")
+    command.add_argument("citizen_id", type=int)
+    command.set_defaults(handler=run_citizens_delete)
+    
+    # OFFICERS
+    officers = commands.add_parser("officers", help="List, add, update or delete officers")
+    actions = officers.add_subparsers(dest="action", required=True)
+    
+    command = actions.add_parser("list", help="List all officers")
+    _add_format_option(command)
+    command.set_defaults(handler=run_officers_list)
+    
+    command = actions.add_parser("get", help="Show one officer")
+    command.add_argument("officer_id", type=int)
+    _add_format_option(command)
+    command.set_defaults(handler=run_officers_get)
+    
+    command = actions.add_parser("add", help="Register an officer (prints the new ID)")
+    command.add_argument("--name", required=True)
+    command.add_argument("--badge", required=True)
+    command.add_argument("--rank", required=True)
+    command.add_argument("--phone", required=True)
+    command.add_argument("--station")
+    command.set_defaults(handler=run_officers_add)
+    
+    command = actions.add_parser("update", help="Change an officer's details")
+    command.add_argument("officer_id", type=int)
+    command.add_argument("--name")
+    command.add_argument("--rank")
+    command.add_argument("--phone")
+    command.add_argument("--station")
+    command.set_defaults(handler=run_officers_update)
+    
+    command = actions.add_parser("delete", help="Delete an officer (their cases become unassigned)")
+    command.add_argument("officer_id", type=int)
+    command.set_defaults(handler=run_officers_delete)
+    
+    # CASES
+    cases = commands.add_parser("cases", help="List, search, report and manage cases")
+    actions = cases.add_subparsers(dest="action", required=True)
+    
+    command = actions.add_parser("list", help="Stream cases, newest first")
+    command.add_argument("--status", choices=CASE_STATUSES)
+    command.add_argument("--location", help="Only cases whose location contains this text")
+    command.add_argument("--crime-type", help="Only cases whose crime type contains this text")
+    _add_format_option(command)
+    command.set_defaults(handler=run_cases_list)
+    
+    command = actions.add_parser("get", help="Show one case with its citizen and officer")
+    command.add_argument("case_id", type=int)
+    command.add_argument("--archived", action="store_true", help="Also look in the archive")
+    _add_format_option(command)
+    command.set_defaults(handler=run_cases_get)
+    
+    command = actions.add_parser("search", help="Full-text search of cases and their notes")
+    command.add_argument("query")
+    command.add_argument("--limit", type=int, default=20)
+    _add_format_option(command)
+    command.set_defaults(handler=run_cases_search)
+    
+    command = actions.add_parser("add", help="Report a case (prints the new ID)")
+    command.add_argument("--citizen-id", type=int, required=True)
+    command.add_argument("--crime-type", required=True)
+    command.add_argument("--description", required=True)
+    command.add_argument("--location", required=True)
+    command.add_argument("--officer-id", type=int)
+    command.set_defaults(handler=run_cases_add)
+    
+    command = actions.add_parser("assign", help="Assign an officer to a case")
+    command.add_argument("case_id", type=int)
+    command.add_argument("officer_id", type=int)
+    command.set_defaults(handler=run_cases_assign)
+    
+    command = actions.add_parser("auto-assign",
+                                 help="Pick the best officer for a case, or for every unassigned Pending case")
+    command.add_argument("case_id", type=int, nargs="?", help="Case to assign (default: the whole backlog)")
+    command.add_argument("--batch-size", type=int, default=ASSIGN_BATCH_SIZE,
+                         help=f"Backlog cases updated per statement (default: {ASSIGN_BATCH_SIZE})")
+    command.set_defaults(handler=run_cases_auto_assign)
+    
+    command = actions.add_parser("status", help="Move a case to its next status "
+                                                 "(Pending -> Under Investigation -> Resolved / Closed)")
+    command.add_argument("case_id", type=int)
+    command.add_argument("status", choices=CASE_STATUSES)
+    command.add_argument("--officer-id", type=int, help="Officer making the change (saved in the history)")
+    command.set_defaults(handler=run_cases_status)
+    
+    command = actions.add_parser("history", help="List the status changes of a case, oldest first")
+    command.add_argument("case_id", type=int)
+    _add_format_option(command)
+    command.set_defaults(handler=run_cases_history)
+    
+    command = actions.add_parser("delete", help="Delete a case (hidden, archived later)")
+    command.add_argument("case_id", type=int)
+    command.set_defaults(handler=run_cases_delete)
+    
+    # CASE UPDATES
+    case_update = commands.add_parser("case-update", help="Add, list or delete case progress notes")
+    actions = case_update.add_subparsers(dest="action", required=True)
+    
+    command = actions.add_parser("add", help="Add a progress note to a case (prints the new ID)")
+    command.add_argument("case_id", type=int)
+    command.add_argument("officer_id", type=int)
+    command.add_argument("note")
+    command.set_defaults(handler=run_case_update_add)
+    
+    command = actions.add_parser("list", help="List the notes of a case, newest first")
+    command.add_argument("case_id", type=int)
+    command.add_argument("--limit", type=int, help="Only the newest N notes (default: all)")
+    _add_format_option(command)
+    command.set_defaults(handler=run_case_update_list)
+    
+    command = actions.add_parser("delete", help="Delete a progress note")
+    command.add_argument("update_id", type=int)
+    command.set_defaults(handler=run_case_update_delete)
+    
+    # STATISTICS
+    stats = commands.add_parser("stats", help="Case statistics (read from the summary tables)")
+    actions = stats.add_subparsers(dest="action", required=True)
+    
+    command = actions.add_parser("counts", help="Number of cases per status, crime type or location")
+    command.add_argument("dimension", choices=STAT_DIMENSIONS)
+    command.add_argument("--limit", type=int, help="Only the most common values")
+    _add_format_option(command)
+    command.set_defaults(handler=run_stats_counts)
+    
+    command = actions.add_parser("daily", help="Cases reported and resolved per day")
+    command.add_argument("--days", type=int, default=30)
+    _add_format_option(command)
+    command.set_defaults(handler=run_stats_daily)
+    
+    command = actions.add_parser("resolution", help="Average time to resolution")
+    command.add_argument("--by", choices=["officer", "station"], default="officer")
+    _add_format_option(command)
+    command.set_defaults(handler=run_stats_resolution)
+    
+    command = actions.add_parser("rebuild", help="Recompute the summary tables from the cases table")
+    command.set_defaults(handler=run_stats_rebuild)
+    
+    command = actions.add_parser("fold", help="Move the pending changes into the summary totals "
+                                              "(prints how many were folded)")
+    command.set_defaults(handler=run_stats_fold)
+    
+    return parser
+
+
+def _add_format_option(command):
+    """Add --format to a command that prints rows"""
+    command.add_argument("--format", choices=OUTPUT_FORMATS, default="table", dest="output_format",
+                        help="Output format (default: table)")
+
+
+# OUTPUT
+def write_rows(rows, columns, output_format, display, out):
+    """
+    Write rows to `out` in the chosen format
+    CSV and JSON Lines are written one row at a time, so a streamed
+    result (e.g. iter_cases) is never held in memory
+    
+    Args:
+        rows: Iterable of rows (tuples or row types) from an operation
+        columns: Column names of those rows
+        output_format: "table", "csv" or "jsonl"
+        display: display_* function used for the table format
+        out: Stream to write to (stdout)
+    
+    Returns:
+        The exit code: 1 if the operation failed (rows is None, or a streamed
+        result stopped with an error), otherwise 0
+    """
+    if rows is None:
+        return 1
+    
+    try:
+        if output_format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+        elif output_format == "jsonl":
+            for row in rows:
+                out.write(json.dumps(dict(zip(columns, row)), default=json_value) + "\n")
+        else:
+            # Read every row first, so the operation's messages still go to stderr;
+            # the display functions print, so point print at `out`
+            rows = list(rows)
+            with contextlib.redirect_stdout(out):
+                display(rows)
+    except BrokenPipeError:
+        raise
+    except Exception:
+        # The streaming operations print their error before raising it
+        return 1
+    return 0
+
+
+def write_record(row, columns, output_format, out):
+    """Write one record: a "column: value" list for the table format"""
+    if output_format != "table":
+        write_rows([row], columns, output_format, None, out)
+        return
+    
+    width = max(len(column) for column in columns)
+    for column, value in zip(columns, row):
+        out.write(f"{column:<{width}}  {'' if value is None else value}\n")
+
+
+def _exit_code(ok):
+    """0 if the operation worked, 1 if it failed"""
+    return 0 if ok else 1
+
+
+# IMPORT
+def run_import(args, out):
+    """Handle: main.py import <table> <path>"""
+    try:
+        ids = import_file(args.table, args.path, args.file_format, args.batch_size)
+    except (BulkImportError, OSError) as e:
+        print(f"✗ Import failed: {e}")
+        return 1
+    
+    if args.ids_out:
+        with open(args.ids_out, "w") as f:
+            f.writelines(f"{new_id}\n" for new_id in ids)
+    
+    print(f"✓ Imported {len(ids):,} {args.table}")
+    return 0
+
+
+def run_export(args, out):
+    """Handle: main.py export <table> <path>"""
+    try:
+        # "-" writes to the real stdout, not to the messages stream
+        with contextlib.redirect_stdout(out):
+            written = export_table(args.table, args.path, args.file_format,
+                                   args.date_from, args.date_to, args.partition)
+    except Exception as e:
+        print(f"✗ Export failed: {e}")
+        return 1
+    
+    for path, count in written.items():
+        print(f"✓ {count:,} {args.table} written to {path}")
+    return 0
+
+
+def run_archive(args, out):
+    """Handle: main.py archive [--months N] (prints the number of cases archived)"""
+    archived = archive_old_cases(args.months, args.batch_size)
+    if archived is None:
+        return 1
+    out.write(f"{archived}\n")
+    return 0
+
+
+# PARTITIONS
+def run_partitions_create(args, out):
+    """Handle: main.py partitions create [--months-ahead N]"""
+    created = create_future_partitions(args.months_ahead)
+    if created is None:
+        return 1
+    out.write(f"{created}\n")
+    return 0
+
+
+def run_partitions_list(args, out):
+    """Handle: main.py partitions list"""
+    return write_rows(get_partitions(), PARTITION_COLUMNS, args.output_format, display_partitions, out)
+
+
+# CITIZENS
+def run_citizens_list(args, out):
+    """Handle: main.py citizens list"""
+    return write_rows(get_all_citizens(), CITIZEN_COLUMNS, args.output_format, display_citizens, out)
+
+
+def run_citizens_get(args, out):
+    """Handle: main.py citizens get <citizen_id>"""
+    citizen = get_citizen_by_id(args.citizen_id)
+    if citizen is None:
+        print(f"✗ Citizen {args.citizen_id} not found")
+        return 1
+    write_record(citizen, CITIZEN_COLUMNS, args.output_format, out)
+    return 0
+
+
+def run_citizens_add(args, out):
+    """Handle: main.py citizens add --name ... --phone ..."""
+    citizen_id = add_citizen(args.name, args.phone, args.email, args.address)
+    if citizen_id is None:
+        return 1
+    out.write(f"{citizen_id}\n")
+    return 0
+
+
+def run_citizens_update(args, out):
+    """Handle: main.py citizens update <citizen_id> [--name ...]"""
+    return _exit_code(update_citizen(args.citizen_id, args.name, args.phone, args.email, args.address))
+
+
+def run_citizens_delete(args, out):
+    """Handle: main.py citizens delete <citizen_id>"""
+    return _exit_code(delete_citizen(args.citizen_id))
+
+
+# OFFICERS
+def run_officers_list(args, out):
+    """Handle: main.py officers list"""
+    return write_rows(get_all_officers(), OFFICER_COLUMNS, args.output_format, display_officers, out)
+
+
+def run_officers_get(args, out):
+    """Handle: main.py officers get <officer_id>"""
+    officer = get_officer_by_id(args.officer_id)
+    if officer is None:
+        print(f"✗ Officer {args.officer_id} not found")
+        return 1
+    write_record(officer, OFFICER_COLUMNS, args.output_format, out)
+    return 0
+
+
+def run_officers_add(args, out):
+    """Handle: main.py officers add --name ... --badge ... --rank ... --phone ..."""
+    officer_id = add_officer(args.name, args.badge, args.rank, args.phone, args.station)
+    if officer_id is None:
+        return 1
+    out.write(f"{officer_id}\n")
+    return 0
+
+
+def run_officers_update(args, out):
+    """Handle: main.py officers update <officer_id> [--rank ...]"""
+    return _exit_code(update_officer(args.officer_id, args.name, args.rank, args.phone, args.station))
+
+
+def run_officers_delete(args, out):
+    """Handle: main.py officers delete <officer_id>"""
+    return _exit_code(delete_officer(args.officer_id))
+
+
+# CASES
+def run_cases_list(args, out):
+    """Handle: main.py cases list [--status ...] (streamed from the database)"""
+    cases = iter_cases(status=args.status, location=args.location, crime_type=args.crime_type)
+    return write_rows(cases, CASE_COLUMNS, args.output_format, display_cases, out)
+
+
+def run_cases_get(args, out):
+    """Handle: main.py cases get <case_id>"""
+    case = get_case_by_id(args.case_id, include_archived=args.archived)
+    if case is None:
+        print(f"✗ Case {args.case_id} not found")
+        return 1
+    write_record(case, CASE_DETAIL_COLUMNS, args.output_format, out)
+    return 0
+
+
+def run_cases_search(args, out):
+    """Handle: main.py cases search <query>"""
+    results = search_cases(args.query, limit=args.limit)
+    return write_rows(results, SEARCH_COLUMNS, args.output_format, display_search_results, out)
+
+
+def run_cases_add(args, out):
+    """Handle: main.py cases add --citizen-id ... --crime-type ... --description ... --location ..."""
+    case_id = add_case(args.citizen_id, args.crime_type, args.description, args.location, args.officer_id)
+    if case_id is None:
+        return 1
+    out.write(f"{case_id}\n")
+    return 0
+
+
+def run_cases_assign(args, out):
+    """Handle: main.py cases assign <case_id> <officer_id>"""
+    return _exit_code(assign_officer_to_case(args.case_id, args.officer_id))
+
+
+def run_cases_auto_assign(args, out):
+    """Handle: main.py cases auto-assign [case_id] (prints the officer ID / number assigned)"""
+    if args.case_id is None:
+        assigned = assign_pending_backlog(args.batch_size)
+        if assigned is None:
+            return 1
+        out.write(f"{assigned}\n")
+        return 0
+    
+    officer_id = auto_assign_case(args.case_id)
+    if officer_id is None:
+        return 1
+    out.write(f"{officer_id}\n")
+    return 0
+
+
+def run_cases_status(args, out):
+    """Handle: main.py cases status <case_id> <status> [--officer-id ID]"""
+    return _exit_code(update_case_status(args.case_id, args.status, args.officer_id))
+
+
+def run_cases_history(args, out):
+    """Handle: main.py cases history <case_id>"""
+    history = get_status_history(args.case_id)
+    return write_rows(history, HISTORY_COLUMNS, args.output_format, display_status_history, out)
+
+
+def run_cases_delete(args, out):
+    """Handle: main.py cases delete <case_id>"""
+    return _exit_code(delete_case(args.case_id))
+
+
+# CASE UPDATES
+def run_case_update_add(args, out):
+    """Handle: main.py case-update add <case_id> <officer_id> <note>"""
+    update_id = add_case_update(args.case_id, args.officer_id, args.note)
+    if update_id is None:
+        return 1
+    out.write(f"{update_id}\n")
+    return 0
+
+
+def run_case_update_list(args, out):
+    """Handle: main.py case-update list <case_id> [--limit N]"""
+    # Read a page at a time, so a long timeline streams to csv / jsonl
+    updates = itertools.islice(iter_case_timeline(args.case_id), args.limit)
+    return write_rows(updates, UPDATE_COLUMNS, args.output_format, display_case_updates, out)
+
+
+def run_case_update_delete(args, out):
+    """Handle: main.py case-update delete <update_id>"""
+    return _exit_code(delete_case_update(args.update_id))
+
+
+# STATISTICS
+def run_stats_counts(args, out):
+    """Handle: main.py stats counts <dimension>"""
+    counts = get_case_counts(args.dimension, args.limit)
+    return write_rows(counts, [args.dimension, "case_count"], args.output_format,
+                      lambda rows: display_case_counts(args.dimension.replace("_", " ").title(), rows), out)
+
+
+def run_stats_daily(args, out):
+    """Handle: main.py stats daily [--days N]"""
+    return write_rows(get_daily_counts(args.days), DAILY_COLUMNS, args.output_format, display_daily_counts, out)
+
+
+def run_stats_resolution(args, out):
+    """Handle: main.py stats resolution [--by officer|station]"""
+    if args.by == "station":
+        return write_rows(get_station_resolution_stats(), STATION_RESOLUTION_COLUMNS, args.output_format,
+                          lambda rows: display_resolution_stats(rows, by_station=True), out)
+    return write_rows(get_officer_resolution_stats(), OFFICER_RESOLUTION_COLUMNS, args.output_format,
+                      display_resolution_stats, out)
+
+
+def run_stats_rebuild(args, out):
+    """Handle: main.py stats rebuild"""
+    return _exit_code(rebuild_statistics())
+
+
+def run_stats_fold(args, out):
+    """Handle: main.py stats fold"""
+    folded = fold_statistics()
+    if folded is None:
+        return 1
+    out.write(f"{folded}\n")
+    return 0
+
+
+def run_cli(argv):
+    """
+    Run one command and return the process exit code
+    
+    Args:
+        argv: Command-line arguments (without the program name)
+    """
+    # Parse first, so --help and typos never need the database
+    args = build_parser().parse_args(argv)
+    
+    # Results go to stdout; every message printed by the operations
+    # (✓ / ✗ lines, pool start-up) goes to stderr
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        if not init_pool():
+            return 1
+        try:
+            return args.handler(args, out)
+        except BrokenPipeError:
+            # The reading program stopped early (e.g. `| head`), not an error
+            return 0
+        finally:
+            if args.metrics_file:
+                write_query_stats(args.metrics_file)
+            close_all_connections()
@@ -15,16 +15,42 @@ from operations.officer_ops import (
 
 # Import all case-related functions
 from operations.case_ops import (
-    add_case, get_all_cases, get_case_by_id,
-    get_cases_by_status, get_cases_by_location, get_cases_by_crime_type,
-    assign_officer_to_case, update_case_status, delete_case, display_cases
+    add_case, get_all_cases, get_case_by_id, get_cases_by_citizen,
+    get_cases_by_status, search_cases_by_location, search_cases_by_crime_type,
+    assign_officer_to_case, update_case_status, delete_case, display_cases,
+    next_page_key, search_cases, display_search_results, find_cases,
+    get_status_history, display_status_history, STATUS_TRANSITIONS
 )
 
 # Import case update functions
 from operations.case_update_ops import (
-    add_case_update, get_updates_by_case, delete_case_update, display_case_updates
+    add_case_update, get_updates_by_case, get_case_timeline, next_timeline_key,
+    delete_case_update, display_case_updates, TIMELINE_PAGE_SIZE
 )
 
+# Import automatic officer assignment
+from operations.assignment_ops import auto_assign_case, assign_pending_backlog
+
+# Import statistics functions (they read the summary tables only)
+from operations.stats_ops import (
+    get_case_counts, get_total_cases, get_daily_counts, get_officer_resolution_stats,
+    get_station_resolution_stats, display_case_counts, display_daily_counts,
+    display_resolution_stats
+)
+
+
+# Number of cases shown on each page of a case listing
+CASES_PER_PAGE = 20
+
+# Number of best matches shown by the location / crime type searches
+SEARCH_RESULTS_LIMIT = 50
+
+# Rows shown by the "top" statistics (crime types, locations, officers)
+STATS_TOP_LIMIT = 15
+
+# Days shown by the cases per day statistics
+STATS_DAYS = 30
+
 
 # HELPER FUNCTIONS
 
@@ -44,6 +70,34 @@ def pause():
     input("\nPress Enter to continue...")
 
 
+def page_through_cases(fetch_page):
+    """
+    Show a case listing one page at a time
+    Only the page on screen is loaded from the database
+    
+    Args:
+        fetch_page: Function taking (limit, after) and returning one page of cases
+    """
+    after = None
+    while True:
+        cases = fetch_page(CASES_PER_PAGE, after)
+        
+        if cases or after is None:
+            display_cases(cases)
+        else:
+            print("\nNo more cases.")
+        
+        # A short page means there is nothing left to load
+        if len(cases) < CASES_PER_PAGE:
+            pause()
+            return
+        
+        more = input("\nPress N for the next page, or Enter to go back: ").strip().lower()
+        if more != 'n':
+            return
+        after = next_page_key(cases)
+
+
 # MAIN MENU
 
 def main_menu():
@@ -60,10 +114,11 @@ def main_menu():
     print("\n1. Citizen Portal")
     print("2. Officer Portal")
     print("3. View All Cases")
-    print("4. Exit")
+    print("4. Statistics")
+    print("5. Exit")
     print("\n" + "="*60)
     
-    choice = input("\nEnter your choice (1-4): ").strip()
+    choice = input("\nEnter your choice (1-5): ").strip()
     return choice
 
 
@@ -162,7 +217,7 @@ def report_crime():
         return
     
     # Greet the citizen and collect crime details
-    print(f"\nWelcome, {citizen[1]}!")
+    print(f"\nWelcome, {citizen.full_name}!")
     print("\nCrime Types: Theft, Assault, Burglary, Robbery, Vandalism, Fraud, etc.")
     crime_type = input("Enter type of crime: ").strip()
     description = input("Enter detailed description of the incident: ").strip()
@@ -193,21 +248,27 @@ def view_citizen_cases():
     
     citizen_id = input("\nEnter your Citizen ID: ").strip()
     
-    # Get all cases and filter to find this citizen's cases
-    all_cases = get_all_cases()
-    citizen_cases = []
-    
-    for case in all_cases:
-        # Get full case details to check citizen ID
-        case_detail = get_case_by_id(case[0])
-        if case_detail and str(case_detail[1]) == citizen_id:
-            citizen_cases.append(case)
-    
-    # Display results
-    if citizen_cases:
-        display_cases(citizen_cases)
-    else:
-        print("\nNo cases found for this citizen ID.")
+    # Load this citizen's cases one page at a time (one query per page)
+    after_case_id = None
+    while True:
+        citizen_cases = get_cases_by_citizen(citizen_id, CASES_PER_PAGE, after_case_id)
+        
+        # Display results
+        if citizen_cases:
+            display_cases(citizen_cases)
+        elif after_case_id is None:
+            print("\nNo cases found for this citizen ID.")
+        else:
+            print("\nNo more cases.")
+        
+        # A short page means there is nothing left to load
+        if len(citizen_cases) < CASES_PER_PAGE:
+            break
+        
+        more = input("\nPress N for the next page, or Enter to go back: ").strip().lower()
+        if more != 'n':
+            return
+        after_case_id = citizen_cases[-1].case_id
     
     pause()
 
@@ -232,10 +293,10 @@ def update_citizen_info():
         return
     
     # Show current information
-    print(f"\nCurrent information for: {citizen[1]}")
-    print(f"Phone: {citizen[2]}")
-    print(f"Email: {citizen[3] or 'Not provided'}")
-    print(f"Address: {citizen[4] or 'Not provided'}")
+    print(f"\nCurrent information for: {citizen.full_name}")
+    print(f"Phone: {citizen.phone_number}")
+    print(f"Email: {citizen.email or 'Not provided'}")
+    print(f"Address: {citizen.address or 'Not provided'}")
     
     # Collect new information (press Enter to keep current)
     print("\n--- Enter new information (press Enter to keep current) ---")
@@ -255,7 +316,7 @@ def update_citizen_info():
 
 def delete_citizen_account():
     """
-    Delete a citizen account permanently from the system
+    Delete a citizen account (and the cases they reported) from the system
     Requires confirmation before deletion to prevent accidents
     """
     clear_screen()
@@ -273,7 +334,7 @@ def delete_citizen_account():
         return
     
     # Show warning and ask for confirmation
-    print(f"\nWARNING: You are about to delete the account for: {citizen[1]}")
+    print(f"\nWARNING: You are about to delete the account for: {citizen.full_name}")
     print("This action cannot be undone!")
     print("All cases reported by this citizen will also be deleted.")
     confirm = input("\nType 'DELETE' to confirm deletion: ").strip()
@@ -329,10 +390,12 @@ def officer_menu():
         print("11. Delete Case Update")
         print("12. View All Officers")
         print("13. Delete Officer Account")
-        print("14. Back to Main Menu")
+        print("14. Search Cases and Notes")
+        print("15. Find Cases (Combined Filters)")
+        print("16. Back to Main Menu")
         print("\n" + "="*60)
         
-        choice = input("\nEnter your choice (1-14): ").strip()
+        choice = input("\nEnter your choice (1-16): ").strip()
         
         # Call appropriate function based on user's choice
         if choice == '1':
@@ -362,6 +425,10 @@ def officer_menu():
         elif choice == '13':
             delete_officer_account()
         elif choice == '14':
+            search_cases_menu()
+        elif choice == '15':
+            find_cases_menu()
+        elif choice == '16':
             break  # Exit to main menu
         else:
             print("Invalid choice! Please try again.")
@@ -406,9 +473,7 @@ def view_all_cases_officer():
     print(" "*22 + "ALL CASES")
     print("="*60)
     
-    cases = get_all_cases()
-    display_cases(cases)
-    pause()
+    page_through_cases(get_all_cases)
 
 
 def filter_cases_by_status():
@@ -447,16 +512,15 @@ def filter_cases_by_status():
     status = status_map[choice]
     print(f"\nSearching for cases with status: {status}")
     
-    # Get and display filtered cases
-    cases = get_cases_by_status(status)
-    display_cases(cases)
-    pause()
+    # Get and display filtered cases, one page at a time
+    page_through_cases(lambda limit, after: get_cases_by_status(status, limit, after))
 
 
 def filter_cases_by_location():
     """
     Filter and display cases by location
     Uses partial matching (e.g., "Nairobi" will find "Nairobi CBD")
+    Best matches are shown first, small typos are tolerated
     """
     clear_screen()
     print("\n" + "="*60)
@@ -465,8 +529,8 @@ def filter_cases_by_location():
     
     location = input("\nEnter location to search: ").strip()
     
-    # Get and display filtered cases
-    cases = get_cases_by_location(location)
+    # Get and display the best matching cases
+    cases = search_cases_by_location(location, SEARCH_RESULTS_LIMIT)
     display_cases(cases)
     pause()
 
@@ -475,6 +539,7 @@ def filter_cases_by_crime_type():
     """
     Filter and display cases by type of crime
     Uses partial matching (e.g., "Theft" will find "Grand Theft")
+    Best matches are shown first, small typos are tolerated
     """
     clear_screen()
     print("\n" + "="*60)
@@ -483,8 +548,8 @@ def filter_cases_by_crime_type():
     
     crime_type = input("\nEnter crime type to search: ").strip()
     
-    # Get and display filtered cases
-    cases = get_cases_by_crime_type(crime_type)
+    # Get and display the best matching cases
+    cases = search_cases_by_crime_type(crime_type, SEARCH_RESULTS_LIMIT)
     display_cases(cases)
     pause()
 
@@ -498,8 +563,27 @@ def assign_officer():
     print(" "*18 + "ASSIGN OFFICER TO CASE")
     print("="*60)
     
+    print("\nEnter a Case ID, or ALL to assign every Pending case without an officer")
     case_id = input("\nEnter Case ID: ").strip()
-    officer_id = input("Enter Officer ID: ").strip()
+    
+    # Assign the whole backlog automatically
+    if case_id.upper() == 'ALL':
+        assigned = assign_pending_backlog()
+        if assigned is not None:
+            print(f"\n{assigned} cases assigned automatically!")
+        pause()
+        return
+    
+    officer_id = input("Enter Officer ID (leave empty to pick automatically): ").strip()
+    
+    # No officer given: let the assignment engine pick the least busy, nearest one
+    if not officer_id:
+        if auto_assign_case(case_id):
+            print("\nOfficer assigned successfully!")
+        else:
+            print("\nFailed to assign officer!")
+        pause()
+        return
     
     # Attempt to assign officer to case
     if assign_officer_to_case(case_id, officer_id):
@@ -512,8 +596,9 @@ def assign_officer():
 
 def update_status():
     """
-    Change the status of a case
+    Move a case to its next status
     (e.g., from Pending to Under Investigation)
+    Only the next steps allowed for the case's current status are offered
     """
     clear_screen()
     print("\n" + "="*60)
@@ -522,33 +607,42 @@ def update_status():
     
     case_id = input("\nEnter Case ID: ").strip()
     
-    # Show status options
-    print("\nAvailable statuses:")
-    print("1. Pending")
-    print("2. Under Investigation")
-    print("3. Resolved")
-    print("4. Closed")
+    # Look up the current status (and show how the case got there)
+    case = get_case_by_id(case_id)
+    if case is None:
+        print("\nCase not found!")
+        pause()
+        return
     
-    choice = input("\nEnter choice (1-4): ").strip()
+    current_status = case.status
+    print(f"\nCurrent status: {current_status}")
+    display_status_history(get_status_history(case_id))
     
-    # Convert number choice to actual status text
-    status_map = {
-        '1': 'Pending',
-        '2': 'Under Investigation',
-        '3': 'Resolved',
-        '4': 'Closed'
-    }
+    # A finished case can not move any further
+    allowed = STATUS_TRANSITIONS.get(current_status, ())
+    if not allowed:
+        print("\nThis case is closed; its status can no longer change.")
+        pause()
+        return
+    
+    # Show only the statuses this case can move to
+    print("\nMove the case to:")
+    for number, status in enumerate(allowed, start=1):
+        print(f"{number}. {status}")
+    
+    choice = input(f"\nEnter choice (1-{len(allowed)}): ").strip()
     
     # Validate choice
-    if choice not in status_map:
+    if not choice.isdigit() or not 1 <= int(choice) <= len(allowed):
         print("\nInvalid choice!")
         pause()
         return
     
-    status = status_map[choice]
+    status = allowed[int(choice) - 1]
+    changed_by = input("Your Officer ID (optional): ").strip() or None
     
-    # Update the case status
-    if update_case_status(case_id, status):
+    # Update the case status (recorded in the case's status history)
+    if update_case_status(case_id, status, changed_by):
         print(f"\nCase status updated to '{status}' successfully!")
     else:
         print("\nFailed to update case status!")
@@ -595,15 +689,34 @@ def view_case_updates():
     
     case_id = input("\nEnter Case ID: ").strip()
     
-    # Get and display all updates for this case
-    updates = get_updates_by_case(case_id)
-    display_case_updates(updates)
+    # Load the timeline one page at a time, newest updates first
+    before = None
+    while True:
+        updates = get_case_timeline(case_id, TIMELINE_PAGE_SIZE, before)
+        if updates is None:
+            break
+        
+        # Display results
+        if updates or before is None:
+            display_case_updates(updates)
+        else:
+            print("\nNo more updates.")
+        
+        # A short page means there is nothing left to load
+        if len(updates) < TIMELINE_PAGE_SIZE:
+            break
+        
+        more = input("\nPress N for the next page, or Enter to go back: ").strip().lower()
+        if more != 'n':
+            return
+        before = next_timeline_key(updates)
+    
     pause()
 
 
 def delete_case_menu():
     """
-    Delete a crime case permanently from the system
+    Delete a crime case from the system
     Requires confirmation before deletion
     """
     clear_screen()
@@ -622,10 +735,10 @@ def delete_case_menu():
     
     # Show warning and ask for confirmation
     print(f"\nWARNING: You are about to delete case #{case_id}")
-    print(f"Crime Type: {case[3]}")
-    print(f"Location: {case[4]}")
+    print(f"Crime Type: {case.crime_type}")
+    print(f"Location: {case.location}")
     print("\nThis action cannot be undone!")
-    print("All updates associated with this case will also be deleted.")
+    print("The case and its updates will no longer appear anywhere.")
     confirm = input("\nType 'DELETE' to confirm deletion: ").strip()
     
     # Only proceed if user types exactly DELETE
@@ -682,9 +795,90 @@ def delete_update_menu():
     pause()
 
 
+def search_cases_menu():
+    """
+    Search the descriptions of cases and the notes officers added to them
+    Optionally narrowed down by status
+    """
+    clear_screen()
+    print("\n" + "="*60)
+    print(" "*17 + "SEARCH CASES AND NOTES")
+    print("="*60)
+    
+    print("\nExamples: stolen phone | \"red car\" | knife -kitchen")
+    query = input("\nEnter words to search for: ").strip()
+    if not query:
+        print("\nPlease enter something to search for!")
+        pause()
+        return
+    
+    # Optional status filter
+    print("\nLimit to status (press Enter for all):")
+    print("1. Pending")
+    print("2. Under Investigation")
+    print("3. Resolved")
+    print("4. Closed")
+    choice = input("\nEnter choice (1-4): ").strip()
+    
+    status_map = {
+        '1': 'Pending',
+        '2': 'Under Investigation',
+        '3': 'Resolved',
+        '4': 'Closed'
+    }
+    filters = {'status': status_map.get(choice)}
+    
+    # Get and display the best matching cases
+    results = search_cases(query, filters, SEARCH_RESULTS_LIMIT)
+    display_search_results(results)
+    pause()
+
+
+def find_cases_menu():
+    """
+    Filter cases on several things at once
+    (status, location, crime type, officer and date range)
+    Every question can be skipped by pressing Enter
+    """
+    clear_screen()
+    print("\n" + "="*60)
+    print(" "*15 + "FIND CASES (COMBINED FILTERS)")
+    print("="*60)
+    print("\nPress Enter to skip any filter.")
+    
+    # Status
+    print("\nStatus:")
+    print("1. Pending")
+    print("2. Under Investigation")
+    print("3. Resolved")
+    print("4. Closed")
+    choice = input("Enter choice (1-4): ").strip()
+    status_map = {
+        '1': 'Pending',
+        '2': 'Under Investigation',
+        '3': 'Resolved',
+        '4': 'Closed'
+    }
+    
+    # Everything else
+    filters = {
+        'status': status_map.get(choice),
+        'location': input("Location contains: ").strip() or None,
+        'crime_type': input("Crime type contains: ").strip() or None,
+        'officer_id': input("Assigned Officer ID: ").strip() or None,
+        'reported_from': input("Reported on or after (YYYY-MM-DD): ").strip() or None,
+        'reported_to': input("Reported before (YYYY-MM-DD): ").strip() or None,
+    }
+    oldest_first = input("Show oldest first? (y/N): ").strip().lower() == 'y'
+    order_by = "oldest" if oldest_first else "newest"
+    
+    # Get and display matching cases, one page at a time
+    page_through_cases(lambda limit, after: find_cases(**filters, order_by=order_by, limit=limit, after=after))
+
+
 def delete_officer_account():
     """
-    Delete an officer account permanently from the system
+    Delete an officer account from the system
     Requires confirmation before deletion
     """
     clear_screen()
@@ -702,11 +896,11 @@ def delete_officer_account():
         return
     
     # Show warning and ask for confirmation
-    print(f"\nWARNING: You are about to delete the account for: {officer[1]}")
-    print(f"Badge Number: {officer[2]}")
-    print(f"Rank: {officer[3]}")
+    print(f"\nWARNING: You are about to delete the account for: {officer.full_name}")
+    print(f"Badge Number: {officer.badge_number}")
+    print(f"Rank: {officer.rank}")
     print("\nThis action cannot be undone!")
-    print("Cases assigned to this officer will remain but show no assigned officer.")
+    print("Their open cases will show no assigned officer until someone else is assigned.")
     confirm = input("\nType 'DELETE' to confirm deletion: ").strip()
     
     # Only proceed if user types exactly DELETE
@@ -747,6 +941,53 @@ def view_all_cases_public():
     print(" "*22 + "ALL CASES")
     print("="*60)
     
-    cases = get_all_cases()
-    display_cases(cases)
-    pause()
\ No newline at end of file
+    page_through_cases(get_all_cases)
+
+
+# STATISTICS
+
+def statistics_menu():
+    """
+    Display the statistics menu
+    Every screen reads the pre-computed summary tables, so it is quick
+    no matter how many cases there are
+    """
+    while True:
+        clear_screen()
+        print("\n" + "="*60)
+        print(" "*23 + "STATISTICS")
+        print("="*60)
+        print("\n1. Cases by Status")
+        print("2. Most Common Crime Types")
+        print("3. Locations with Most Cases")
+        print(f"4. Cases per Day (last {STATS_DAYS} days)")
+        print("5. Time to Resolution by Officer")
+        print("6. Time to Resolution by Station")
+        print("7. Back to Main Menu")
+        print("\n" + "="*60)
+        
+        choice = input("\nEnter your choice (1-7): ").strip()
+        
+        if choice == '1':
+            display_case_counts("Status", get_case_counts('status'), get_total_cases())
+            pause()
+        elif choice == '2':
+            display_case_counts("Crime Type", get_case_counts('crime_type', STATS_TOP_LIMIT), get_total_cases())
+            pause()
+        elif choice == '3':
+            display_case_counts("Location", get_case_counts('location', STATS_TOP_LIMIT), get_total_cases())
+            pause()
+        elif choice == '4':
+            display_daily_counts(get_daily_counts(STATS_DAYS))
+            pause()
+        elif choice == '5':
+            display_resolution_stats(get_officer_resolution_stats(STATS_TOP_LIMIT))
+            pause()
+        elif choice == '6':
+            display_resolution_stats(get_station_resolution_stats(), by_station=True)
+            pause()
+        elif choice == '7':
+            break  # Exit to main menu
+        else:
+            print("Invalid choice! Please try again.")
+            pause()